@@ -6,7 +6,7 @@ import os
 from langgraph.config import get_stream_writer
 import time
 from services.deepgram_service import DeepgramService
-from services.ai_service import OpenRouterService, GroqService
+from services.ai_service import OpenRouterService
 import logging
 from services.deepgram_streaming_service import DeepgramStreamingService
 import uuid
@@ -117,9 +117,7 @@ async def stt_node(state: ConversationState, config=None):
                 f.write(audio_input)
         start_time = time.time()
         # Use file-based transcription
-        transcript = await asyncio.to_thread(
-            file_stt_service.transcribe, input_path
-        )
+        transcript = await file_stt_service.transcribe(input_path)
         elapsed = time.time() - start_time
         stt_time_ms = int(elapsed * 1000)
         if manager:
@@ -151,7 +149,7 @@ async def llm_tts_streaming_node(state: ConversationState, config=None):
         if manager:
             await manager.send_status(client_id, "llm_tts_streaming")
         # Initialize services
-        ai_service = GroqService()
+        ai_service = ServiceRegistry.get_groq_service()
         personality_agent = PersonalityAgent(neo_config)
         elevenlabs_ws = ElevenLabsWebSocketService()
         text_buffer = StreamingTextBuffer(min_chunk_size=15, max_chunk_size=100)
@@ -185,9 +183,9 @@ async def llm_tts_streaming_node(state: ConversationState, config=None):
         else:
             response_guidance = ""
         # Build prompt (same as before)
-        subconscious_prompt = f"""{personality_agent.system_prompt}
-
-{intimate_context}
+        # The persona is static, so it is sent as the system-message prefix
+        # (provider prompt caching) rather than at the top of this prompt
+        subconscious_prompt = f"""{intimate_context}
 
 SUBCONSCIOUS UNDERSTANDING:
 Emotional Undercurrent: {intimacy_scaffold.emotional_undercurrent}
@@ -235,21 +233,27 @@ Keep your responses short and concise.
         response = ""
         start_time = time.time()
         token_count = 0
+        batch_count = 0  # streamed yields; each carries several tokens (see _TokenBatcher)
         first_token_time = None
 
         if hasattr(ai_service, 'get_streaming_response'):
-            async for chunk in ai_service.get_streaming_response(subconscious_prompt):
+            async for chunk in ai_service.get_streaming_response(
+                subconscious_prompt,
+                system_prefix=personality_agent.system_prompt,
+                user_id=user_id,
+                cache_text=state["transcript"],
+            ):
                 if first_token_time is None:
                     first_token_time = time.time()
                     ttft = int((first_token_time - start_time) * 1000)
                     logger.info(f"🚀 [LATENCY] Time to first token: {ttft}ms")
                 
                 response += chunk
-                token_count += 1
+                batch_count += 1
                 
-                # Log every 10th token to verify streaming
-                if token_count % 10 == 0:
-                    logger.info(f"[Streaming] Received {token_count} tokens, latest: '{chunk}'")
+                # Log every 10th batch to verify streaming
+                if batch_count % 10 == 0:
+                    logger.info(f"[Streaming] Received {batch_count} batches, latest: '{chunk}'")
                 # Send token to frontend
                 if manager:
                     await manager.send_message(client_id, {
@@ -258,9 +262,13 @@ Keep your responses short and concise.
                     })
                 # Buffer token for TTS streaming
                 await text_buffer.add_token(chunk)
+            # Batches are not tokens; count words, as the non-streaming path does
+            token_count = len(response.split())
         else:
             # Fallback for non-streaming AI services
-            response = await asyncio.to_thread(ai_service.get_response, subconscious_prompt)
+            response = await asyncio.to_thread(
+                ai_service.get_response, f"{personality_agent.system_prompt}\n\n{subconscious_prompt}"
+            )
             token_count = len(response.split())
             # Send entire response to TTS
             await elevenlabs_ws.stream_text_chunk(response)
@@ -269,7 +277,7 @@ Keep your responses short and concise.
         await elevenlabs_ws.flush_and_finish()
         elapsed = time.time() - start_time
         elapsed_ms = int(elapsed * 1000)
-        logger.info(f"[{client_id}] Streaming complete: {elapsed_ms} ms. Tokens: {token_count}. Audio chunks: {chunk_count}")
+        logger.info(f"[{client_id}] Streaming complete: {elapsed_ms} ms. Tokens (words): {token_count}. Batches: {batch_count}. Audio chunks: {chunk_count}")
         # Background processing trigger
         try:
             started = await background_service_manager.ensure_user_background_processing(user_id)
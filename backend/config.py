@@ -40,7 +40,10 @@ OPENROUTER_CONFIG = {
     "system_message": os.getenv("OPENROUTER_SYSTEM_MESSAGE",
                                 "You are a helpful assistant. Keep responses concise and conversational."),
     "site_url": os.getenv("OPENROUTER_SITE_URL", "http://localhost:3000"),
-    "site_name": os.getenv("OPENROUTER_SITE_NAME", "Voice Assistant")
+    "site_name": os.getenv("OPENROUTER_SITE_NAME", "Voice Assistant"),
+    # Static preamble placed first in the system message so providers' prompt
+    # caches see the same prefix on every call
+    "system_prefix_block": os.getenv("LLM_SYSTEM_PREFIX_BLOCK", ""),
 }
 
 # Add Groq configuration section if not present
@@ -49,7 +52,8 @@ GROQ_CONFIG = {
     "model": os.getenv("GROQ_MODEL", "llama-3.1-8b-instant"),  # Fast model
     "max_tokens": int(os.getenv("GROQ_MAX_TOKENS", "1000")),
     "temperature": float(os.getenv("GROQ_TEMPERATURE", "0.7")),
-    "system_message": "You are a helpful AI companion. Keep responses concise and conversational."
+    "system_message": "You are a helpful AI companion. Keep responses concise and conversational.",
+    "system_prefix_block": os.getenv("LLM_SYSTEM_PREFIX_BLOCK", ""),
 }
 
 # Memory Enhancement Configuration
@@ -64,7 +68,9 @@ SUPABASE_CONFIG = {
     "url": os.getenv("SUPABASE_URL", ""),
     "anon_key": os.getenv("SUPABASE_ANON_KEY", ""),
     "service_role_key": os.getenv("SUPABASE_SERVICE_ROLE_KEY", ""),
-    "project_id": os.getenv("SUPABASE_SERVICE_ROLE_KEY", "")
+    "project_id": os.getenv("SUPABASE_SERVICE_ROLE_KEY", ""),
+    # HS256 secret for verifying access tokens locally (Settings -> API -> JWT secret)
+    "jwt_secret": os.getenv("SUPABASE_JWT_SECRET", ""),
 }
 
 # Neo4j Configuration (graph store)
@@ -74,3 +80,8 @@ NEO4J_CONFIG = {
     "password": os.getenv("NEO4J_PASSWORD", ""),
     "database": os.getenv("NEO4J_DATABASE", "neo4j"),
 }
+
+# Redis Configuration (optional shared cache; empty URL keeps caches in-process)
+REDIS_CONFIG = {
+    "url": os.getenv("REDIS_URL", ""),
+}
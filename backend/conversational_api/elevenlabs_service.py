@@ -1,11 +1,14 @@
 import os
 import signal
-import json
+import orjson
 import asyncio
 import time
-import re
 import base64
-from threading import Timer
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import threading
+import httpx
 from dotenv import load_dotenv
 from elevenlabs.client import ElevenLabs
 from elevenlabs.conversational_ai.conversation import Conversation
@@ -15,26 +18,87 @@ from backend.conversational_api.custom_audio_interface import WaveformAudioInter
 # Load environment variables once
 load_dotenv()
 
+# Records from the SDK worker threads are only enqueued here; a background
+# listener thread does the formatting and the (possibly blocking) stdout write.
+# Set CONVERSATION_LOG_LEVEL=WARNING in production to skip per-turn records.
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("CONVERSATION_LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+logger.addHandler(QueueHandler(_log_queue))
+_log_listener: QueueListener | None = None
+
+def start_log_listener():
+    """Start draining queued conversation log records to stderr (idempotent)."""
+    global _log_listener
+    if _log_listener is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s:%(name)s:%(message)s"))
+        _log_listener = QueueListener(_log_queue, handler)
+        _log_listener.start()
+
+def stop_log_listener():
+    """Flush remaining records and stop the listener thread."""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+# Keep the TLS session to api.elevenlabs.io warm between turns; a cold
+# handshake adds ~1s to the first TTS request after an idle period.
+HTTP_KEEPALIVE_EXPIRY = 300.0  # seconds
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 8
+
+# Speaking-rate estimate used for the SPEAKING fallback timer
+SECONDS_PER_CHAR = 0.08
+
+# Every state frame is one of a handful of constant payloads; serialise them once.
+CONVERSATION_STATES = ("IDLE", "LISTENING", "THINKING", "SPEAKING")
+_STATE_PAYLOADS = {state: orjson.dumps({"state": state}).decode() for state in CONVERSATION_STATES}
+
 # --- ConversationStateManager class ---
 class ConversationStateManager:
+    """Tracks the agent's conversational state and pushes it to the frontend.
+
+    SDK callbacks arrive on the ElevenLabs session thread. They are handed to a
+    private worker event loop (``_bg_loop``) where all state mutation and timer
+    scheduling happens, so timers are cheap ``call_later`` handles instead of one
+    OS thread per ``threading.Timer``. Only the final websocket write crosses back
+    onto the main (uvicorn) loop.
+    """
+
     def __init__(self, loop: asyncio.AbstractEventLoop):
         self.current_state = "IDLE"
         self.websocket = None
         self.loop = loop
         self.last_agent_response_time = None
         self.last_user_speech_time = None
-        self.speaking_timer: Timer | None = None
-        self.thinking_timer: Timer | None = None
+        self.speaking_timer: asyncio.TimerHandle | None = None
+        self.thinking_timer: asyncio.TimerHandle | None = None
         self.thinking_timeout = 2.0  # seconds after user speech before THINKING
         # Add new properties for audio-based state detection
-        self.audio_silence_timer: Timer | None = None
+        self.audio_silence_timer: asyncio.TimerHandle | None = None
         self.audio_silence_timeout = 1.0  # seconds of silence before transitioning to IDLE
         self.last_audio_time = None
         self.is_audio_playing = False
         # Flag to indicate if we are waiting for the first audio chunk after a response
         self.waiting_for_audio = False
 
-        print("🔄 State: IDLE - Waiting for conversation start")
+        # Worker loop that owns state transitions and timers
+        self._bg_loop = asyncio.new_event_loop()
+        self._bg_thread = threading.Thread(
+            target=self._bg_loop.run_forever,
+            name="conversation-state",
+            daemon=True,
+        )
+        self._bg_thread.start()
+
+        logger.info("🔄 State: IDLE - Waiting for conversation start")
+
+    def shutdown(self):
+        """Stop the worker loop (timers pending on it are dropped)."""
+        if self._bg_loop.is_running():
+            self._bg_loop.call_soon_threadsafe(self._bg_loop.stop)
 
     async def set_websocket(self, websocket):
         """Sets the active websocket connection and sends initial state."""
@@ -45,106 +109,125 @@ class ConversationStateManager:
         """Sends the current state over the websocket if available."""
         if self.websocket:
             try:
-                await self.websocket.send_text(json.dumps({"state": self.current_state}))
+                payload = _STATE_PAYLOADS.get(self.current_state)
+                if payload is None:
+                    payload = orjson.dumps({"state": self.current_state}).decode()
+                await self.websocket.send_text(payload)
             except Exception as e:
-                print(f"Error sending state over websocket: {e}")
+                logger.error("Error sending state over websocket: %s", e)
                 self.websocket = None
 
+    def _dispatch(self, handler, *args):
+        """Run ``handler`` on the worker loop; called from SDK / main-loop threads."""
+        self._bg_loop.call_soon_threadsafe(handler, *args)
+
     def _schedule_state_update(self):
-        """Helper to schedule async state update from synchronous context."""
+        """Hand the websocket write to the main loop (single cross-thread hop)."""
         if self.loop and self.loop.is_running() and self.websocket:
             try:
-                asyncio.run_coroutine_threadsafe(self.send_state_update(), self.loop)
+                self.loop.call_soon_threadsafe(self._do_send)
             except Exception as e:
-                print(f"Error scheduling state update: {e}")
+                logger.error("Error scheduling state update: %s", e)
+
+    def _do_send(self):
+        """Runs on the main loop: fire the state update onto the live websocket."""
+        self.loop.create_task(self.send_state_update())
 
     def _cancel_timers(self):
         """Cancel any active timers"""
-        if self.speaking_timer and self.speaking_timer.is_alive():
+        if self.speaking_timer:
             self.speaking_timer.cancel()
             self.speaking_timer = None
-        if self.thinking_timer and self.thinking_timer.is_alive():
+        if self.thinking_timer:
             self.thinking_timer.cancel()
             self.thinking_timer = None
         # NEW: Cancel audio-based timers
-        if self.audio_silence_timer and self.audio_silence_timer.is_alive():
+        if self.audio_silence_timer:
             self.audio_silence_timer.cancel()
             self.audio_silence_timer = None
 
     def _estimate_speaking_duration(self, text: str) -> float:
         """Estimate how long it takes to speak the given text"""
-        words = len(re.findall(r'\b\w+\b', text))
-        # Average speaking rate: ~150 words per minute (2.5 words per second)
-        # Add buffer for processing and pauses
-        estimated_duration = (words / 2.5) + 0.5  # Reduced buffer
-        # Minimum duration of 1 second, maximum of 20 seconds
-        return max(1.0, min(estimated_duration, 20.0))
+        # ~150 words per minute at ~5 characters per word => 12.5 chars/second (0.08 s/char).
+        # Character count is close enough for a fallback timer and needs no tokenising.
+        # Add buffer for processing and pauses; clamp to 1-20 seconds.
+        return max(1.0, min(len(text) * SECONDS_PER_CHAR + 0.5, 20.0))
 
     def _transition_to_idle(self):
         """Called when estimated speaking time is over (fallback)"""
         if self.current_state == "SPEAKING":
             self.current_state = "IDLE"
-            print("🔄 State: IDLE - Agent finished speaking (estimation fallback)")
+            logger.info("🔄 State: IDLE - Agent finished speaking (estimation fallback)")
             self._schedule_state_update()
 
     def _transition_to_thinking(self):
         """Called after user speech timeout"""
         if self.current_state == "LISTENING":
             self.current_state = "THINKING"
-            print("🧠 State: THINKING - Processing user input")
+            logger.info("🧠 State: THINKING - Processing user input")
             self._schedule_state_update()
 
+    # --- SDK callbacks (session thread) -> worker loop ---
     def on_agent_response(self, response):
         """Called when agent starts responding with text"""
+        self._dispatch(self._handle_agent_response, response)
+
+    def on_agent_response_correction(self, original, corrected):
+        """Called when agent corrects its response"""
+        self._dispatch(self._handle_agent_response_correction, original, corrected)
+
+    def on_user_transcript(self, transcript):
+        """Called when user speech is detected and transcribed"""
+        self._dispatch(self._handle_user_transcript, transcript)
+
+    def on_latency_measurement(self, latency):
+        """Called for latency measurements - not used for state tracking"""
+        pass
+
+    def on_session_end(self):
+        """Called when conversation session ends"""
+        self._dispatch(self._handle_session_end)
+
+    # --- Handlers (worker loop) ---
+    def _handle_agent_response(self, response):
         self._cancel_timers()
 
         self.current_state = "SPEAKING"
         self.last_agent_response_time = time.time()
-        print("🗣️  State: SPEAKING - Agent responding")
+        logger.info("🗣️  State: SPEAKING - Agent responding")
         self._schedule_state_update()
-        print(f"Agent: {response}")
+        logger.info("Agent: %s", response)
 
         # NEW: Set waiting flag instead of immediate timer
         self.waiting_for_audio = True
 
         # FALLBACK: Keep estimation as safety backup (longer timeout)
         fallback_duration = self._estimate_speaking_duration(response) + 3.0  # Extra buffer
-        self.speaking_timer = Timer(fallback_duration, self._fallback_transition_to_idle)
-        self.speaking_timer.daemon = True
-        self.speaking_timer.start()
+        self.speaking_timer = self._bg_loop.call_later(fallback_duration, self._fallback_transition_to_idle)
 
-    def on_agent_response_correction(self, original, corrected):
-        """Called when agent corrects its response"""
-        print(f"Agent: {original} -> {corrected}")
-        if self.speaking_timer and self.speaking_timer.is_alive():
+    def _handle_agent_response_correction(self, original, corrected):
+        logger.info("Agent: %s -> %s", original, corrected)
+        if self.speaking_timer:
             self.speaking_timer.cancel()
 
         # Behavior: Let audio events handle the actual state transitions
         # The fallback timer from on_agent_response will still be active
 
-    def on_user_transcript(self, transcript):
-        """Called when user speech is detected and transcribed"""
+    def _handle_user_transcript(self, transcript):
         self._cancel_timers()
 
         self.current_state = "LISTENING"
         self.last_user_speech_time = time.time()
-        print("👂 State: LISTENING - User speech detected")
+        logger.info("👂 State: LISTENING - User speech detected")
         self._schedule_state_update()
-        print(f"User: {transcript}")
-
-        self.thinking_timer = Timer(self.thinking_timeout, self._transition_to_thinking)
-        self.thinking_timer.daemon = True
-        self.thinking_timer.start()
+        logger.info("User: %s", transcript)
 
-    def on_latency_measurement(self, latency):
-        """Called for latency measurements - not used for state tracking"""
-        pass
+        self.thinking_timer = self._bg_loop.call_later(self.thinking_timeout, self._transition_to_thinking)
 
-    def on_session_end(self):
-        """Called when conversation session ends"""
+    def _handle_session_end(self):
         self._cancel_timers()
         self.current_state = "IDLE"
-        print("🔄 State: IDLE - Conversation session ended")
+        logger.info("🔄 State: IDLE - Conversation session ended")
         self._schedule_state_update()
 
     async def send_audio_data(self, audio_bytes: bytes, format_info: dict):
@@ -162,28 +245,34 @@ class ConversationStateManager:
                     "timestamp": time.time(),
                     "format": format_info
                 }
-                await self.websocket.send_text(json.dumps(message))
+                await self.websocket.send_text(orjson.dumps(message).decode())
             except Exception as e:
-                print(f"Error sending audio data over websocket: {e}")
+                logger.error("Error sending audio data over websocket: %s", e)
                 # Don't set websocket to None here, state updates might still work
 
     # Add these new methods for audio-based state detection:
     def on_audio_start(self):
         """Called when first audio chunk is received - actual speaking begins"""
+        self._dispatch(self._handle_audio_start)
+
+    def on_audio_chunk(self, audio_bytes: bytes):
+        """Called for each audio chunk - indicates ongoing speech"""
+        self._dispatch(self._handle_audio_chunk)
+
+    def _handle_audio_start(self):
         self._cancel_audio_timers() # Cancel any lingering audio timers
         if self.current_state != "SPEAKING":
             self.current_state = "SPEAKING"
-            print("🗣️  State: SPEAKING - Audio playback started")
+            logger.info("🗣️  State: SPEAKING - Audio playback started")
             self._schedule_state_update()
         self.is_audio_playing = True
         self.last_audio_time = time.time()
         self.waiting_for_audio = False # No longer waiting for the first chunk
 
-    def on_audio_chunk(self, audio_bytes: bytes):
-        """Called for each audio chunk - indicates ongoing speech"""
+    def _handle_audio_chunk(self):
         # Ensure audio playback state is set if not already (e.g., if on_audio_start was missed)
         if not self.is_audio_playing:
-             self.on_audio_start()
+             self._handle_audio_start()
 
         self.last_audio_time = time.time()
         # Reset silence timer on each chunk
@@ -191,15 +280,13 @@ class ConversationStateManager:
 
     def _reset_audio_silence_timer(self):
         """Reset the audio silence detection timer"""
-        if self.audio_silence_timer and self.audio_silence_timer.is_alive():
+        if self.audio_silence_timer:
             self.audio_silence_timer.cancel()
 
-        self.audio_silence_timer = Timer(
+        self.audio_silence_timer = self._bg_loop.call_later(
             self.audio_silence_timeout,
             self._transition_to_idle_from_audio
         )
-        self.audio_silence_timer.daemon = True
-        self.audio_silence_timer.start()
 
     def _transition_to_idle_from_audio(self):
         """Called when audio silence is detected"""
@@ -207,19 +294,19 @@ class ConversationStateManager:
             self._cancel_audio_timers() # Ensure audio timers are stopped
             self.current_state = "IDLE"
             self.is_audio_playing = False
-            print("🔄 State: IDLE - Audio playback finished")
+            logger.info("🔄 State: IDLE - Audio playback finished")
             self._schedule_state_update()
 
     def _cancel_audio_timers(self):
         """Cancel only audio-based timers"""
-        if self.audio_silence_timer and self.audio_silence_timer.is_alive():
+        if self.audio_silence_timer:
             self.audio_silence_timer.cancel()
             self.audio_silence_timer = None
 
     def _fallback_transition_to_idle(self):
         """Safety fallback if audio events fail"""
         if self.current_state == "SPEAKING" and not self.is_audio_playing:
-            print("⚠️  Fallback: Transitioning to IDLE (no audio detected or audio events missed)")
+            logger.warning("⚠️  Fallback: Transitioning to IDLE (no audio detected or audio events missed)")
             self._transition_to_idle_from_audio() # Use the audio-based idle transition
 
 # --- Function to initialize ElevenLabs components ---
@@ -228,10 +315,18 @@ def create_conversation_components(loop: asyncio.AbstractEventLoop):
     api_key = os.getenv("ELEVENLABS_API_KEY")
 
     if not agent_id:
-        print("Error: AGENT_ID environment variable not set.")
+        logger.error("Error: AGENT_ID environment variable not set.")
         return None, None, None
 
-    elevenlabs_client = ElevenLabs(api_key=api_key)
+    # One long-lived HTTP/2 client shared by every SDK call on this ElevenLabs instance
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+    elevenlabs_client = ElevenLabs(api_key=api_key, httpx_client=http_client)
     state_manager = ConversationStateManager(loop=loop)
 
     # Use the new WaveformAudioInterface and pass the state_manager
@@ -252,4 +347,12 @@ def create_conversation_components(loop: asyncio.AbstractEventLoop):
 
     return elevenlabs_client, state_manager, conversation_instance
 
+def warm_http_session(elevenlabs_client: ElevenLabs):
+    """Issue one trivial request so the TLS + HTTP/2 session is open before the first user turn."""
+    try:
+        elevenlabs_client.voices.get_all()
+        logger.info("ElevenLabs HTTP session warmed")
+    except Exception as e:
+        logger.warning("ElevenLabs warmup request failed: %s", e)
+
 # Removed the direct script execution part
\ No newline at end of file
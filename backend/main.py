@@ -1,6 +1,7 @@
 # backend/main.py
 
 import asyncio
+import time
 from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
@@ -11,10 +12,25 @@ from services.background_service_manager import background_service_manager
 import signal
 
 # Import the function to create ElevenLabs components and the Conversation class
-from backend.conversational_api.elevenlabs_service import create_conversation_components, ConversationStateManager, Conversation # Import Conversation
+from backend.conversational_api.elevenlabs_service import (
+    create_conversation_components,
+    warm_http_session,
+    start_log_listener,
+    stop_log_listener,
+    logger as conversation_logger,
+    ConversationStateManager,
+    Conversation,
+)
 from memory.mem0_async_service import IntimateMemoryService
 from backend.subconscious.background_processor import PersistentSubconsciousProcessor
 
+# Pay the LangGraph import cost once at boot rather than on every /graph request
+try:
+    from backend.agents.langgraph_orchestrator import langgraph_pipeline
+except Exception as e:
+    langgraph_pipeline = None
+    print(f"LangGraph pipeline unavailable for visualization: {e}")
+
 app = FastAPI()
 
 # Add CORS middleware
@@ -33,6 +49,7 @@ conversation_instance = None
 conversation_started = False # Flag to track if conversation session is started
 mem0_service = None
 subconscious_processor = None
+_STARTED = False # Guards startup_event against running twice (Mem0/ElevenLabs init is expensive)
 
 # ADD: Import memory health monitor
 def _import_memory_health_monitor():
@@ -43,12 +60,21 @@ def _import_memory_health_monitor():
 # Initialize components on startup
 @app.on_event("startup")
 async def startup_event():
-    global elevenlabs_client, state_manager, conversation_instance, mem0_service, subconscious_processor
+    global elevenlabs_client, state_manager, conversation_instance, mem0_service, subconscious_processor, _STARTED
+    if _STARTED:
+        return
+    _STARTED = True
+    start_log_listener()
     # Get the running asyncio event loop
-    loop = asyncio.get_event_loop()
+    loop = asyncio.get_running_loop()
+    setup_signal_handlers(loop)
     elevenlabs_client, state_manager, conversation_instance = create_conversation_components(loop=loop)
+    if elevenlabs_client:
+        # Open the TLS session in the background so the first TTS request skips the handshake
+        loop.run_in_executor(None, warm_http_session, elevenlabs_client)
     # ADD: Initialize subconscious processing
     mem0_service = IntimateMemoryService()
+    await mem0_service.warmup()
     subconscious_processor = PersistentSubconsciousProcessor(mem0_service)
     print("Subconscious processing system initialized")
     if not conversation_instance:
@@ -61,15 +87,15 @@ async def startup_event():
 # Function to run the ElevenLabs conversation session in a separate thread
 def run_conversation_session(conv: Conversation):
     try:
-        print("Starting ElevenLabs conversation session thread...")
+        conversation_logger.info("Starting ElevenLabs conversation session thread...")
         conv.start_session()
         # The ElevenLabs SDK handles its own loop/threading within start_session
         # We can optionally wait for it to end if needed, but for a persistent server,
         # we likely want it to keep running until the server stops or session explicitly ended.
         # conv.wait_for_session_end() # Avoid blocking the thread indefinitely unless necessary
-        print("ElevenLabs conversation session thread ended.")
+        conversation_logger.info("ElevenLabs conversation session thread ended.")
     except Exception as e:
-        print(f"Exception in conversation session thread: {e}")
+        conversation_logger.error("Exception in conversation session thread: %s", e)
         # Handle exceptions, e.g., set state to indicate error
 
 @app.websocket("/ws")
@@ -125,10 +151,15 @@ async def websocket_endpoint(websocket: WebSocket):
 async def read_root():
     return {"message": "Sola AI Chat Backend is running. Connect to /ws for conversation."}
 
-# Import the LangGraph pipeline for visualization
+# Rendered graph PNG: (rendered_at, png_bytes). The pipeline is static at runtime,
+# so re-rendering via mermaid on every request is wasted work.
+_GRAPH_PNG_CACHE: tuple[float, bytes] | None = None
+GRAPH_PNG_TTL = 60.0  # seconds
+
 def get_langgraph_png():
     try:
-        from backend.agents.langgraph_orchestrator import langgraph_pipeline
+        if langgraph_pipeline is None:
+            raise RuntimeError("LangGraph pipeline failed to import")
         graph = langgraph_pipeline.get_graph()
         png_bytes = graph.draw_mermaid_png()
         return png_bytes
@@ -148,23 +179,37 @@ async def get_graph_png():
     """
     Returns a PNG image of the current LangGraph pipeline for visualization.
     """
-    png_bytes = get_langgraph_png()
+    global _GRAPH_PNG_CACHE
+    if _GRAPH_PNG_CACHE and time.monotonic() - _GRAPH_PNG_CACHE[0] < GRAPH_PNG_TTL:
+        png_bytes = _GRAPH_PNG_CACHE[1]
+    else:
+        # Mermaid rendering blocks; keep it off the event loop
+        png_bytes = await asyncio.to_thread(get_langgraph_png)
+        _GRAPH_PNG_CACHE = (time.monotonic(), png_bytes)
     return StreamingResponse(io.BytesIO(png_bytes), media_type="image/png")
 
 async def shutdown_handler():
     """Gracefully shutdown background services"""
     print("Shutting down background services...")
     await background_service_manager.shutdown_all()
-
-def setup_signal_handlers():
-    """Setup signal handlers for graceful shutdown"""
-    def signal_handler(signum, frame):
-        print(f"Received signal {signum}, initiating shutdown...")
-        asyncio.create_task(shutdown_handler())
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
-
-setup_signal_handlers()
+    stop_log_listener()
+
+def _on_shutdown_signal(signum, previous_handler):
+    """Loop-level signal callback: schedule graceful shutdown, then defer to the server's handler."""
+    print(f"Received signal {signum}, initiating shutdown...")
+    asyncio.ensure_future(shutdown_handler())
+    # uvicorn installs its own SIGINT/SIGTERM handler; keep it in the chain so the server still exits
+    if callable(previous_handler):
+        previous_handler(signum, None)
+
+def setup_signal_handlers(loop: asyncio.AbstractEventLoop):
+    """Setup signal handlers for graceful shutdown (must run on the event loop thread)"""
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _on_shutdown_signal, sig, signal.getsignal(sig))
+        except (NotImplementedError, RuntimeError) as e:
+            # Windows loops and non-main threads (e.g. test clients) cannot install handlers
+            print(f"Signal handler for {sig} not installed: {e}")
 
 # ADD: New /health/memory endpoint
 @app.get("/health/memory", tags=["Health"])
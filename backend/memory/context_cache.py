@@ -0,0 +1,203 @@
+"""Context caches for MemoryContextBuilder.
+
+* :class:`AsyncLRUCache` – bounded LRU + TTL cache for coroutine results.
+  Concurrent ``get`` calls for a key that is still loading share the in-flight
+  load instead of starting their own, so two simultaneous turns with the same
+  prompt cost one memory search.
+* :class:`SemanticContextCache` – per-user nearest-neighbour lookup over recent
+  message embeddings, so paraphrases ("I feel anxious" / "I am anxious") reuse
+  a context built for the other.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLRUCache:
+    """Process-wide cache with O(1) LRU eviction, per-entry TTL and request merging.
+
+    With ``stale_ttl > 0`` entries are served stale-while-revalidate: for
+    ``stale_ttl`` seconds past ``ttl`` the old value is returned immediately
+    while one background load refreshes it, so no request pays a cold build
+    just because an entry expired.
+
+    Intended for use from a single event loop; there is no await between any
+    read and write of the internal maps, so no lock is needed.
+    """
+
+    def __init__(self, capacity: int, ttl: float, stale_ttl: float = 0.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        # key -> (stored_at, value)
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self._load_tasks: Set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def peek(self, key: Hashable, refresh: Optional[Callable[[], Awaitable[Any]]] = None) -> Any:
+        """Return the cached value for ``key`` or ``None`` (marks it recently used).
+
+        A stale value is only returned when ``refresh`` is given; the refresh
+        is then started in the background unless one is already running.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age >= self.ttl:
+            if age >= self.ttl + self.stale_ttl:
+                del self._data[key]
+                return None
+            if refresh is None:
+                return None
+            if key not in self._inflight:
+                task = asyncio.get_running_loop().create_task(self._load(key, refresh, self._claim(key)))
+                self._refresh_tasks.add(task)
+                task.add_done_callback(self._refresh_done)
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._data[key] = (time.monotonic(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.capacity:
+            self._data.popitem(last=False)
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+        # A load already running may have read the old state; don't let it store
+        self._inflight.pop(key, None)
+
+    def invalidate_prefix(self, prefix: str) -> int:
+        """Drop every (string) key starting with ``prefix``; returns how many entries went."""
+        stale = [key for key in self._data if isinstance(key, str) and key.startswith(prefix)]
+        for key in stale:
+            del self._data[key]
+        for key in [key for key in self._inflight if isinstance(key, str) and key.startswith(prefix)]:
+            del self._inflight[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for ``key``, running ``loader`` at most once on a miss.
+
+        Failed loads are not cached; callers merged onto a failed load see the
+        same exception. The load runs in its own task, so cancelling any caller,
+        including the one that started it, leaves the others waiting on it.
+        """
+        value = self.peek(key, refresh=loader)
+        if value is not None:
+            return value
+
+        pending = self._inflight.get(key)
+        if pending is None:
+            pending = self._claim(key)
+            task = asyncio.get_running_loop().create_task(self._load(key, loader, pending))
+            self._load_tasks.add(task)
+            task.add_done_callback(self._load_done)
+        # shield: a cancelled caller must not cancel the shared load
+        return await asyncio.shield(pending)
+
+    def _claim(self, key: Hashable) -> asyncio.Future:
+        """Register the in-flight future for ``key`` before any await (dedupes loads)."""
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    async def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], future: asyncio.Future) -> Any:
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        else:
+            future.set_result(value)
+            if self._inflight.get(key) is future:  # not invalidated while loading
+                self.set(key, value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _load_done(self, task: asyncio.Task) -> None:
+        self._load_tasks.discard(task)
+        if not task.cancelled():
+            task.exception()  # already delivered to the callers through the future
+
+    def _refresh_done(self, task: asyncio.Task) -> None:
+        self._refresh_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            # Keep serving the stale value until it ages out; next hit retries
+            logger.warning("Background cache refresh failed: %s", task.exception())
+
+
+class SemanticContextCache:
+    """Per-user cosine-similarity cache of recent contexts.
+
+    Each user keeps at most ``per_user_capacity`` ``(expires_at, unit_vector,
+    context)`` entries; a lookup is one dot product over that small matrix.
+    """
+
+    def __init__(self, per_user_capacity: int, ttl: float, threshold: float, max_users: int):
+        self.per_user_capacity = per_user_capacity
+        self.ttl = ttl
+        self.threshold = threshold
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, Deque[Tuple[float, np.ndarray, str]]]" = OrderedDict()
+
+    @staticmethod
+    def _unit(vector: Sequence[float]) -> Optional[np.ndarray]:
+        arr = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(arr))
+        return arr / norm if norm else None
+
+    def lookup(self, user_id: str, vector: Sequence[float]) -> Optional[str]:
+        entries = self._entries.get(user_id)
+        if not entries:
+            return None
+        now = time.monotonic()
+        while entries and entries[0][0] <= now:  # oldest first, so expired ones lead
+            entries.popleft()
+        query = self._unit(vector)
+        if not entries or query is None:
+            return None
+        scores = np.stack([entry[1] for entry in entries]) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+        self._entries.move_to_end(user_id)
+        return entries[best][2]
+
+    def invalidate(self, user_id: str) -> None:
+        self._entries.pop(user_id, None)
+
+    def add(self, user_id: str, vector: Sequence[float], context: str) -> None:
+        unit = self._unit(vector)
+        if unit is None:
+            return
+        entries = self._entries.get(user_id)
+        if entries is None:
+            entries = self._entries[user_id] = deque(maxlen=self.per_user_capacity)
+        entries.append((time.monotonic() + self.ttl, unit, context))
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
@@ -5,6 +5,11 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Turns below this combined length with no intimate signal ("ok", "yeah", "hmm")
+# are not worth an embedding + DB write.
+LOW_INTIMACY_SKIP_LEVEL = "low"
+LOW_INTIMACY_MAX_CHARS = 80
+
 class ConversationMemoryManager:
     def __init__(self, mem0_service: IntimateMemoryService):
         self.mem0_service = mem0_service
@@ -17,6 +22,14 @@ class ConversationMemoryManager:
         emotional_context: Dict = None
     ) -> Optional[str]:
         """Store conversation using coordinated memory operations"""
+        intimacy_level = self._assess_intimacy_level(user_message, ai_response)
+        if (
+            intimacy_level == LOW_INTIMACY_SKIP_LEVEL
+            and not emotional_context
+            and len(user_message) + len(ai_response) < LOW_INTIMACY_MAX_CHARS
+        ):
+            logger.debug(f"Skipping low-signal memory storage for user {user_id}")
+            return None
         conversation_messages = [
             {"role": "user", "content": user_message},
             {"role": "assistant", "content": ai_response}
@@ -26,7 +39,7 @@ class ConversationMemoryManager:
             "timestamp": datetime.now().isoformat(),
             "conversation_type": "intimate_companion",
             "emotional_context": emotional_context or {},
-            "intimacy_level": self._assess_intimacy_level(user_message, ai_response)
+            "intimacy_level": intimacy_level
         }
         try:
             # Use memory coordinator instead of direct storage
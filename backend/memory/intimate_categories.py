@@ -1,3 +1,12 @@
+import re
+import sys
+from typing import Dict, Set
+
+try:
+    import ahocorasick  # optional C automaton (pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
 INTIMATE_MEMORY_CATEGORIES = {
     "emotional_patterns": {
         "description": "User's emotional states, triggers, and coping mechanisms",
@@ -20,3 +29,63 @@ INTIMATE_MEMORY_CATEGORIES = {
         "examples": ["opened up about childhood fears", "celebrated small victory together"]
     }
 }
+
+# ---------------------------------------------------------------------------
+# Fast category tagging
+# ---------------------------------------------------------------------------
+# Example phrases are flattened once at import into a keyword -> category map.
+# Short words and words shared by several categories carry no signal and are
+# dropped so a match always points at exactly one category.
+_MIN_KEYWORD_LEN = 4
+_WORD_RE = re.compile(r"\w+")
+
+
+def _build_keyword_index() -> Dict[str, str]:
+    owners: Dict[str, Set[str]] = {}
+    for category, meta in INTIMATE_MEMORY_CATEGORIES.items():
+        for phrase in meta["examples"]:
+            for word in _WORD_RE.findall(phrase.lower()):
+                if len(word) >= _MIN_KEYWORD_LEN:
+                    owners.setdefault(word, set()).add(category)
+    return {
+        sys.intern(word): sys.intern(next(iter(categories)))
+        for word, categories in owners.items()
+        if len(categories) == 1
+    }
+
+
+_KEYWORD_TO_CATEGORY: Dict[str, str] = _build_keyword_index()
+
+if ahocorasick is not None:
+    CATEGORY_AC = ahocorasick.Automaton()
+    for _keyword, _category in _KEYWORD_TO_CATEGORY.items():
+        CATEGORY_AC.add_word(_keyword, (len(_keyword), _category))
+    CATEGORY_AC.make_automaton()
+else:
+    CATEGORY_AC = None
+
+
+def classify(text: str) -> Set[str]:
+    """Return the intimate memory categories whose keywords occur in ``text``.
+
+    Uses a single Aho-Corasick pass when ``pyahocorasick`` is installed and a
+    tokenised dict lookup otherwise; both only match whole words.
+    """
+    lowered = text.lower()
+    if CATEGORY_AC is None:
+        return {
+            _KEYWORD_TO_CATEGORY[word]
+            for word in _WORD_RE.findall(lowered)
+            if word in _KEYWORD_TO_CATEGORY
+        }
+
+    categories: Set[str] = set()
+    text_len = len(lowered)
+    for end, (length, category) in CATEGORY_AC.iter(lowered):
+        start = end - length + 1
+        if start > 0 and lowered[start - 1].isalnum():
+            continue
+        if end + 1 < text_len and lowered[end + 1].isalnum():
+            continue
+        categories.add(category)
+    return categories
@@ -1,14 +1,349 @@
 import os
 import asyncio
-from typing import Dict, List, Optional, ClassVar
+import copy
+import hashlib
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, ClassVar, Tuple
 import logging
+import threading
+import types
+import httpx
+import orjson
+from cachetools import LRUCache, TTLCache
 from urllib.parse import urlparse
 from mem0 import AsyncMemory
 from mem0.configs.base import MemoryConfig
 from config import NEO4J_CONFIG
+from .search_coalescer import SearchCoalescer
 
 logger = logging.getLogger(__name__)
 
+# Search-result cache: a hit skips the embedding call + pgvector ANN + graph hop entirely.
+SEARCH_CACHE_MAXSIZE = int(os.getenv("MEMORY_SEARCH_CACHE_SIZE", "4096"))
+SEARCH_CACHE_TTL = int(os.getenv("MEMORY_SEARCH_CACHE_TTL", "60"))  # seconds
+
+SearchCacheKey = Tuple[str, bool, str, int]
+
+# Query embeddings are deterministic for the local model, so they are kept in a
+# plain LRU keyed on the query text.
+EMBEDDING_CACHE_SIZE = int(os.getenv("MEM0_EMBEDDING_CACHE_SIZE", "1024"))
+
+def _wrap_results(result: List) -> Dict:
+    # Mem0 returned a bare list of memories
+    return {"results": result}
+
+
+def _results_as_is(result: Dict) -> Dict:
+    # Mem0 returned {"results": [...], "relations": [...]}
+    return result
+
+
+def _no_results(result: Any) -> Dict:
+    return {"results": []}
+
+
+def _pick_result_wrapper(result: Any) -> Optional[Callable[[Any], Dict]]:
+    """Return the normalizer for Mem0's search return type.
+
+    Returns ``None`` for unknown shapes so the caller falls back to
+    :func:`_no_results` without latching, and the next call probes again.
+    """
+    if isinstance(result, list):
+        return _wrap_results
+    if isinstance(result, dict):
+        return _results_as_is
+    return None
+
+
+# Fixed query strings for the focused searches. They are identical across users,
+# so they are built once instead of re-formatted on every call.
+_TRUST_QUERY = "trust vulnerability sharing personal intimate connection growth"
+_REL_QUERY_SUFFIX = " relationship"
+_DEFAULT_EMOTION = "feelings"
+
+
+@lru_cache(maxsize=64)
+def _emotional_pattern_query(emotion: str) -> str:
+    return f"{emotion} emotion pattern coping support comfort"
+
+
+def _relationship_query(query: str, emotion_focus: Optional[str]) -> str:
+    return f"{query} {emotion_focus}{_REL_QUERY_SUFFIX}" if emotion_focus else query + _REL_QUERY_SUFFIX
+
+
+def _install_embedding_cache(memory: "AsyncMemory", cache: LRUCache, lock: threading.Lock) -> None:
+    """Serve Mem0's search-time ``embed`` calls from ``cache`` when possible.
+
+    Mem0 embeds the query inside ``search`` (on a worker thread) and offers no
+    way to pass a precomputed vector, so the embedder's bound ``embed`` is
+    wrapped instead. Vectors put in ``cache`` by :pymeth:`IntimateMemoryService._embed_many`
+    are then picked up without another model pass.
+    """
+    embedder = getattr(memory, "embedding_model", None)
+    if embedder is None:
+        return
+    embed = embedder.embed
+
+    def cached_embed(text, memory_action=None):
+        if memory_action != "search":
+            return embed(text, memory_action)
+        with lock:
+            vector = cache.get(text)
+        if vector is None:
+            vector = embed(text, memory_action)
+            with lock:
+                cache[text] = vector
+        return vector
+
+    embedder.embed = cached_embed
+
+
+# Planner settings for Mem0's pgvector session. Every search is
+# ``WHERE user_id = $1 ORDER BY embedding <=> $2 LIMIT k``: bitmap scans would
+# materialise rows and lose HNSW ordering, and JIT start-up dominates such short
+# queries. Mem0 keeps one long-lived connection, so these are applied once per
+# session rather than as a per-query SET LOCAL (which would cost a round-trip each).
+PGVECTOR_SESSION_SETTINGS = (
+    "SET enable_bitmapscan = off",
+    f"SET hnsw.ef_search = {int(os.getenv('MEM0_HNSW_EF_SEARCH', '40'))}",
+    "SET jit = off",
+)
+
+
+def _tune_vector_store_session(memory: "AsyncMemory") -> None:
+    """Apply :data:`PGVECTOR_SESSION_SETTINGS` to Mem0's pgvector connection."""
+    conn = getattr(getattr(memory, "vector_store", None), "conn", None)
+    if conn is None:
+        return
+    try:
+        with conn.cursor() as cur:
+            for statement in PGVECTOR_SESSION_SETTINGS:
+                cur.execute(statement)
+        conn.commit()
+        logger.info("pgvector session tuned: %s", "; ".join(PGVECTOR_SESSION_SETTINGS))
+    except Exception as e:
+        conn.rollback()
+        logger.warning("Could not apply pgvector session settings: %s", e)
+
+
+def _use_orjson_for_jsonb(memory: "AsyncMemory") -> None:
+    """Parse ``payload`` jsonb columns with orjson on Mem0's pgvector connection.
+
+    psycopg2 decodes every jsonb value it fetches with stdlib ``json.loads``;
+    each search returns ``k`` payload dicts, so this is pure parsing time on the
+    search path. Registered per connection, so nothing else in the process changes.
+    """
+    conn = getattr(getattr(memory, "vector_store", None), "conn", None)
+    if conn is None:
+        return
+    try:
+        from psycopg2.extras import register_default_jsonb
+
+        register_default_jsonb(conn_or_curs=conn, loads=orjson.loads)
+    except Exception as e:
+        logger.warning("Keeping stdlib json for pgvector payloads: %s", e)
+
+
+# Mem0 keeps every user's memories in one table and filters on
+# ``payload->>'user_id'``. HNSW ignores that predicate, so a small user's rows
+# are found by discarding most of the global top-ef candidates. The btree
+# (USER_FILTER_INDEX_SQL, applied once out of band, outside a transaction) lets
+# the planner switch to an exact per-user scan when the user has few rows, and
+# pgvector >= 0.8 iterative scans keep walking the graph until ``k`` rows pass
+# the filter instead of returning short result sets.
+MEM0_COLLECTION = "mem0_384"
+MEM0_EMBEDDING_DIMS = 384
+USER_FILTER_INDEX_SQL = f"""
+CREATE INDEX CONCURRENTLY IF NOT EXISTS {MEM0_COLLECTION}_user_id_idx ON {MEM0_COLLECTION} ((payload->>'user_id'));
+"""
+HNSW_ITERATIVE_SCAN_SETTING = "SET hnsw.iterative_scan = relaxed_order"
+
+
+def _enable_iterative_hnsw_scan(memory: "AsyncMemory") -> None:
+    """Let filtered HNSW searches keep scanning until enough rows match."""
+    conn = getattr(getattr(memory, "vector_store", None), "conn", None)
+    if conn is None:
+        return
+    try:
+        with conn.cursor() as cur:
+            cur.execute(HNSW_ITERATIVE_SCAN_SETTING)
+        conn.commit()
+    except Exception as e:  # pgvector < 0.8
+        conn.rollback()
+        logger.warning("Skipping pgvector statement %r: %s", HNSW_ITERATIVE_SCAN_SETTING, e)
+
+
+# Half-precision ANN: an HNSW index over ``vector::halfvec`` (pgvector >= 0.7) is
+# half the size of the float32 one, so it stays in Supabase's buffer cache and each
+# distance computation touches half the bytes. Stored vectors stay float32; only
+# the index and the query-side comparison are fp16. Opt-in: the index is built
+# once out of band (HALFVEC_INDEX_SQL, run outside a transaction), never at
+# startup, since an HNSW build over the whole table takes minutes.
+HALFVEC_SEARCH_ENABLED = os.getenv("MEM0_HALFVEC_SEARCH", "false").lower() == "true"
+HALFVEC_INDEX_NAME = f"{MEM0_COLLECTION}_halfvec_hnsw"
+HALFVEC_INDEX_SQL = f"""
+CREATE INDEX CONCURRENTLY IF NOT EXISTS {HALFVEC_INDEX_NAME} ON {MEM0_COLLECTION}
+    USING hnsw ((vector::halfvec({MEM0_EMBEDDING_DIMS})) halfvec_cosine_ops);
+"""
+
+
+def _halfvec_search(self, query, vectors, limit=5, filters=None):
+    """Drop-in for Mem0's ``PGVector.search`` ordering by the halfvec expression index."""
+    from mem0.vector_stores.pgvector import OutputData
+
+    filter_conditions = []
+    filter_params = []
+    if filters:
+        for k, v in filters.items():
+            filter_conditions.append("payload->>%s = %s")
+            filter_params.extend([k, str(v)])
+    filter_clause = "WHERE " + " AND ".join(filter_conditions) if filter_conditions else ""
+
+    dims = MEM0_EMBEDDING_DIMS
+    self.cur.execute(
+        f"""
+        SELECT id, vector::halfvec({dims}) <=> %s::halfvec({dims}) AS distance, payload
+        FROM {self.collection_name}
+        {filter_clause}
+        ORDER BY distance
+        LIMIT %s
+        """,
+        (vectors, *filter_params, limit),
+    )
+    return [OutputData(id=str(r[0]), score=float(r[1]), payload=r[2]) for r in self.cur.fetchall()]
+
+
+def _enable_halfvec_search(memory: "AsyncMemory") -> None:
+    """Route Mem0's searches through the halfvec HNSW index, if it has been built."""
+    store = getattr(memory, "vector_store", None)
+    conn = getattr(store, "conn", None)
+    if conn is None:
+        return
+    # Catalog lookup only; without the index the halfvec ORDER BY would be a full scan
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (HALFVEC_INDEX_NAME,))
+            index = cur.fetchone()[0]
+        conn.commit()
+    except Exception as e:
+        conn.rollback()
+        logger.warning("halfvec index check failed, keeping float32 search: %s", e)
+        return
+    if index is None:
+        logger.warning(
+            "MEM0_HALFVEC_SEARCH is set but %s does not exist; keeping float32 search. "
+            "Apply HALFVEC_INDEX_SQL from memory/mem0_async_service.py to fix.",
+            HALFVEC_INDEX_NAME,
+        )
+        return
+    store.search = types.MethodType(_halfvec_search, store)
+    logger.info("pgvector searches use the halfvec HNSW index on %s", store.collection_name)
+
+# Request coalescing for pgvector searches (see search_coalescer). Only pays off
+# with several concurrent turns, so it is off by default.
+SEARCH_COALESCE_ENABLED = os.getenv("MEM0_SEARCH_COALESCE", "false").lower() == "true"
+SEARCH_COALESCE_WINDOW = int(os.getenv("MEM0_SEARCH_COALESCE_MS", "5")) / 1000
+
+
+def _enable_search_coalescing(memory: "AsyncMemory") -> None:
+    store = getattr(memory, "vector_store", None)
+    if getattr(store, "conn", None) is None:
+        return
+    uses_halfvec = getattr(store.search, "__func__", None) is _halfvec_search
+    store.search = SearchCoalescer(
+        store,
+        window_seconds=SEARCH_COALESCE_WINDOW,
+        halfvec_dims=MEM0_EMBEDDING_DIMS if uses_halfvec else None,
+    ).search
+    logger.info("pgvector search coalescing enabled (%.0f ms window)", SEARCH_COALESCE_WINDOW * 1000)
+
+
+# Mem0 calls OpenAI with a sync client from worker threads; one shared HTTP/2
+# client multiplexes concurrent extraction/graph calls over a single warm TLS
+# session instead of queueing them behind HTTP/1.1 keep-alive connections.
+OPENAI_HTTP_CLIENT = httpx.Client(
+    http2=True,
+    timeout=httpx.Timeout(30.0, connect=10.0),
+    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+)
+
+
+def _use_shared_openai_transport(llm) -> None:
+    """Rebind a Mem0 OpenAI LLM's client onto :data:`OPENAI_HTTP_CLIENT`."""
+    client = getattr(llm, "client", None)
+    if client is None or not hasattr(client, "with_options"):
+        return
+    llm.client = client.with_options(http_client=OPENAI_HTTP_CLIENT)
+
+# Environment is read once per process
+SUPABASE_CONNECTION_STRING = os.getenv("SUPABASE_CONNECTION_STRING")
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+MEM0_LLM_MODEL = os.getenv("OPEN_AI_MEM0_MODEL", "gpt-4o-mini")
+
+
+def _build_config(with_graph: bool = True) -> Optional[MemoryConfig]:
+    """Build the Mem0 config (URL parsing + pydantic validation) once per process.
+
+    Returns ``None`` when the Supabase connection string is missing so that the
+    module stays importable; instantiating the service then raises. With
+    ``with_graph=False`` the Neo4j graph store is left out, so ``AsyncMemory``
+    built from it opens no Neo4j connection.
+    """
+    if not SUPABASE_CONNECTION_STRING:
+        return None
+
+    # Parse the connection string to build a component-based config
+    parsed_url = urlparse(SUPABASE_CONNECTION_STRING)
+
+    vector_store_config = {
+        "provider": "pgvector",
+        "config": {
+            "user": parsed_url.username,
+            "password": parsed_url.password,
+            "host": parsed_url.hostname,
+            "port": parsed_url.port,
+            "dbname": parsed_url.path.lstrip('/'),
+            # Use dedicated 384-dim table; avoid dots to keep SQL valid
+            "collection_name": MEM0_COLLECTION,
+            "embedding_model_dims": MEM0_EMBEDDING_DIMS,
+            "diskann": False,
+            "hnsw": True,
+        },
+    }
+
+    # Graph store configuration (Neo4j)
+    graph_store_config = {
+        "provider": "neo4j",
+        "config": {
+            "url": NEO4J_CONFIG.get("uri"),
+            "username": NEO4J_CONFIG.get("username"),
+            "password": NEO4J_CONFIG.get("password"),
+            "database": NEO4J_CONFIG.get("database", "neo4j"),
+            "base_label": False,
+        },
+    }
+
+    graph_kwargs = {"graph_store": graph_store_config} if with_graph else {}
+
+    return MemoryConfig(
+        vector_store=vector_store_config,
+        **graph_kwargs,
+        llm={
+            "provider": "openai",
+            "config": {
+                "api_key": OPENAI_API_KEY,
+                "model": MEM0_LLM_MODEL
+            }
+        },
+        embedder={
+            "provider": "huggingface",
+            "config": {
+                "model": "sentence-transformers/all-MiniLM-L6-v2",
+            },
+        },
+        version="v1.1",
+    )
+
 class IntimateMemoryService:
     """Singleton wrapper around **Mem0 AsyncMemory**.
 
@@ -20,8 +355,19 @@ class IntimateMemoryService:
 
     # --- Class-level singletons ------------------------------------------------
     _instance: ClassVar["IntimateMemoryService | None"] = None
-    _memory_instance: ClassVar[Optional[AsyncMemory]] = None  # Mem0 client
+    _memory_instance: ClassVar[Optional[AsyncMemory]] = None  # Mem0 client, vector-only
+    _graph_memory_instance: ClassVar[Optional[AsyncMemory]] = None  # same components + Neo4j graph
     _init_lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+    _ready_event: ClassVar[asyncio.Event] = asyncio.Event()  # set once AsyncMemory is built
+    _graph_lock: ClassVar[asyncio.Lock] = asyncio.Lock()
+    _graph_ready_event: ClassVar[asyncio.Event] = asyncio.Event()  # set once the graph store is attached
+    _CONFIG: ClassVar[Optional[MemoryConfig]] = _build_config()
+    _VECTOR_CONFIG: ClassVar[Optional[MemoryConfig]] = _build_config(with_graph=False)
+    # Shared with the worker threads Mem0 embeds on, hence the threading lock
+    _embedding_cache: ClassVar[LRUCache] = LRUCache(maxsize=EMBEDDING_CACHE_SIZE)
+    _embedding_lock: ClassVar[threading.Lock] = threading.Lock()
+    # Called with the user_id after every successful write (see add_write_listener)
+    _write_listeners: ClassVar[List[Callable[[str], None]]] = []
 
     # -------------------------------------------------------------------------
     def __new__(cls, *args, **kwargs):  # noqa: D401 – simple singleton guard
@@ -33,111 +379,330 @@ class IntimateMemoryService:
         # Prevent re-running init on subsequent instantiations
         if getattr(self, "_initialized", False):
             return
+        if self._CONFIG is None:
+            raise ValueError("SUPABASE_CONNECTION_STRING environment variable not set.")
 
         self._initialized = True
 
-        # Defer AsyncMemory creation – just build config here
+        # Defer AsyncMemory creation – config is built once at import (_CONFIG)
         # NOTE: Instance attributes access class variables for backwards compat
         self.memory: Optional[AsyncMemory] = None  # alias to _memory_instance later
-        
-        # Parse the connection string to build a component-based config
-        connection_string = os.getenv("SUPABASE_CONNECTION_STRING")
-        if not connection_string:
-            raise ValueError("SUPABASE_CONNECTION_STRING environment variable not set.")
-            
-        parsed_url = urlparse(connection_string)
-        
-        vector_store_config = {
-            "provider": "pgvector",
-            "config": {
-                "user": parsed_url.username,
-                "password": parsed_url.password,
-                "host": parsed_url.hostname,
-                "port": parsed_url.port,
-                "dbname": parsed_url.path.lstrip('/'),
-                # Use dedicated 384-dim table; avoid dots to keep SQL valid
-                "collection_name": "mem0_384",
-                "embedding_model_dims": 384,
-                "diskann": False,
-                "hnsw": True,
-            },
-        }
+        self.graph_memory: Optional[AsyncMemory] = None  # alias to _graph_memory_instance later
 
-        # Graph store configuration (Neo4j)
-        graph_store_config = {
-            "provider": "neo4j",
-            "config": {
-                "url": NEO4J_CONFIG.get("uri"),
-                "username": NEO4J_CONFIG.get("username"),
-                "password": NEO4J_CONFIG.get("password"),
-                "database": NEO4J_CONFIG.get("database", "neo4j"),
-                "base_label": False,
-            },
-        }
-
-        self.config = MemoryConfig(
-            vector_store=vector_store_config,
-            graph_store=graph_store_config,
-            llm={
-                "provider": "openai",
-                "config": {
-                    "api_key": os.getenv("OPENAI_API_KEY"),
-                    "model": os.getenv("OPEN_AI_MEM0_MODEL", "gpt-4o-mini")
-                }
-            },
-            embedder={
-                "provider": "huggingface",
-                "config": {
-                    "model": "sentence-transformers/all-MiniLM-L6-v2",
-                },
-            },
-            version="v1.1",
-        )
+        # (user_id, use_graph, query digest, limit) -> normalized search result. All
+        # access happens on the event loop with no await between read and write, so no lock.
+        self._search_cache: TTLCache = TTLCache(maxsize=SEARCH_CACHE_MAXSIZE, ttl=SEARCH_CACHE_TTL)
+        # user_id -> invalidation count; a search only stores its result if the
+        # count did not move while it ran. Bounded like the cache itself.
+        self._search_generations: LRUCache = LRUCache(maxsize=SEARCH_CACHE_MAXSIZE)
+        # Set from the first Mem0 search result (see _pick_result_wrapper)
+        self._result_wrapper: Optional[Callable[[Any], Dict]] = None
+        self.config = self._CONFIG
 
     async def _ensure_memory_initialized(self):
-        """Thread-safe lazy construction of :pyclass:`mem0.AsyncMemory`."""
+        """Thread-safe lazy construction of :pyclass:`mem0.AsyncMemory`.
+
+        The client is built vector-only; the Neo4j graph store is attached
+        separately by :pymeth:`_ensure_graph_initialized` the first time a
+        graph-backed path needs it.
+        """
+
+        # Fast path once warm: one attribute read, no lock, no class indirection
+        if self.memory is not None:
+            return
 
-        if self.__class__._memory_instance is None:
-            async with self.__class__._init_lock:
-                if self.__class__._memory_instance is None:
+        cls = self.__class__
+        if not cls._ready_event.is_set():
+            # Lock is only ever contended while the client is being built
+            async with cls._init_lock:
+                if not cls._ready_event.is_set():
                     logger.info("Initializing AsyncMemory singleton with component-based config …")
-                    self.__class__._memory_instance = AsyncMemory(config=self.config)
+                    cls._memory_instance = AsyncMemory(config=self._VECTOR_CONFIG)
+                    _install_embedding_cache(cls._memory_instance, cls._embedding_cache, cls._embedding_lock)
+                    _tune_vector_store_session(cls._memory_instance)
+                    _use_orjson_for_jsonb(cls._memory_instance)
+                    _enable_iterative_hnsw_scan(cls._memory_instance)
+                    _use_shared_openai_transport(getattr(cls._memory_instance, "llm", None))
+                    if HALFVEC_SEARCH_ENABLED:
+                        _enable_halfvec_search(cls._memory_instance)
+                    if SEARCH_COALESCE_ENABLED:
+                        _enable_search_coalescing(cls._memory_instance)
+                    cls._ready_event.set()
                     logger.info("✅ AsyncMemory singleton initialised.")
 
         # Keep instance attribute in sync for legacy callers
-        self.memory = self.__class__._memory_instance
+        self.memory = cls._memory_instance
+
+    async def _ensure_graph_initialized(self):
+        """Build the graph-enabled view of the shared client on first use.
+
+        Mem0 consults ``enable_graph`` on every call, so the graph is not
+        attached to ``self.memory``: that would send every later search to
+        Neo4j too. ``self.graph_memory`` is a shallow copy sharing the vector
+        store, embedder and LLM, with the graph store added; writes and the
+        relationship / emotional / trust searches go through it, plain
+        searches stay vector-only.
+        """
+        if self.graph_memory is not None:
+            return
+        await self._ensure_memory_initialized()
 
-    async def search_intimate_memories(self, query: str, user_id: str, limit: int = 5) -> Dict:
-        """Search for emotionally relevant memories"""
+        cls = self.__class__
+        if not cls._graph_ready_event.is_set():
+            async with cls._graph_lock:
+                if not cls._graph_ready_event.is_set():
+                    from mem0.memory.graph_memory import MemoryGraph
+
+                    logger.info("Attaching Neo4j graph store to AsyncMemory …")
+                    # MemoryGraph connects synchronously; keep the handshake off the loop
+                    graph = await asyncio.to_thread(MemoryGraph, self.config)
+                    _use_shared_openai_transport(getattr(graph, "llm", None))
+                    graph_memory = copy.copy(cls._memory_instance)
+                    graph_memory.graph = graph
+                    graph_memory.enable_graph = True
+                    cls._graph_memory_instance = graph_memory
+                    cls._graph_ready_event.set()
+                    logger.info("✅ Graph store attached.")
+
+        self.graph_memory = cls._graph_memory_instance
+
+    async def _embed_many(self, queries: List[str]) -> None:
+        """Embed all uncached ``queries`` in one batched model call.
+
+        The vectors land in the embedding cache, so the searches that follow
+        skip their own per-query encode.
+        """
+        await self._ensure_memory_initialized()
+        cls = self.__class__
+        with cls._embedding_lock:
+            missing = [q for q in dict.fromkeys(queries) if q not in cls._embedding_cache]
+        model = getattr(getattr(self.memory, "embedding_model", None), "model", None)
+        if not missing or not hasattr(model, "encode"):
+            return
+        vectors = await asyncio.to_thread(model.encode, missing, convert_to_numpy=True)
+        with cls._embedding_lock:
+            for query, vector in zip(missing, vectors):
+                cls._embedding_cache[query] = vector.tolist()
+
+    async def embed_query(self, text: str) -> Optional[List[float]]:
+        """Search-time embedding of ``text`` (cached), or ``None`` if unavailable.
+
+        Goes through the same cache Mem0's search reads, so a subsequent search
+        for ``text`` does not re-encode it.
+        """
         try:
-            await self._ensure_memory_initialized()
-            logger.info(f"🔍 [DEBUG] Searching with query: '{query}' for user: {user_id}")
+            await self._embed_many([text])
+        except Exception as e:
+            logger.warning("Query embedding failed: %s", e)
+            return None
+        cls = self.__class__
+        with cls._embedding_lock:
+            return cls._embedding_cache.get(text)
+
+    @staticmethod
+    def _spec_query(spec: Dict) -> str:
+        """Query string a :pymeth:`search_batch` spec will be embedded with."""
+        kind = spec["kind"]
+        if kind == "general":
+            return spec["query"]
+        if kind == "relationship":
+            return _relationship_query(spec["query"], spec.get("emotion"))
+        if kind == "pattern":
+            return _emotional_pattern_query(spec.get("emotion") or _DEFAULT_EMOTION)
+        if kind == "trust":
+            return _TRUST_QUERY
+        raise ValueError(f"Unknown search kind: {kind!r}")
+
+    async def prime_query_embeddings(self, queries: List[str]) -> None:
+        """Batch-embed ``queries`` ahead of a fan-out of searches (best effort)."""
+        try:
+            await self._embed_many(queries)
+        except Exception as e:
+            logger.warning("Batched query embedding failed, searches will embed individually: %s", e)
+
+    async def search_batch(
+        self,
+        user_id: str,
+        specs: List[Dict],
+        *,
+        timeout: Optional[float] = None,
+    ) -> List[Dict]:
+        """Run several searches for one user as a single batch.
+
+        Each spec is ``{"kind": "general" | "relationship" | "pattern" | "trust",
+        "query": ..., "emotion": ..., "limit": ...}``. Mem0 has no batch search
+        endpoint, so all queries are embedded in one model pass and the searches
+        then run concurrently (folded into one SQL statement when search
+        coalescing is on). Results come back in spec order; a search that fails
+        or exceeds ``timeout`` yields ``{"results": []}``. ``timeout`` bounds the
+        whole batch, embedding included.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        try:
+            await asyncio.wait_for(
+                self.prime_query_embeddings([self._spec_query(spec) for spec in specs]),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Batched query embedding timed out for %s", user_id)
+
+        searches = []
+        for spec in specs:
+            kind, limit, emotion = spec["kind"], spec.get("limit", 3), spec.get("emotion")
+            if kind == "relationship":
+                searches.append(self.search_relationship_context(spec["query"], user_id, emotion, limit))
+            elif kind == "pattern":
+                searches.append(self.search_emotional_patterns(user_id, emotion, limit))
+            elif kind == "trust":
+                searches.append(self.search_trust_evolution(user_id, limit))
+            else:
+                searches.append(self.search_intimate_memories(query=spec["query"], user_id=user_id, limit=limit))
+
+        # Searches only get what the embedding pass left of the budget
+        remaining = None if deadline is None else max(0.0, deadline - loop.time())
+        results = await asyncio.gather(
+            *(asyncio.wait_for(search, timeout=remaining) for search in searches),
+            return_exceptions=True,
+        )
+        batch = []
+        for spec, result in zip(specs, results):
+            if isinstance(result, BaseException):
+                logger.warning("%s search failed for %s: %r", spec["kind"], user_id, result)
+                result = {"results": []}
+            batch.append(result)
+        return batch
+
+    async def warmup(self) -> None:
+        """Build AsyncMemory eagerly (call from app startup) so no request pays the 1-3 s cold init."""
+        await self._ensure_memory_initialized()
+
+    @staticmethod
+    def _search_cache_key(query: str, user_id: str, limit: int, use_graph: bool) -> SearchCacheKey:
+        digest = hashlib.blake2b(query.strip().lower().encode(), digest_size=16).hexdigest()
+        return (user_id, use_graph, digest, limit)
+
+    @classmethod
+    def add_write_listener(cls, listener: Callable[[str], None]) -> None:
+        """Register ``listener(user_id)`` to run on the event loop after a memory write.
+
+        Lets downstream caches (e.g. MemoryContextBuilder's) invalidate on change
+        instead of relying on a short TTL.
+        """
+        if listener not in cls._write_listeners:
+            cls._write_listeners.append(listener)
+
+    def _notify_memory_written(self, user_id: str) -> None:
+        self.invalidate_search_cache(user_id)
+        for listener in self._write_listeners:
+            try:
+                listener(user_id)
+            except Exception as e:
+                logger.warning("Memory write listener %r failed for %s: %s", listener, user_id, e)
+
+    def invalidate_search_cache(self, user_id: str) -> None:
+        """Drop cached search results for ``user_id`` (called after new memories are stored)."""
+        self._search_generations[user_id] = self._search_generations.get(user_id, 0) + 1
+        # Scan the cache rather than keep a per-user key index that TTL
+        # eviction would leave behind
+        for key in [key for key in self._search_cache if key[0] == user_id]:
+            self._search_cache.pop(key, None)
+
+    async def search_intimate_memories(
+        self,
+        query: str,
+        user_id: str,
+        limit: int = 5,
+        *,
+        use_graph: bool = False,
+    ) -> Dict:
+        """Search for emotionally relevant memories.
+
+        ``use_graph=True`` makes sure the Neo4j graph store is attached first
+        (used by the relationship / emotional / trust searches).
+        """
+        cache_key = self._search_cache_key(query, user_id, limit, use_graph)
+        cached = self._search_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Memory search cache hit for %s", user_id)
+            return cached
+        generation = self._search_generations.get(user_id, 0)
+        try:
+            if use_graph:
+                await self._ensure_graph_initialized()
+                memory = self.graph_memory
+            else:
+                await self._ensure_memory_initialized()
+                memory = self.memory
+            logger.info("🔍 [DEBUG] Searching with query: '%s' for user: %s", query, user_id)
             
             # Direct call to Mem0
-            result = await self.memory.search(query=query, user_id=user_id, limit=limit)
+            result = await memory.search(query=query, user_id=user_id, limit=limit)
             
             # DEBUG: Log the exact structure returned by Mem0
             #logger.info(f"🔍 [DEBUG] Raw Mem0 result type: {type(result)}")
             #logger.info(f"🔍 [DEBUG] Raw Mem0 result: {result}")
             
-            # Normalize the result format
-            if isinstance(result, list):
-                # If Mem0 returns a list directly
-                normalized_result = {"results": result}
-            elif isinstance(result, dict):
-                # If Mem0 returns a dict, use it as-is
-                normalized_result = result
-            else:
-                # Fallback
-                normalized_result = {"results": []}
+            # Normalize the result format; Mem0's return shape is fixed per
+            # version, so the wrapper is chosen on the first result and reused
+            wrap = self._result_wrapper
+            if wrap is None:
+                wrap = self._result_wrapper = _pick_result_wrapper(result)
+            normalized_result = wrap(result) if wrap is not None else _no_results(result)
             
-            logger.info(f"✅ Memory search successful for {user_id}: {len(normalized_result.get('results', []))} results")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "✅ Memory search successful for %s: %d results",
+                    user_id,
+                    len(normalized_result.get("results", [])),
+                )
+            # A write landed mid-search: this result may predate it
+            if self._search_generations.get(user_id, 0) == generation:
+                self._search_cache[cache_key] = normalized_result
             return normalized_result
             
         except Exception as e:
-            logger.error(f"❌ Mem0 search failed for {user_id}: {e}", exc_info=True)
+            logger.error("❌ Mem0 search failed for %s: %s", user_id, e, exc_info=True)
             return {"results": [], "error": str(e)}
 
+    # ------------------------------------------------------------------
+    # Focused searches (relationship / emotional / trust facets)
+    # ------------------------------------------------------------------
+    async def search_relationship_context(
+        self,
+        query: str,
+        user_id: str,
+        emotion_focus: Optional[str] = None,
+        limit: int = 3,
+    ) -> Dict:
+        """Search memories about how the relationship has developed around ``query``."""
+        return await self.search_intimate_memories(
+            query=_relationship_query(query, emotion_focus), user_id=user_id, limit=limit, use_graph=True
+        )
+
+    async def search_emotional_patterns(
+        self,
+        user_id: str,
+        current_emotion: Optional[str] = None,
+        limit: int = 3,
+    ) -> Dict:
+        """Search recurring emotional patterns and coping strategies."""
+        return await self.search_intimate_memories(
+            query=_emotional_pattern_query(current_emotion or _DEFAULT_EMOTION),
+            user_id=user_id,
+            limit=limit,
+            use_graph=True,
+        )
+
+    async def search_trust_evolution(self, user_id: str, limit: int = 3) -> Dict:
+        """Search trust milestones and vulnerable disclosures."""
+        return await self.search_intimate_memories(
+            query=_TRUST_QUERY,
+            user_id=user_id,
+            limit=limit,
+            use_graph=True,
+        )
+
     async def store_conversation_memory(
         self,
         messages: List[Dict],
@@ -147,17 +712,46 @@ class IntimateMemoryService:
         infer: bool = True,
     ) -> Dict:
         """Stores conversation history as a memory."""
-        await self._ensure_memory_initialized()
+        # Writes keep populating the graph, so the graph store must be attached
+        await self._ensure_graph_initialized()
         try:
-            logger.info(f"Storing conversation memory for {user_id}...")
-            result = await self.memory.add(
+            logger.info("Storing conversation memory for %s...", user_id)
+            result = await self.graph_memory.add(
                 messages,
                 user_id=user_id,
                 metadata=metadata,
                 infer=infer,
             )
-            logger.info(f"Successfully stored conversation memory for {user_id}: {result}")
+            logger.info("Successfully stored conversation memory for %s: %s", user_id, result)
+            self._notify_memory_written(user_id)
             return {"status": "success", "result": result}
         except Exception as e:
-            logger.error(f"Failed to store conversation memory for {user_id}: {e}")
+            logger.error("Failed to store conversation memory for %s: %s", user_id, e)
             return {"status": "error", "error": str(e)}
+
+    async def store_memory_facts(
+        self,
+        facts: List[str],
+        user_id: str,
+        metadata: Optional[Dict] = None,
+        *,
+        batch_size: int = 500,
+    ) -> Dict:
+        """Store atomic facts as individual memories using one ``add`` call per batch.
+
+        Each fact still gets its own embedding and row, but the batch travels in a
+        single Mem0 call instead of one call (and commit) per fact.
+        """
+        results = []
+        for start in range(0, len(facts), batch_size):
+            batch = facts[start:start + batch_size]
+            outcome = await self.store_conversation_memory(
+                messages=[{"role": "system", "content": fact} for fact in batch],
+                user_id=user_id,
+                metadata=metadata,
+                infer=False,  # direct insert, no extra LLM pass
+            )
+            if outcome.get("status") != "success":
+                return outcome
+            results.append(outcome["result"])
+        return {"status": "success", "result": results}
@@ -1,7 +1,12 @@
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache, partial
+import asyncio
 import time
 import hashlib
+import uuid
 from .mem0_async_service import IntimateMemoryService
+from .context_cache import AsyncLRUCache, SemanticContextCache
+from .search_batcher import SearchBatcher
 import logging
 
 # Graph query integration via ServiceRegistry to guarantee pooling
@@ -9,133 +14,486 @@ from services.service_registry import ServiceRegistry
 
 logger = logging.getLogger(__name__)
 
+# Shared by every MemoryContextBuilder in the process: bounded, and concurrent
+# identical requests are merged onto one in-flight build. These caches hold the
+# Mem0 section of a context only. Entries live until the user's memories change
+# (IntimateMemoryService write listener below, plus other workers' writes over
+# Redis pub/sub), with the TTL only as an upper bound; for a further 30 s an
+# expired section is served stale while it is rebuilt.
+CONTEXT_CACHE_CAPACITY = 10_000
+CONTEXT_CACHE_TTL = 600  # seconds
+CONTEXT_CACHE_STALE_TTL = 30  # seconds
+_CONTEXT_CACHE = AsyncLRUCache(
+    capacity=CONTEXT_CACHE_CAPACITY, ttl=CONTEXT_CACHE_TTL, stale_ttl=CONTEXT_CACHE_STALE_TTL
+)
+
+# Semantic tier behind the exact-match cache: a paraphrase of a recent message
+# (cosine >= threshold with the same MiniLM embeddings Mem0 uses) reuses its
+# context. The embedding is shared with Mem0's search via the query cache, so a
+# miss costs no extra model pass.
+SEMANTIC_CACHE_THRESHOLD = 0.92
+_SEMANTIC_CACHE = SemanticContextCache(
+    per_user_capacity=64,
+    ttl=CONTEXT_CACHE_TTL,
+    threshold=SEMANTIC_CACHE_THRESHOLD,
+    max_users=CONTEXT_CACHE_CAPACITY,
+)
+
+# Cache-miss searches from concurrent turns (any user) are collected for up to
+# 8 ms and sent to Mem0 as one batch; see memory/search_batcher.py.
+SEARCH_BATCH_MAX = 32
+SEARCH_BATCH_MAX_WAIT = 0.008  # seconds
+_SEARCH_BATCHER = SearchBatcher(max_batch=SEARCH_BATCH_MAX, max_wait=SEARCH_BATCH_MAX_WAIT)
+
+# Greetings/acknowledgements carry nothing to search on: they reuse the user's
+# latest context (or the generic one) without touching Mem0. Deliberately no
+# plain length cut-off, since one-word turns like "tired" or "sad" matter here.
+_TRIVIAL_MESSAGES = frozenset({
+    "hi", "hey", "hello", "yo", "sup", "ok", "okay", "k", "kk", "sure", "cool",
+    "thanks", "thank you", "thx", "ty", "lol", "haha", "hmm", "mm", "yes", "yeah",
+    "yep", "no", "nope", "bye", "good night", "gn",
+})
+_TRIVIAL_STRIP = " \t\n.!?,~"
+_LATEST_CONTEXT = AsyncLRUCache(capacity=CONTEXT_CACHE_CAPACITY, ttl=CONTEXT_CACHE_TTL)
+
+
+def _is_trivial_message(message: str) -> bool:
+    normalized = message.strip(_TRIVIAL_STRIP).lower()
+    return len(normalized) < 2 or normalized in _TRIVIAL_MESSAGES
+
+
+# Budget for the graph emotional-context hop that runs alongside the Mem0 search
+GRAPH_CONTEXT_TIMEOUT = 0.3  # seconds
+# The graph section is cached per user on its own. The subconscious processor and
+# graph builder write Neo4j without notifying the builder, so this short TTL
+# is what bounds how stale those lines can be.
+GRAPH_CONTEXT_TTL = 60  # seconds
+_GRAPH_SECTION_CACHE = AsyncLRUCache(capacity=CONTEXT_CACHE_CAPACITY, ttl=GRAPH_CONTEXT_TTL)
+
+# Optional Redis L2 behind the in-process L1, shared by all workers/replicas.
+# A short SET NX sentinel lets one worker build a context while the others
+# poll for its result instead of all hitting Mem0.
+REDIS_CONTEXT_PREFIX = "ctx:mem:"
+REDIS_BUILD_LOCK_PREFIX = "ctx:building:"
+REDIS_BUILD_LOCK_MS = 5000
+REDIS_WAIT_POLLS = 10
+REDIS_WAIT_INTERVAL = 0.05  # seconds
+# Backstop for the shared tier; writes retire its entries through the generation below
+REDIS_CONTEXT_TTL = 30  # seconds
+# Per-user generation, INCRed on every memory write and part of each Redis
+# context key, so a write retires the user's shared entries in every worker.
+# The counter outlives any entry written under it.
+REDIS_CONTEXT_GEN_PREFIX = "ctx:gen:"
+REDIS_CONTEXT_GEN_TTL = 86_400  # seconds
+# user_id -> in-flight generation bump; loads wait for it so this process
+# never reads the pre-write generation
+_GENERATION_BUMPS: Dict[str, asyncio.Task] = {}
+# Writes are also published as "<process id>:<user_id>" so every worker drops
+# its in-process sections. Until this process is subscribed, those sections
+# are held no longer than the Redis tier's entries.
+REDIS_INVALIDATION_CHANNEL = "ctx:invalidate"
+REDIS_SUBSCRIBE_MAX_BACKOFF = 30  # seconds
+_PROCESS_ID = uuid.uuid4().hex
+_INVALIDATION_TASK: Optional[asyncio.Task] = None
+
+
+def _set_local_ttl(ttl: float, stale_ttl: float) -> None:
+    _CONTEXT_CACHE.ttl = ttl
+    _CONTEXT_CACHE.stale_ttl = stale_ttl
+    _SEMANTIC_CACHE.ttl = ttl
+    _LATEST_CONTEXT.ttl = ttl
+
+
+def _invalidate_local(user_id: str) -> int:
+    dropped = _CONTEXT_CACHE.invalidate_prefix(f"{user_id}:")
+    _SEMANTIC_CACHE.invalidate(user_id)
+    _LATEST_CONTEXT.invalidate(user_id)
+    return dropped
+
+
+def _watch_invalidations(redis) -> None:
+    """Make sure this process is (re)subscribing to other workers' write notices."""
+    global _INVALIDATION_TASK
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Not subscribed yet; the first builder call on the loop starts it
+        _set_local_ttl(REDIS_CONTEXT_TTL, 0)
+        return
+    task = _INVALIDATION_TASK
+    if task is not None and not task.done() and task.get_loop() is loop:
+        return
+    _set_local_ttl(REDIS_CONTEXT_TTL, 0)
+    _INVALIDATION_TASK = loop.create_task(_subscribe_invalidations(redis))
+
+
+async def _subscribe_invalidations(redis) -> None:
+    backoff = 1.0
+    while True:
+        pubsub = redis.pubsub()
+        try:
+            await pubsub.subscribe(REDIS_INVALIDATION_CHANNEL)
+            _set_local_ttl(CONTEXT_CACHE_TTL, CONTEXT_CACHE_STALE_TTL)
+            backoff = 1.0
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                origin, _, user_id = message["data"].partition(":")
+                if origin != _PROCESS_ID and user_id:
+                    _invalidate_local(user_id)
+        except Exception as e:
+            logger.warning("Context invalidation subscription lost: %s", e)
+        finally:
+            # Notices may be missed until the next subscribe
+            _set_local_ttl(REDIS_CONTEXT_TTL, 0)
+            try:
+                await pubsub.reset()
+            except Exception:
+                pass
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, REDIS_SUBSCRIBE_MAX_BACKOFF)
+
+
+def _on_memory_written(user_id: str) -> None:
+    """Drop the user's cached memory sections once Mem0 has a new memory for them."""
+    dropped = _invalidate_local(user_id)
+    logger.debug("Invalidated %d cached contexts for %s after a memory write", dropped, user_id)
+
+    redis = ServiceRegistry.get_redis_client()
+    if redis is None:
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    task = loop.create_task(_publish_memory_write(redis, user_id))
+    _GENERATION_BUMPS[user_id] = task
+    task.add_done_callback(partial(_generation_bump_done, user_id))
+
+
+async def _publish_memory_write(redis, user_id: str) -> None:
+    key = REDIS_CONTEXT_GEN_PREFIX + user_id
+    try:
+        await redis.incr(key)
+        await redis.expire(key, REDIS_CONTEXT_GEN_TTL)
+        await redis.publish(REDIS_INVALIDATION_CHANNEL, f"{_PROCESS_ID}:{user_id}")
+    except Exception as e:
+        logger.warning("Could not retire Redis contexts for %s: %s", user_id, e)
+
+
+def _generation_bump_done(user_id: str, task: asyncio.Task) -> None:
+    if _GENERATION_BUMPS.get(user_id) is task:
+        del _GENERATION_BUMPS[user_id]
+
+
+IntimateMemoryService.add_write_listener(_on_memory_written)
+
 class MemoryContextBuilder:
-    def __init__(self, mem0_service: IntimateMemoryService):
+    def __init__(self, mem0_service: IntimateMemoryService, redis_client=None):
         self.mem0_service = mem0_service
-        self.graph_query_service = ServiceRegistry.get_graph_service()
-        # 🎯 NEW: simple in-memory cache to avoid redundant searches during an active conversation
-        self.search_cache: Dict[str, Dict] = {}
-        self.cache_ttl: int = 30  # seconds
+        self._graph_query_service = None  # resolved on first use; see graph_query_service
+        self.redis = redis_client if redis_client is not None else ServiceRegistry.get_redis_client()
+        if self.redis is not None:
+            _watch_invalidations(self.redis)
+        # Per-facet budget for the parallel builder; a slow graph hop is dropped, not awaited
+        self.parallel_search_timeout: float = 0.4  # seconds
+
+    @property
+    def graph_query_service(self):
+        """Registry's GraphQueryService, looked up on first use so building a
+        MemoryContextBuilder does not import the Neo4j stack."""
+        if self._graph_query_service is None:
+            self._graph_query_service = ServiceRegistry.get_graph_service()
+        return self._graph_query_service
+
+    @graph_query_service.setter
+    def graph_query_service(self, service) -> None:
+        self._graph_query_service = service
 
     async def build_intimate_context(self, current_message: str, user_id: str) -> str:
         """Build memory-informed context for intimate responses"""
+        if self.redis is not None:
+            _watch_invalidations(self.redis)
         try:
+            if _is_trivial_message(current_message):
+                logger.info("💤 Trivial message from %s, skipping memory search", user_id)
+                # No Mem0 or Neo4j round-trip: whatever is cached for the user, if anything
+                return _assemble_context(
+                    _LATEST_CONTEXT.peek(user_id) or "", _GRAPH_SECTION_CACHE.peek(user_id) or ""
+                )
+
             # --- CACHE CHECK --------------------------------------------------
-            cache_key = f"{user_id}:{hashlib.md5(current_message.encode()).hexdigest()}"
-            cache_entry = self.search_cache.get(cache_key)
-            if cache_entry and (time.time() - cache_entry["timestamp"] < self.cache_ttl):
-                logger.info(f"🎯 Using cached memory search for {user_id}")
-                return cache_entry["context"]
-
-            logger.info(f"🔍 Building context for {user_id} with message: '{current_message[:50]}...'")
-            
-            # --- Measure Mem0 search latency ---------------------------------
-            mem0_start = time.perf_counter()
-            memories = await self.mem0_service.search_intimate_memories(
-                query=current_message,
-                user_id=user_id,
-                limit=3
+            cache_key = f"{user_id}:{hashlib.blake2b(current_message.encode('utf-8'), digest_size=16).hexdigest()}"
+            load = lambda: self._load_context(cache_key, current_message, user_id)  # noqa: E731
+            # A stale entry is served as-is while it is rebuilt in the background
+            memory_section = _CONTEXT_CACHE.peek(cache_key, refresh=load)
+            if memory_section is not None:
+                logger.info("🎯 Using cached memory search for %s", user_id)
+                return _assemble_context(memory_section, await self._graph_section(user_id))
+
+            embedding = await self._message_embedding(current_message)
+            if embedding is not None:
+                memory_section = _SEMANTIC_CACHE.lookup(user_id, embedding)
+                if memory_section is not None:
+                    logger.info("🎯 Using semantically cached memory search for %s", user_id)
+                    return _assemble_context(memory_section, await self._graph_section(user_id))
+
+            # Concurrent turns with the same message share one build; the graph
+            # hop runs alongside the Mem0 search
+            memory_section, graph_section = await asyncio.gather(
+                _CONTEXT_CACHE.get(cache_key, load), self._graph_section(user_id)
             )
-            mem0_elapsed = int((time.perf_counter() - mem0_start) * 1000)
-            logger.info(f"⏱️ Mem0 search for {user_id} took {mem0_elapsed} ms")
-            
-            logger.info(f"🔍 Memory search returned {len(memories.get('results', []))} results for {user_id}")
-            
-            # DEBUG: Log the raw memory structure
-            logger.info(f"🔍 [DEBUG] Raw memories structure: {memories}")
-            
-            results = memories.get("results", [])
-            relationship_lines: List[str] = []
-            # Fetch recent emotional context via graph if available
-            if self.graph_query_service:
-                try:
-                    graph_start = time.perf_counter()
-                    relationship_lines = self.graph_query_service.get_recent_emotional_context(user_id)
-                    graph_elapsed = int((time.perf_counter() - graph_start) * 1000)
-                    logger.info(f"⏱️ Graph emotional context query for {user_id} took {graph_elapsed} ms")
-                except Exception as gerr:
-                    logger.warning("Graph query failed for %s: %s", user_id, gerr)
-
-            if results or relationship_lines:
-                formatted_memories = []
-                
-                for i, memory in enumerate(results):
-                    # Handle different memory formats from Mem0
-                    memory_text = ""
-                    
-                    if isinstance(memory, dict):
-                        # If it's a dict, try to get the 'memory' field
-                        memory_text = memory.get('memory', '')
-                        if not memory_text:
-                            # Try other possible fields
-                            memory_text = memory.get('text', '') or memory.get('content', '') or str(memory)
-                    elif isinstance(memory, str):
-                        # If it's already a string
-                        memory_text = memory
-                    else:
-                        # Convert to string as fallback
-                        memory_text = str(memory)
-                    
-                    if memory_text:
-                        logger.info(f"🔍 Memory {i+1}: {memory_text[:100]}...")
-                        formatted_memories.append(f"- {memory_text}")
-                    else:
-                        logger.warning(f"🔍 Memory {i+1}: Empty or invalid content")
-                
-                context_parts = []
-                if formatted_memories:
-                    context_parts.append("IMPORTANT CONTEXT - What you remember about this person:")
-                    context_parts.extend(formatted_memories)
-
-                if relationship_lines:
-                    context_parts.append("\nRECENT EMOTIONAL CONTEXT:")
-                    context_parts.extend([f"- {line}" for line in relationship_lines])
-
-                if context_parts:
-                    context = "\n".join(context_parts)
-                    context += "\n\nUSE THIS INFORMATION to provide personalized, contextually aware responses."
-                else:
-                    context = "This is the beginning of your relationship with this person."
-            else:
-                context = "This is the beginning of your relationship with this person."
-
-            logger.info(f"🔍 Final context for LLM: {context[:200]}...")
-            logger.info(f"✅ Context built successfully for {user_id}")
-            
-            # --- STORE IN CACHE ---------------------------------------------
-            self.search_cache[cache_key] = {
-                "context": context,
-                "timestamp": time.time()
-            }
-            
-            return context
-            
+            if embedding is not None:
+                _SEMANTIC_CACHE.add(user_id, embedding, memory_section)
+            _LATEST_CONTEXT.set(user_id, memory_section)
+            return _assemble_context(memory_section, graph_section)
+
         except Exception as e:
             logger.error(f"❌ Context building failed for {user_id}: {e}", exc_info=True)
-            return "This is the beginning of your relationship with this person."
+            return _EMPTY_CONTEXT
+
+    async def _message_embedding(self, message: str) -> Optional[List[float]]:
+        embed_query = getattr(self.mem0_service, "embed_query", None)
+        if embed_query is None:
+            return None
+        try:
+            return await embed_query(message)
+        except Exception as e:
+            logger.debug("Semantic cache skipped: %s", e)
+            return None
+
+    async def _load_context(self, cache_key: str, current_message: str, user_id: str) -> str:
+        """L1 miss: consult the Redis L2 (if configured) before building."""
+        if self.redis is None:
+            return await self._build_uncached_context(current_message, user_id)
+
+        try:
+            pending_bump = _GENERATION_BUMPS.get(user_id)
+            if pending_bump is not None:
+                await asyncio.shield(pending_bump)
+            generation = await self.redis.get(REDIS_CONTEXT_GEN_PREFIX + user_id) or 0
+            redis_key = f"{REDIS_CONTEXT_PREFIX}{cache_key}:{generation}"
+            lock_key = f"{REDIS_BUILD_LOCK_PREFIX}{cache_key}:{generation}"
+            context = await self.redis.get(redis_key)
+            if context is not None:
+                logger.info("🎯 Using Redis-cached memory search for %s", user_id)
+                return context
+            owns_build = await self.redis.set(lock_key, "1", nx=True, px=REDIS_BUILD_LOCK_MS)
+            if not owns_build:
+                # Another worker is building this context; wait briefly for it
+                for _ in range(REDIS_WAIT_POLLS):
+                    await asyncio.sleep(REDIS_WAIT_INTERVAL)
+                    context = await self.redis.get(redis_key)
+                    if context is not None:
+                        return context
+        except Exception as rerr:
+            logger.warning("Redis context cache unavailable for %s: %s", user_id, rerr)
+            return await self._build_uncached_context(current_message, user_id)
+
+        context = await self._build_uncached_context(current_message, user_id)
+        try:
+            await self.redis.set(redis_key, context, ex=REDIS_CONTEXT_TTL)
+            if owns_build:
+                await self.redis.delete(lock_key)
+        except Exception as rerr:
+            logger.warning("Could not write context to Redis for %s: %s", user_id, rerr)
+        return context
+
+    async def _build_uncached_context(self, current_message: str, user_id: str) -> str:
+        """Search Mem0 and format the memory section of the context (cache miss path)."""
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("🔍 Building context for %s with message: '%s...'", user_id, current_message[:50])
+
+        mem0_start = time.perf_counter()
+        try:
+            memories = await _SEARCH_BATCHER.search(
+                self.mem0_service,
+                user_id,
+                {"kind": "general", "query": current_message, "limit": 3},
+            )
+        except Exception as e:
+            logger.warning("Mem0 search failed for %s: %s", user_id, e)
+            memories = {"results": []}
+        mem0_elapsed = int((time.perf_counter() - mem0_start) * 1000)
+        logger.info("⏱️ Mem0 search for %s took %d ms", user_id, mem0_elapsed)
+
+        results = memories.get("results", [])
+        logger.info("🔍 Memory search returned %d results for %s", len(results), user_id)
+
+        # Raw payload can be large; only format it when DEBUG is on
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("🔍 Raw memories structure: %s", memories)
+
+        lines: List[str] = []
+        append = lines.append
+        for i, memory in enumerate(results):
+            # Mem0 results are almost always plain dicts with a 'memory' field
+            if type(memory) is dict:
+                memory_text = memory.get("memory") or memory.get("text") or memory.get("content") or str(memory)
+            else:
+                memory_text = _extract_memory_text(memory)
+            if memory_text:
+                if debug:
+                    logger.debug("🔍 Memory %d: %s...", i + 1, memory_text[:100])
+                append(f"- {memory_text}")
+            else:
+                logger.warning("🔍 Memory %d: Empty or invalid content", i + 1)
+
+        memory_section = _NL.join(lines)
+        if debug:
+            logger.debug("✅ Memory section built for %s (%d chars)", user_id, len(memory_section))
+        return memory_section
+
+    async def _graph_section(self, user_id: str) -> str:
+        """The user's formatted graph emotional-context lines, cached for ``GRAPH_CONTEXT_TTL``."""
+        try:
+            return await _GRAPH_SECTION_CACHE.get(user_id, lambda: self._build_graph_section(user_id))
+        except Exception as e:
+            # One failed backend must not cost us the other
+            logger.warning("Graph query failed for %s: %s", user_id, e)
+            return ""
+
+    async def _build_graph_section(self, user_id: str) -> str:
+        lines = await self._recent_emotional_context(user_id)
+        if not lines:
+            return ""
+        return _NL.join([_EMOTIONAL_CONTEXT_HEADER, *(f"- {line}" for line in lines)])
+
+    async def _recent_emotional_context(self, user_id: str) -> List[str]:
+        """Graph emotional context off the event loop (the Neo4j driver is sync).
+
+        Bounded by ``GRAPH_CONTEXT_TIMEOUT``: a slow graph hop costs the context
+        its emotional lines rather than delaying the reply.
+        """
+        graph_service = self.graph_query_service
+        if not graph_service:
+            return []
+        graph_start = time.perf_counter()
+        try:
+            lines = await asyncio.wait_for(
+                asyncio.to_thread(graph_service.get_recent_emotional_context, user_id),
+                timeout=GRAPH_CONTEXT_TIMEOUT,
+            )
+        except asyncio.TimeoutError:
+            logger.warning("Graph emotional context for %s timed out after %.1f s", user_id, GRAPH_CONTEXT_TIMEOUT)
+            return []
+        graph_elapsed = int((time.perf_counter() - graph_start) * 1000)
+        logger.info("⏱️ Graph emotional context query for %s took %d ms", user_id, graph_elapsed)
+        return lines
+
+    async def build_intimate_context_parallel(
+        self,
+        current_message: str,
+        user_id: str,
+        emotion_focus: Optional[str] = None,
+    ) -> str:
+        """Build context from all memory facets at once.
+
+        The general, relationship, emotional-pattern and trust searches are
+        independent round-trips, so they are awaited together; wall-clock cost is
+        the slowest search (capped at ``parallel_search_timeout``) rather than the sum.
+        """
+        try:
+            search_start = time.perf_counter()
+            results = await self.mem0_service.search_batch(
+                user_id,
+                [
+                    {"kind": "general", "query": current_message, "limit": 3},
+                    {"kind": "relationship", "query": current_message, "emotion": emotion_focus},
+                    {"kind": "pattern", "emotion": emotion_focus},
+                    {"kind": "trust"},
+                ],
+                timeout=self.parallel_search_timeout,
+            )
+            elapsed = int((time.perf_counter() - search_start) * 1000)
+            logger.info("⏱️ Parallel memory search for %s took %d ms", user_id, elapsed)
+
+            merged = self._merge_memory_results(results)
+            return self._format_intimate_memories(merged)
+        except Exception as e:
+            logger.error(f"❌ Parallel context building failed for {user_id}: {e}", exc_info=True)
+            return _EMPTY_CONTEXT
+
+    @staticmethod
+    def _merge_memory_results(result_sets: List[Dict]) -> Dict:
+        """Concatenate search results, keeping the first occurrence of each memory id."""
+        merged: List[Dict] = []
+        seen_ids = set()
+        for result_set in result_sets:
+            for memory in result_set.get("results", []):
+                memory_id = memory.get("id") if isinstance(memory, dict) else None
+                if memory_id is not None:
+                    if memory_id in seen_ids:
+                        continue
+                    seen_ids.add(memory_id)
+                merged.append(memory)
+        return {"results": merged}
 
     def _format_intimate_memories(self, memories: Dict) -> str:
         """Format memories for intimate conversation context"""
         results = memories.get("results", [])
         
         if not results:
-            return "This is the beginning of your relationship with this person."
+            return _EMPTY_CONTEXT
 
         formatted_memories = []
+        append = formatted_memories.append
         for memory in results:
             memory_text = memory.get("memory", "")
-            # Add emotional context from metadata if available
-            metadata = memory.get("metadata", {})
-            emotional_context = metadata.get("emotional_context", {})
-            
+            # Add emotional context from metadata if available (Mem0 may store None)
+            emotional_context = (memory.get("metadata") or _EMPTY).get("emotional_context")
+
             # Enhance memory with emotional context
             if emotional_context:
-                context_notes = ", ".join([f"{k}: {v}" for k, v in emotional_context.items()])
-                formatted_memories.append(f"• {memory_text} ({context_notes})")
+                append(f"• {memory_text} ({_emotional_context_notes(emotional_context)})")
             else:
-                formatted_memories.append(f"• {memory_text}")
+                append(f"• {memory_text}")
+
+        return "".join((_HEADER, _NL.join(formatted_memories), _FOOTER))
+
+
+# --- Formatting constants -----------------------------------------------------
+_NL = "\n"
+_HEADER = "What you remember about this person:\n"
+_FOOTER = "\n\nUse this context to respond with deep understanding and emotional continuity."
+_EMPTY_CONTEXT = "This is the beginning of your relationship with this person."
+_MEMORIES_HEADER = "IMPORTANT CONTEXT - What you remember about this person:"
+_EMOTIONAL_CONTEXT_HEADER = "\nRECENT EMOTIONAL CONTEXT:"
+_USE_CONTEXT_FOOTER = "\nUSE THIS INFORMATION to provide personalized, contextually aware responses."
+_EMPTY: Dict = {}  # shared read-only default; never mutated
+
+
+def _assemble_context(memory_section: str, graph_section: str) -> str:
+    """Full LLM context from the (separately cached) Mem0 and graph sections."""
+    if not memory_section and not graph_section:
+        return _EMPTY_CONTEXT
+    buf: List[str] = []
+    if memory_section:
+        buf.append(_MEMORIES_HEADER)
+        buf.append(memory_section)
+    if graph_section:
+        buf.append(graph_section)
+    buf.append(_USE_CONTEXT_FOOTER)
+    return _NL.join(buf)
+
+
+def _extract_memory_text(memory) -> str:
+    """Text of a Mem0 result that is not a plain dict (dict subclass, str, other)."""
+    if isinstance(memory, dict):
+        return memory.get("memory") or memory.get("text") or memory.get("content") or str(memory)
+    return memory if type(memory) is str else str(memory)
+
+
+@lru_cache(maxsize=256)
+def _format_context_items(items: Tuple) -> str:
+    return ", ".join(f"{k}: {v}" for k, v in items)
 
-        return f"""What you remember about this person:
-{chr(10).join(formatted_memories)}
 
-Use this context to respond with deep understanding and emotional continuity."""
+def _emotional_context_notes(emotional_context: Dict) -> str:
+    """``k: v`` notes for a memory's emotional context, memoised for repeated metadata."""
+    items = tuple(emotional_context.items())
+    try:
+        return _format_context_items(items)
+    except TypeError:  # unhashable values (nested dicts/lists) cannot be cached
+        return ", ".join(f"{k}: {v}" for k, v in items)
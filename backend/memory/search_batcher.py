@@ -0,0 +1,100 @@
+"""Cross-user batching of Mem0 searches on the event loop.
+
+Concurrent ``build_intimate_context`` calls each issue their own search. Routing
+them through :class:`SearchBatcher` lets a single worker collect whatever
+arrives within a few ms (up to ``max_batch`` specs), embed every query in one
+model pass and fan the searches out together, where the pgvector
+:class:`~memory.search_coalescer.SearchCoalescer` (if enabled) folds them into
+one SQL round-trip.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (mem0_service, user_id, spec, future)
+_Queued = Tuple[Any, str, Dict, asyncio.Future]
+
+
+class SearchBatcher:
+    """Queue + single worker task turning concurrent search specs into batches.
+
+    The queue and worker are bound lazily to the running loop and rebuilt if a
+    different loop starts using the batcher (e.g. between test runs).
+    """
+
+    def __init__(self, max_batch: int = 32, max_wait: float = 0.008):
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: Set[asyncio.Task] = set()
+
+    async def search(self, mem0_service, user_id: str, spec: Dict) -> Dict:
+        """Queue one ``search_batch`` spec for ``user_id`` and await its result."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((mem0_service, user_id, spec, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        while True:
+            batch: List[_Queued] = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch in the background so the next batch fills meanwhile
+            task = loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[_Queued]) -> None:
+        groups: Dict[Tuple[int, str], Tuple[Any, str, List[_Queued]]] = {}
+        for item in batch:
+            service, user_id = item[0], item[1]
+            groups.setdefault((id(service), user_id), (service, user_id, []))[2].append(item)
+
+        # One embedding pass over every user's queries; per-user searches then hit the cache
+        specs_by_service: Dict[int, Tuple[Any, List[Dict]]] = {}
+        for service, _, items in groups.values():
+            specs_by_service.setdefault(id(service), (service, []))[1].extend(item[2] for item in items)
+        for service, specs in specs_by_service.values():
+            try:
+                await service.prime_query_embeddings([service._spec_query(spec) for spec in specs])
+            except Exception as e:
+                logger.debug("Batched query embedding skipped: %s", e)
+
+        results = await asyncio.gather(
+            *(self._search_group(service, user_id, items) for service, user_id, items in groups.values()),
+            return_exceptions=True,
+        )
+        for (_, _, items), result in zip(groups.values(), results):
+            for index, (*_, future) in enumerate(items):
+                if future.done():  # caller was cancelled
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result[index])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Dispatched %d searches for %d users in one batch", len(batch), len(groups))
+
+    @staticmethod
+    async def _search_group(service, user_id: str, items: List[_Queued]) -> List[Dict]:
+        return await service.search_batch(user_id, [item[2] for item in items])
@@ -0,0 +1,103 @@
+"""Coalesce concurrent Mem0 pgvector searches into one SQL round-trip.
+
+Mem0 runs ``vector_store.search`` on worker threads, one statement per search.
+Under concurrent chat turns, :class:`SearchCoalescer` holds the first caller for a
+short window, collects the searches that arrive meanwhile and serves them all
+with a single ``JOIN LATERAL`` query, trading a few ms of per-query latency for
+fewer Supabase round-trips.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (query, vectors, user_id, limit, future)
+_Pending = Tuple[Any, List[float], str, int, Future]
+
+
+class SearchCoalescer:
+    """Drop-in replacement for a Mem0 ``PGVector.search`` bound method.
+
+    Only the common ``filters={"user_id": ...}`` shape is batched; anything else
+    goes straight to the wrapped search.
+    """
+
+    def __init__(self, store, window_seconds: float = 0.005, halfvec_dims: Optional[int] = None):
+        self._store = store
+        self._direct_search = store.search
+        self._window = window_seconds
+        self._lock = threading.Lock()
+        self._pending: List[_Pending] = []
+        if halfvec_dims:
+            self._distance = f"t.vector::halfvec({halfvec_dims}) <=> q.vec::halfvec({halfvec_dims})"
+        else:
+            self._distance = "t.vector <=> q.vec"
+
+    def search(self, query, vectors, limit=5, filters=None):
+        if not filters or set(filters) != {"user_id"}:
+            return self._direct_search(query=query, vectors=vectors, limit=limit, filters=filters)
+
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((query, vectors, str(filters["user_id"]), limit, future))
+            is_leader = len(self._pending) == 1
+
+        if is_leader:
+            # First caller waits out the window, then runs the whole batch
+            time.sleep(self._window)
+            with self._lock:
+                batch, self._pending = self._pending, []
+            self._run(batch)
+        return future.result()
+
+    # ------------------------------------------------------------------
+    def _run(self, batch: List[_Pending]) -> None:
+        try:
+            if len(batch) == 1:
+                query, vectors, user_id, limit, _ = batch[0]
+                results = [
+                    self._direct_search(query=query, vectors=vectors, limit=limit, filters={"user_id": user_id})
+                ]
+            else:
+                results = self._search_many(batch)
+        except Exception as e:
+            for *_, future in batch:
+                future.set_exception(e)
+            return
+        for (*_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _search_many(self, batch: List[_Pending]) -> List[List[Any]]:
+        from mem0.vector_stores.pgvector import OutputData
+
+        values = ", ".join(["(%s::int, %s::text, %s::vector, %s::int)"] * len(batch))
+        params: List[Any] = []
+        for idx, (_, vectors, user_id, limit, _) in enumerate(batch):
+            params.extend((idx, user_id, vectors, limit))
+
+        sql = f"""
+            SELECT q.idx, r.id, r.distance, r.payload
+            FROM (VALUES {values}) AS q(idx, user_id, vec, k)
+            CROSS JOIN LATERAL (
+                SELECT t.id, {self._distance} AS distance, t.payload
+                FROM {self._store.collection_name} AS t
+                WHERE t.payload->>'user_id' = q.user_id
+                ORDER BY distance
+                LIMIT q.k
+            ) AS r
+            ORDER BY q.idx, r.distance
+        """
+        with self._store.conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+
+        results: Dict[int, List[Any]] = {idx: [] for idx in range(len(batch))}
+        for idx, row_id, distance, payload in rows:
+            results[idx].append(OutputData(id=str(row_id), score=float(distance), payload=payload))
+        logger.debug("Coalesced %d pgvector searches into one query", len(batch))
+        return [results[idx] for idx in range(len(batch))]
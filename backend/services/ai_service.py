@@ -102,11 +102,140 @@
 
 #
 
-from openai import OpenAI
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, OpenAI, RateLimitError
+import asyncio
 import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from services import semantic_cache
+from services.http_pool import SHARED_HTTPX
+from services.retry_policy import transient_retry
 
 logger = logging.getLogger(__name__)
 
+# 429s, 5xx and dropped connections (APITimeoutError is an APIConnectionError).
+# Retries are ours alone: the SDK clients are built with max_retries=0 so the
+# two layers don't multiply attempts.
+try:
+    import groq as _groq
+    _GROQ_TRANSIENT_ERRORS = (_groq.APIConnectionError, _groq.RateLimitError, _groq.InternalServerError)
+except ImportError:
+    _GROQ_TRANSIENT_ERRORS = ()
+TRANSIENT_LLM_ERRORS = (APIConnectionError, RateLimitError, InternalServerError) + _GROQ_TRANSIENT_ERRORS
+
+
+@transient_retry(*TRANSIENT_LLM_ERRORS)
+def _create_completion(client, **kwargs):
+    return client.chat.completions.create(**kwargs)
+
+
+@transient_retry(*TRANSIENT_LLM_ERRORS)
+async def _acreate_completion(client, **kwargs):
+    # Only opening the stream is retried; a retry mid-stream would repeat tokens
+    return await client.chat.completions.create(**kwargs)
+
+
+# Caps on in-flight LLM streams, so a burst of clients queues here instead of
+# tripping provider rate limits (429s and their retries)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_MAX_CONCURRENCY_PER_USER = int(os.getenv("LLM_MAX_CONCURRENCY_PER_USER", "2"))
+
+_LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+# user_id -> [semaphore, holders]; dropped once nobody holds or waits on it
+_USER_SEMAPHORES = {}
+
+
+@asynccontextmanager
+async def _llm_slot(user_id=None):
+    """Hold one per-user and one global LLM slot for the duration of a stream.
+
+    The per-user slot is taken first so one user's backlog waits without
+    occupying global capacity.
+    """
+    if user_id is None:
+        async with _LLM_SEMAPHORE:
+            yield
+        return
+    entry = _USER_SEMAPHORES.get(user_id)
+    if entry is None:
+        entry = _USER_SEMAPHORES[user_id] = [asyncio.Semaphore(LLM_MAX_CONCURRENCY_PER_USER), 0]
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            async with _LLM_SEMAPHORE:
+                yield
+    finally:
+        entry[1] -= 1
+        if entry[1] == 0:
+            del _USER_SEMAPHORES[user_id]
+
+
+def _build_messages(config, text, system_prefix=None, cache_control=False):
+    """``[system, user]`` with every static part of the prompt in the system message.
+
+    Order is most-static first (config preamble, persona, config system message)
+    so consecutive calls share the longest possible token prefix, which is what
+    OpenAI/Groq automatic prompt caching keys on. ``cache_control`` adds the
+    explicit breakpoint Anthropic models need on OpenRouter.
+    """
+    system = "\n\n".join(
+        part for part in (
+            config.get("system_prefix_block"),
+            system_prefix,
+            config.get("system_message", "You are a helpful assistant."),
+        ) if part
+    )
+    if cache_control:
+        system_message = {
+            "role": "system",
+            "content": [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+        }
+    else:
+        system_message = {"role": "system", "content": system}
+    return [system_message, {"role": "user", "content": text}]
+
+
+class _TokenBatcher:
+    """Groups streamed tokens so each yield carries several of them.
+
+    The first token is passed through alone (time-to-first-token is what the
+    user hears); after that the batch size grows x3 per flush up to
+    ``MAX_BATCH``, and anything older than ``MAX_DELAY`` is flushed with the
+    next token. Every yield costs a websocket send and a TTS-buffer pass
+    downstream, so this cuts per-token overhead on fast models.
+    """
+
+    MAX_BATCH = 50
+    GROWTH = 3
+    MAX_DELAY = 0.02  # seconds
+
+    def __init__(self):
+        self._buf = []
+        self._batch_size = 1
+        self._last_flush = None
+
+    def add(self, token):
+        """Buffer ``token``; returns the text to yield now, or ``None``."""
+        now = time.monotonic()
+        if self._last_flush is None:
+            self._last_flush = now
+            return token
+        self._buf.append(token)
+        if len(self._buf) >= self._batch_size or now - self._last_flush > self.MAX_DELAY:
+            self._batch_size = min(self._batch_size * self.GROWTH, self.MAX_BATCH)
+            self._last_flush = now
+            return self.flush()
+        return None
+
+    def flush(self):
+        if not self._buf:
+            return None
+        text = "".join(self._buf)
+        self._buf.clear()
+        return text
+
+
 class OpenRouterService:
     """OpenRouter service - Access 100+ AI models through one API"""
 
@@ -117,8 +246,28 @@ class OpenRouterService:
         # OpenRouter uses OpenAI-compatible API
         self.client = OpenAI(
             base_url="https://openrouter.ai/api/v1",
-            api_key=self.config["api_key"]
+            api_key=self.config["api_key"],
+            max_retries=0,
+        )
+        # Streaming runs on the event loop, so it needs the async client: iterating
+        # the sync client's stream would block every other coroutine per chunk
+        self.async_client = AsyncOpenAI(
+            base_url="https://openrouter.ai/api/v1",
+            api_key=self.config["api_key"],
+            http_client=SHARED_HTTPX,
+            max_retries=0,
         )
+        # Config is fixed for the service's lifetime, so the per-call request parts are built once
+        self._system_msg = {"role": "system", "content": self.config.get("system_message", "You are a helpful assistant.")}
+        self._base_kwargs = {
+            "max_tokens": self.config.get("max_tokens", 150),
+            "temperature": self.config.get("temperature", 0.7),
+            # Optional: Add extra headers for OpenRouter
+            "extra_headers": {
+                "HTTP-Referer": self.config.get("site_url", "http://localhost:3000"),
+                "X-Title": self.config.get("site_name", "Voice Assistant"),
+            },
+        }
 
     def get_response(self, text):
         """Get response from OpenRouter (any supported model)"""
@@ -126,19 +275,11 @@ class OpenRouterService:
         print(f"🤖 Getting response from OpenRouter using {model_name}...")
 
         try:
-            response = self.client.chat.completions.create(
+            response = _create_completion(
+                self.client,
                 model=model_name,
-                messages=[
-                    {"role": "system", "content": self.config.get("system_message", "You are a helpful assistant.")},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=self.config.get("max_tokens", 150),
-                temperature=self.config.get("temperature", 0.7),
-                # Optional: Add extra headers for OpenRouter
-                extra_headers={
-                    "HTTP-Referer": self.config.get("site_url", "http://localhost:3000"),
-                    "X-Title": self.config.get("site_name", "Voice Assistant"),
-                }
+                messages=[self._system_msg, {"role": "user", "content": text}],
+                **self._base_kwargs
             )
 
             ai_response = response.choices[0].message.content
@@ -149,32 +290,59 @@ class OpenRouterService:
             print(f"❌ OpenRouter error: {e}")
             return None
 
-    async def get_streaming_response(self, text):
-        """Get streaming response from OpenRouter"""
+    async def get_streaming_response(self, text, *, system_prefix=None, user_id=None, cache_text=None):
+        """Get streaming response from OpenRouter
+
+        ``system_prefix`` (e.g. the persona prompt) goes into the system message
+        ahead of the configured one; see :func:`_build_messages`. With
+        ``user_id`` and ``cache_text`` (the user's own message), a reply cached
+        for a semantically equal message is replayed instead; see
+        services/semantic_cache.py.
+        """
+        cached = await semantic_cache.lookup(user_id, cache_text)
+        if cached is not None:
+            for piece in semantic_cache.replay(cached):
+                yield piece
+            return
         model_name = self.config["model"]  # Always use model from config (OPENROUTER_MODEL from .env)
         print(f"🤖 Streaming from OpenRouter using {model_name}...")
+        parts = []
+        batcher = _TokenBatcher()
+        verbose = logger.isEnabledFor(logging.DEBUG)  # checked once, not per token
         try:
-            stream = self.client.chat.completions.create(
-                model=model_name,
-                messages=[
-                    {"role": "system", "content": self.config.get("system_message", "You are a helpful assistant.")},
-                    {"role": "user", "content": text}
-                ],
-                max_tokens=self.config.get("max_tokens", 150),
-                temperature=self.config.get("temperature", 0.7),
-                stream=True,  # ENABLE STREAMING
-                extra_headers={
-                    "HTTP-Referer": self.config.get("site_url", "http://localhost:3000"),
-                    "X-Title": self.config.get("site_name", "Voice Assistant"),
-                }
-            )
-            for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
-                    logger.info(f"[OpenRouter Streaming] Token: {chunk.choices[0].delta.content}")
-                    yield chunk.choices[0].delta.content
+            async with _llm_slot(user_id):
+                stream = await _acreate_completion(
+                    self.async_client,
+                    model=model_name,
+                    messages=_build_messages(
+                        self.config, text, system_prefix, cache_control=model_name.startswith("anthropic/")
+                    ),
+                    stream=True,  # ENABLE STREAMING
+                    **self._base_kwargs
+                )
+                async for chunk in stream:
+                    # OpenRouter interleaves keep-alive/usage chunks that carry no choices
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content
+                    if content is not None:
+                        if verbose:
+                            logger.debug("[OpenRouter Streaming] Token: %s", content)
+                        parts.append(content)
+                        batch = batcher.add(content)
+                        if batch:
+                            yield batch
+            rest = batcher.flush()
+            if rest:
+                yield rest
         except Exception as e:
             print(f"❌ OpenRouter streaming error: {e}")
+            rest = batcher.flush()
+            if rest:
+                yield rest
             yield f"Error: {str(e)}"
+            return
+        await semantic_cache.insert(user_id, cache_text, "".join(parts))
 
 
 class AnthropicService:
@@ -201,6 +369,15 @@ class LocalLLMService:
         pass
 
 # --- GROQ FAST INFERENCE SERVICE ---
+def _log_prompt_cache_usage(usage) -> None:
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    if cached is not None and prompt_tokens:
+        logger.info("[Groq] Prompt cache: %d/%d prompt tokens cached (%.0f%%)",
+                    cached, prompt_tokens, 100 * cached / prompt_tokens)
+
+
 try:
     from groq import Groq, AsyncGroq
 except ImportError:
@@ -218,16 +395,24 @@ class GroqService:
         
         if Groq is None:
             raise ImportError("groq Python package is not installed. Run 'pip install groq'.")
-        self.client = Groq(api_key=self.config["api_key"])
+        self.client = Groq(api_key=self.config["api_key"], max_retries=0)
+        # Built once, on the shared pool, so streams reuse warm connections
+        self.aclient = (
+            AsyncGroq(api_key=self.config["api_key"], http_client=SHARED_HTTPX, max_retries=0) if AsyncGroq else None
+        )
+        self._system_msg = {"role": "system", "content": self.config.get("system_message", "You are a helpful assistant.")}
+        self._stream_kwargs = {
+            "model": self.config["model"],
+            "temperature": self.config.get("temperature", 0.7),
+            "max_tokens": self.config.get("max_tokens", 1000),
+        }
 
     def get_response(self, text):
         """Get a fast LLM response from Groq (sync)."""
         try:
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": self.config.get("system_message", "You are a helpful assistant.")},
-                    {"role": "user", "content": text}
-                ],
+            response = _create_completion(
+                self.client,
+                messages=[self._system_msg, {"role": "user", "content": text}],
                 model=self.config["model"]
             )
             return response.choices[0].message.content
@@ -235,32 +420,59 @@ class GroqService:
             logger.error(f"GroqService error: {e}")
             return None
 
-    async def get_streaming_response(self, text):
-        """Get a streaming response from Groq (async)."""
-        if AsyncGroq is None:
+    async def get_streaming_response(self, text, *, system_prefix=None, user_id=None, cache_text=None):
+        """Get a streaming response from Groq (async).
+
+        ``system_prefix`` and ``user_id``/``cache_text`` behave as for
+        :meth:`OpenRouterService.get_streaming_response`.
+        """
+        if self.aclient is None:
             raise ImportError("groq Python package is not installed. Run 'pip install groq'.")
-        
-        client = AsyncGroq(api_key=self.config["api_key"])
+
+        cached = await semantic_cache.lookup(user_id, cache_text)
+        if cached is not None:
+            for piece in semantic_cache.replay(cached):
+                yield piece
+            return
+        parts = []
+        batcher = _TokenBatcher()
+        verbose = logger.isEnabledFor(logging.DEBUG)  # checked once, not per token
         try:
-            # Enable REAL streaming with stream=True
-            stream = await client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": self.config.get("system_message", "You are a helpful assistant.")},
-                    {"role": "user", "content": text}
-                ],
-                model=self.config["model"],
-                stream=True,  # THIS IS THE CRITICAL FIX
-                temperature=self.config.get("temperature", 0.7),
-                max_tokens=self.config.get("max_tokens", 1000)
-            )
+            async with _llm_slot(user_id):
+                # Enable REAL streaming with stream=True
+                stream = await _acreate_completion(
+                    self.aclient,
+                    messages=_build_messages(self.config, text, system_prefix),
+                    stream=True,  # THIS IS THE CRITICAL FIX
+                    **self._stream_kwargs
+                )
             
-            # Stream actual tokens as they arrive
-            async for chunk in stream:
-                if chunk.choices[0].delta.content is not None:
+                # Stream actual tokens as they arrive
+                async for chunk in stream:
+                    # Final chunk carries usage, incl. how much of the prompt prefix was cached
+                    x_groq = getattr(chunk, "x_groq", None)
+                    if x_groq is not None and getattr(x_groq, "usage", None) is not None:
+                        _log_prompt_cache_usage(x_groq.usage)
+                    # Usage-only chunks can arrive with no choices
+                    if not chunk.choices:
+                        continue
                     content = chunk.choices[0].delta.content
-                    logger.debug(f"[Groq Streaming] Token: {content}")
-                    yield content
+                    if content is not None:
+                        if verbose:
+                            logger.debug("[Groq Streaming] Token: %s", content)
+                        parts.append(content)
+                        batch = batcher.add(content)
+                        if batch:
+                            yield batch
+            rest = batcher.flush()
+            if rest:
+                yield rest
                     
         except Exception as e:
             logger.error(f"GroqService streaming error: {e}")
-            yield f"Error: {str(e)}"
\ No newline at end of file
+            rest = batcher.flush()
+            if rest:
+                yield rest
+            yield f"Error: {str(e)}"
+            return
+        await semantic_cache.insert(user_id, cache_text, "".join(parts))
\ No newline at end of file
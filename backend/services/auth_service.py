@@ -1,11 +1,19 @@
-from supabase import create_client, Client
+from supabase import AsyncClient
 from typing import Optional, Dict, Any
 from fastapi import HTTPException, status
+import hashlib
 import logging
+import time
+from cachetools import TTLCache
+from jose import jwt
 from config import SUPABASE_CONFIG
+from services.supabase_pool import get_client
 
 logger = logging.getLogger(__name__)
 
+# token digest -> (exp, user_data). Entries never outlive the token's own exp.
+_VERIFIED_TOKENS: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
 class SupabaseAuthService:
     def __init__(self):
         supabase_url = SUPABASE_CONFIG.get("url")
@@ -14,12 +22,63 @@ class SupabaseAuthService:
         if not supabase_url or not supabase_key:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_ANON_KEY in SUPABASE_CONFIG")
         
-        self.supabase: Client = create_client(supabase_url, supabase_key)
+        # Shared async client from services/supabase_pool.py; set by init()
+        self.supabase: Optional[AsyncClient] = None
+
+    async def init(self) -> AsyncClient:
+        """Fetch the shared async Supabase client (awaited at startup, or on first use)."""
+        if self.supabase is None:
+            self.supabase = await get_client()
+        return self.supabase
     
     async def verify_token(self, token: str) -> Optional[Dict[str, Any]]:
-        """Verify JWT token and return user data"""
+        """Verify JWT token and return user data
+
+        Tokens are checked locally against the project's JWT secret when one is
+        configured, and results are cached until the token expires (max 5 min);
+        only tokens that cannot be verified locally cost a Supabase round-trip.
+        """
+        key = hashlib.blake2b(token.encode("utf-8"), digest_size=16).digest()
+        cached = _VERIFIED_TOKENS.get(key)
+        if cached is not None:
+            exp, user_data = cached
+            if exp > time.time():
+                return user_data
+            _VERIFIED_TOKENS.pop(key, None)
+
+        claims = self._verify_locally(token)
+        if claims is not None:
+            user_data = {
+                "user_id": claims["sub"],
+                "email": claims.get("email"),
+                "user_metadata": claims.get("user_metadata", {}),
+            }
+        else:
+            user_data = await self._verify_remotely(token)
+            if user_data is None:
+                return None
+            try:
+                claims = jwt.get_unverified_claims(token)  # Supabase vouched for it; just read exp
+            except Exception:
+                return user_data
+        _VERIFIED_TOKENS[key] = (claims.get("exp", 0), user_data)
+        return user_data
+
+    def _verify_locally(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of ``token`` if it verifies against the configured JWT secret."""
+        secret = SUPABASE_CONFIG.get("jwt_secret")
+        if not secret:
+            return None
+        try:
+            return jwt.decode(token, secret, algorithms=["HS256"], audience="authenticated")
+        except Exception as e:
+            logger.debug("Local token verification failed, asking Supabase: %s", e)
+            return None
+
+    async def _verify_remotely(self, token: str) -> Optional[Dict[str, Any]]:
         try:
-            response = self.supabase.auth.get_user(token)
+            supabase = await self.init()
+            response = await supabase.auth.get_user(token)
             if response.user:
                 return {
                     "user_id": response.user.id,
@@ -34,7 +93,8 @@ class SupabaseAuthService:
     async def sign_up(self, email: str, password: str) -> Dict[str, Any]:
         """Register new user"""
         try:
-            response = self.supabase.auth.sign_up({
+            supabase = await self.init()
+            response = await supabase.auth.sign_up({
                 "email": email,
                 "password": password
             })
@@ -52,7 +112,8 @@ class SupabaseAuthService:
     async def sign_in(self, email: str, password: str) -> Dict[str, Any]:
         """Sign in user with better error handling"""
         try:
-            response = self.supabase.auth.sign_in_with_password({
+            supabase = await self.init()
+            response = await supabase.auth.sign_in_with_password({
                 "email": email,
                 "password": password
             })
@@ -101,7 +162,8 @@ class SupabaseAuthService:
         """Create a user with email pre-confirmed (for development)"""
         try:
             # First create the user
-            response = self.supabase.auth.sign_up({
+            supabase = await self.init()
+            response = await supabase.auth.sign_up({
                 "email": email,
                 "password": password
             })
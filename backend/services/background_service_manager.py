@@ -1,6 +1,6 @@
 import asyncio
 import logging
-from typing import Set
+from typing import Dict, Set
 from subconscious.background_processor import PersistentSubconsciousProcessor
 from services.service_registry import ServiceRegistry
 
@@ -11,17 +11,19 @@ class BackgroundServiceManager:
     def __init__(self):
         self.mem0_service = ServiceRegistry.get_memory_service()
         self.subconscious_processor = PersistentSubconsciousProcessor(self.mem0_service)
-        self.active_users: Set[str] = set()
+        # Strong refs keep running tasks from being garbage collected and let us cancel them
+        self.tasks: Dict[str, asyncio.Task] = {}
         self._shutdown_event = asyncio.Event()
     async def ensure_user_background_processing(self, user_id: str) -> bool:
         """Ensure background processing is running for user (idempotent)"""
         try:
-            if user_id not in self.active_users:
-                self.active_users.add(user_id)
+            if user_id not in self.tasks:
                 # Start background processing
-                asyncio.create_task(
-                    self._managed_background_processing(user_id)
+                task = asyncio.create_task(
+                    self._managed_background_processing(user_id), name=f"bg-{user_id}"
                 )
+                self.tasks[user_id] = task
+                task.add_done_callback(lambda t: self._task_done(user_id, t))
                 logger.info(f"Started managed background processing for {user_id}")
                 return True
             else:
@@ -36,31 +38,35 @@ class BackgroundServiceManager:
             await self.subconscious_processor.start_continuous_processing(user_id)
         except Exception as e:
             logger.error(f"Background processing failed for {user_id}: {e}")
-        finally:
-            # Cleanup when processing ends
-            self.active_users.discard(user_id)
-            logger.info(f"Cleaned up background processing for {user_id}")
+    def _task_done(self, user_id: str, task: asyncio.Task):
+        """Cleanup when processing ends (a restarted user may already have a new task)"""
+        if self.tasks.get(user_id) is task:
+            del self.tasks[user_id]
+        logger.info(f"Cleaned up background processing for {user_id}")
     def stop_user_processing(self, user_id: str):
         """Stop background processing for a specific user"""
-        if user_id in self.active_users:
+        task = self.tasks.pop(user_id, None)
+        if task is not None:
             self.subconscious_processor.stop_processing(user_id)
-            self.active_users.discard(user_id)
+            task.cancel()
             logger.info(f"Stopped background processing for {user_id}")
     async def shutdown_all(self):
         """Gracefully shutdown all background processing"""
         logger.info("Shutting down all background processing...")
-        for user_id in self.active_users.copy():
+        tasks = list(self.tasks.values())
+        for user_id in list(self.tasks):
             self.stop_user_processing(user_id)
+        await asyncio.gather(*tasks, return_exceptions=True)
         self._shutdown_event.set()
     def get_active_users(self) -> Set[str]:
         """Get set of users with active background processing"""
-        return self.active_users.copy()
+        return set(self.tasks)
     async def coordinate_with_realtime_analysis(self, user_id: str):
         """Coordinate background processing with real-time analysis"""
         try:
             # If real-time analysis is happening, delay background processing slightly
             # to avoid conflicts with scaffold updates
-            if user_id in self.active_users:
+            if user_id in self.tasks:
                 logger.debug(f"Coordinating background processing with real-time analysis for {user_id}")
                 await asyncio.sleep(0.5)  # Small delay for coordination
         except Exception as e:
@@ -70,7 +76,7 @@ class BackgroundServiceManager:
     def get_stats(self) -> dict:
         """Return simple stats for health endpoint."""
         return {
-            "active_users": len(self.active_users),
+            "active_users": len(self.tasks),
         }
 
 # Global instance
@@ -1,11 +1,44 @@
-from typing import List, Dict, Optional
-from supabase import create_client, Client
+from typing import List, Dict, Optional, Tuple
+from supabase import AsyncClient
+import asyncio
 import logging
+from functools import lru_cache
 from datetime import datetime
 from config import SUPABASE_CONFIG
+from services.supabase_pool import get_service_client
 
 logger = logging.getLogger(__name__)
 
+# Write-behind batching for store_chat: one multi-row insert per batch
+CHAT_WRITE_BATCH = 50
+CHAT_WRITE_MAX_WAIT = 0.1  # seconds
+
+# Latest row per session, computed in Postgres (one index scan, one row per
+# session) instead of shipping every chat to Python. Apply once in the Supabase
+# SQL editor; until it exists get_chat_sessions falls back to grouping here.
+CHAT_SESSIONS_SQL = """
+CREATE INDEX IF NOT EXISTS chats_user_session_created_idx
+    ON chats (user_id, session_id, created_at DESC);
+
+CREATE OR REPLACE FUNCTION get_user_sessions(uid uuid)
+RETURNS TABLE (session_id text, title text, created_at timestamptz)
+LANGUAGE sql STABLE AS $$
+    SELECT * FROM (
+        SELECT DISTINCT ON (c.session_id) c.session_id::text, c.title::text, c.created_at
+        FROM chats c
+        WHERE c.user_id = uid
+        ORDER BY c.session_id, c.created_at DESC
+    ) latest
+    ORDER BY latest.created_at DESC;
+$$;
+"""
+
+@lru_cache(maxsize=1024)
+def _generate_title(user_message: str) -> str:
+    """Generate a title from the first user message (repeats are common, so memoized)"""
+    # Take first 50 characters and clean up
+    return f"{user_message[:50].strip()}{'...' if len(user_message) > 50 else ''}"
+
 class ChatService:
     def __init__(self):
         supabase_url = SUPABASE_CONFIG.get("url")
@@ -14,7 +47,19 @@ class ChatService:
         if not supabase_url or not service_role_key:
             raise ValueError("Missing SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY in SUPABASE_CONFIG")
         
-        self.supabase: Client = create_client(supabase_url, service_role_key)
+        # Shared async client from services/supabase_pool.py; set by init()
+        self.supabase: Optional[AsyncClient] = None
+        # (row, future resolved with the inserted row); bound lazily to the running loop
+        self._write_q: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._write_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sessions_rpc = True  # cleared if get_user_sessions is not deployed
+
+    async def init(self) -> AsyncClient:
+        """Fetch the shared async Supabase client (awaited at startup, or on first use)."""
+        if self.supabase is None:
+            self.supabase = await get_service_client()
+        return self.supabase
     
     async def store_chat(
         self,
@@ -24,7 +69,12 @@ class ChatService:
         ai_response: str,
         metadata: Optional[Dict] = None
     ) -> Dict:
-        """Store a chat exchange"""
+        """Store a chat exchange
+
+        Rows are queued and written by a background task in multi-row inserts
+        (up to ``CHAT_WRITE_BATCH`` rows or ``CHAT_WRITE_MAX_WAIT`` seconds);
+        this still resolves to the inserted row once its batch is written.
+        """
         try:
             chat_data = {
                 "user_id": user_id,
@@ -32,14 +82,57 @@ class ChatService:
                 "user_message": user_message,
                 "ai_response": ai_response,
                 "metadata": metadata or {},
-                "title": self._generate_title(user_message)  # Auto-generate title
+                "title": _generate_title(user_message)  # Auto-generate title
             }
             
-            response = self.supabase.table("chats").insert(chat_data).execute()
-            return response.data[0]
+            loop = asyncio.get_running_loop()
+            if self._writer_task is None or self._writer_task.done() or self._write_loop is not loop:
+                self._write_loop = loop
+                self._write_q = asyncio.Queue()
+                self._writer_task = loop.create_task(self._write_behind())
+            future = loop.create_future()
+            self._write_q.put_nowait((chat_data, future))
+            return await future
         except Exception as e:
             logger.error(f"Failed to store chat: {e}")
             raise
+
+    async def _write_behind(self) -> None:
+        loop = asyncio.get_running_loop()
+        queue = self._write_q
+        while True:
+            batch: List[Tuple[Dict, asyncio.Future]] = [await queue.get()]
+            deadline = loop.time() + CHAT_WRITE_MAX_WAIT
+            while len(batch) < CHAT_WRITE_BATCH:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                supabase = await self.init()
+                response = await supabase.table("chats").insert([row for row, _ in batch]).execute()
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            # PostgREST returns the inserted rows in input order
+            rows = response.data or []
+            for (_, future), row in zip(batch, rows):
+                if not future.done():
+                    future.set_result(row)
+            if len(rows) < len(batch):
+                # e.g. return=minimal or RLS hiding rows: never leave a caller waiting
+                missing = RuntimeError(
+                    f"Chat insert returned {len(rows)} of {len(batch)} rows"
+                )
+                for _, future in batch[len(rows):]:
+                    if not future.done():
+                        future.set_exception(missing)
+            logger.debug("Stored %d chats in one insert", len(batch))
     
     async def get_user_chats(
         self,
@@ -49,8 +142,9 @@ class ChatService:
     ) -> List[Dict]:
         """Get user's chat history"""
         try:
-            response = (
-                self.supabase.table("chats")
+            supabase = await self.init()
+            response = await (
+                supabase.table("chats")
                 .select("*")
                 .eq("user_id", user_id)
                 .order("created_at", desc=True)
@@ -63,10 +157,24 @@ class ChatService:
             return []
     
     async def get_chat_sessions(self, user_id: str) -> List[Dict]:
-        """Get unique chat sessions for a user"""
+        """Get unique chat sessions for a user (latest chat of each, newest first)"""
         try:
-            response = (
-                self.supabase.table("chats")
+            supabase = await self.init()
+            if self._sessions_rpc:
+                try:
+                    response = await supabase.rpc("get_user_sessions", {"uid": user_id}).execute()
+                    return response.data
+                except Exception as e:
+                    if getattr(e, "code", None) == "PGRST202":  # PostgREST: function not found
+                        self._sessions_rpc = False
+                        logger.warning(
+                            "get_user_sessions RPC not deployed; grouping sessions client-side. "
+                            "Apply CHAT_SESSIONS_SQL from services/chat_service.py to fix."
+                        )
+                    else:
+                        logger.warning(f"get_user_sessions RPC failed, grouping client-side: {e}")
+            response = await (
+                supabase.table("chats")
                 .select("session_id, title, created_at")
                 .eq("user_id", user_id)
                 .order("created_at", desc=True)
@@ -92,8 +200,9 @@ class ChatService:
     ) -> List[Dict]:
         """Get all chats from a specific session"""
         try:
-            response = (
-                self.supabase.table("chats")
+            supabase = await self.init()
+            response = await (
+                supabase.table("chats")
                 .select("*")
                 .eq("user_id", user_id)
                 .eq("session_id", session_id)
@@ -104,14 +213,6 @@ class ChatService:
         except Exception as e:
             logger.error(f"Failed to get session chats: {e}")
             return []
-    
-    def _generate_title(self, user_message: str) -> str:
-        """Generate a title from the first user message"""
-        # Take first 50 characters and clean up
-        title = user_message[:50].strip()
-        if len(user_message) > 50:
-            title += "..."
-        return title
 
 # Global instance
 chat_service = ChatService() 
\ No newline at end of file
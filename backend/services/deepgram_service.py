@@ -1,18 +1,120 @@
 """
 Deepgram Speech-to-Text Service
 """
-import requests
+import asyncio
 import os
+from typing import AsyncIterator, List, Optional
+from urllib.parse import urlencode
+
+import aiofiles
+import aiohttp
+import msgspec
+import websockets
 from config import DEEPGRAM_CONFIG
+from services.retry_policy import transient_retry
+
+
+# Typed views of Deepgram's responses holding only what we read. msgspec skips
+# everything else (word-level timings, confidences, metadata) while decoding
+# instead of building dicts for it.
+class _Alternative(msgspec.Struct):
+    transcript: str = ""
+
+
+class _Channel(msgspec.Struct):
+    alternatives: List[_Alternative] = []
+
+
+class _Results(msgspec.Struct):
+    channels: List[_Channel]
+
+
+class _PrerecordedResponse(msgspec.Struct):
+    results: _Results
+
+
+class _LiveMessage(msgspec.Struct):
+    type: str = ""
+    channel: Optional[_Channel] = None
+
+
+_PRERECORDED_DECODER = msgspec.json.Decoder(_PrerecordedResponse)
+_LIVE_DECODER = msgspec.json.Decoder(_LiveMessage)
+
+# One pooled session for every DeepgramService (a new service is built per turn)
+_SESSION: Optional[aiohttp.ClientSession] = None
+_SESSION_LOCK = asyncio.Lock()
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    global _SESSION
+    if _SESSION is None or _SESSION.closed:
+        async with _SESSION_LOCK:
+            if _SESSION is None or _SESSION.closed:
+                _SESSION = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=50, ttl_dns_cache=300)
+                )
+    return _SESSION
+
+
+async def close_session() -> None:
+    """Close the pooled session (app shutdown)."""
+    global _SESSION
+    if _SESSION is not None and not _SESSION.closed:
+        await _SESSION.close()
+    _SESSION = None
+
+
+class _TransientDeepgramError(Exception):
+    """A 429/5xx from Deepgram; retried, honouring ``retry_after`` if the server sent one."""
+
+    def __init__(self, status: int, body: str, retry_after: Optional[str] = None):
+        super().__init__(f"Deepgram {status}: {body}")
+        self.retry_after = retry_after
+
+
+async def _file_chunks(path: str):
+    # Streams the upload from disk instead of buffering the whole file
+    async with aiofiles.open(path, 'rb') as audio_file:
+        while chunk := await audio_file.read(UPLOAD_CHUNK_SIZE):
+            yield chunk
 
 
 class DeepgramService:
+    _CONTENT_TYPE_MAP = {
+        '.mp3': 'audio/mp3',
+        '.wav': 'audio/wav',
+        '.m4a': 'audio/mp4',
+        '.flac': 'audio/flac'
+    }
+    _DEFAULT_CONTENT_TYPE = 'audio/mp3'
+
     def __init__(self, config=None):
         self.config = config or DEEPGRAM_CONFIG
         self.api_key = self.config["api_key"]
         self.base_url = "https://api.deepgram.com/v1/listen"
-
-    def transcribe(self, audio_file_path):
+        # Config never changes after construction, so the request parts are built once
+        self._punctuate = str(self.config.get("punctuate", True)).lower()
+        self._params = {
+            'punctuate': self._punctuate,
+            'language': self.config.get("language", "en")
+        }
+        self._headers_by_type = {
+            content_type: {'Authorization': f'Token {self.api_key}', 'Content-Type': content_type}
+            for content_type in {*self._CONTENT_TYPE_MAP.values(), self._DEFAULT_CONTENT_TYPE}
+        }
+        self._live_url = "wss://api.deepgram.com/v1/listen?" + urlencode({
+            'model': 'nova-2',
+            'encoding': 'linear16',
+            'channels': 1,
+            'sample_rate': self.config.get("sample_rate", 16000),
+            'interim_results': str(self.config.get("interim_results", True)).lower(),
+            'punctuate': self._punctuate,
+            'language': self.config.get("language", "en"),
+        })
+
+    async def transcribe(self, audio_file_path):
         """
         Transcribe audio file to text
 
@@ -30,44 +132,83 @@ class DeepgramService:
 
         # Determine content type based on file extension
         file_extension = os.path.splitext(audio_file_path)[1].lower()
-        content_type_map = {
-            '.mp3': 'audio/mp3',
-            '.wav': 'audio/wav',
-            '.m4a': 'audio/mp4',
-            '.flac': 'audio/flac'
-        }
-        content_type = content_type_map.get(file_extension, 'audio/mp3')
-
-        headers = {
-            'Authorization': f'Token {self.api_key}',
-            'Content-Type': content_type
-        }
-
-        params = {
-            'punctuate': str(self.config.get("punctuate", True)).lower(),
-            'language': self.config.get("language", "en")
-        }
+        content_type = self._CONTENT_TYPE_MAP.get(file_extension, self._DEFAULT_CONTENT_TYPE)
+        headers = self._headers_by_type[content_type]
 
         try:
-            with open(audio_file_path, 'rb') as audio_file:
-                response = requests.post(
-                    self.base_url,
-                    headers=headers,
-                    params=params,
-                    data=audio_file
-                )
-
-            if response.status_code == 200:
-                transcript = response.json()['results']['channels'][0]['alternatives'][0]['transcript']
-                print(f"📝 Transcript: {transcript}")
-                return transcript
-            else:
-                print(f"❌ Deepgram error: {response.status_code} - {response.text}")
-                return None
-
+            transcript = await self._post_audio(audio_file_path, headers)
         except Exception as e:
             print(f"❌ Error transcribing audio: {e}")
             return None
+        if transcript is not None:
+            print(f"📝 Transcript: {transcript}")
+        return transcript
+
+    @transient_retry(aiohttp.ClientConnectionError, asyncio.TimeoutError, _TransientDeepgramError)
+    async def _post_audio(self, audio_file_path, headers):
+        # Each attempt re-opens the file, since the upload body is a one-shot stream
+        session = await _get_session()
+        async with session.post(
+            self.base_url,
+            headers=headers,
+            params=self._params,
+            data=_file_chunks(audio_file_path)
+        ) as response:
+            if response.status == 200:
+                result = _PRERECORDED_DECODER.decode(await response.read())
+                return result.results.channels[0].alternatives[0].transcript
+            body = await response.text()
+            if response.status == 429 or response.status >= 500:
+                raise _TransientDeepgramError(response.status, body, response.headers.get('Retry-After'))
+            print(f"❌ Deepgram error: {response.status} - {body}")
+            return None
+
+    async def transcribe_stream(self, audio_iter: AsyncIterator[bytes]) -> AsyncIterator[str]:
+        """
+        Transcribe raw 16-bit mono PCM as it is produced
+
+        Sends each chunk from ``audio_iter`` to Deepgram's live ``/v1/listen``
+        websocket and yields transcripts (interim and final) as they come back,
+        so transcription overlaps capture instead of starting after it.
+
+        Args:
+            audio_iter: async iterator of linear16 audio chunks
+
+        Yields:
+            str: non-empty transcript segments
+        """
+        async with websockets.connect(
+            self._live_url, additional_headers={'Authorization': f'Token {self.api_key}'}
+        ) as ws:
+            async def send_audio():
+                try:
+                    async for chunk in audio_iter:
+                        await ws.send(chunk)
+                except Exception:
+                    # No CloseStream is coming; end the receive loop now rather
+                    # than at Deepgram's idle timeout
+                    await ws.close()
+                    raise
+                # Ask Deepgram to flush final results and close
+                await ws.send('{"type": "CloseStream"}')
+
+            sender = asyncio.create_task(send_audio())
+            try:
+                async for message in ws:
+                    result = _LIVE_DECODER.decode(message)
+                    if result.type != 'Results' or result.channel is None or not result.channel.alternatives:
+                        continue
+                    transcript = result.channel.alternatives[0].transcript
+                    if transcript:
+                        yield transcript
+            finally:
+                if not sender.done():
+                    sender.cancel()
+                try:
+                    # Re-raises an audio_iter failure instead of ending quietly
+                    await sender
+                except asyncio.CancelledError:
+                    pass
 
 
 # Alternative STT services can be added here
@@ -2,12 +2,42 @@ import os
 import asyncio
 import logging
 import json
-from typing import Callable, Optional
+import random
+import struct
+from collections import OrderedDict, deque
+from contextlib import suppress
+from typing import Callable, Optional, Tuple
 from deepgram import DeepgramClient, LiveTranscriptionEvents, LiveOptions
 from config import DEEPGRAM_CONFIG
+from services.pcm_ring_buffer import PCMRingBuffer
 
 logger = logging.getLogger(__name__)
 
+PCM_FRAME_BYTES = 2048  # 64 ms of 16 kHz linear16 mono
+AUDIO_BUFFER_FRAMES = 32  # ~2 s of audio; older frames are dropped beyond this
+PENDING_EVENTS_MAX = 64  # per kind; the oldest unprocessed event is dropped beyond this
+TRANSCRIPT_DEDUP_WINDOW = 16  # recent transcripts a final is checked against
+RECONNECT_MAX_BACKOFF = 30  # seconds, before jitter
+MAX_FRAMES_PER_SEND = 8  # coalesce up to 512 ms of backlog into one websocket message
+AUDIO_LOG_EVERY_CHUNKS = 100  # the stream loop logs a progress line this often
+_KEEPALIVE_FRAME = json.dumps({"type": "KeepAlive"})
+# RIFF id, file size, format, (fmt chunk id/size, audio format, channels), sample rate
+_WAV_HEADER = struct.Struct('<4sI4s12xI')
+
+
+def _extract_transcript(result) -> Tuple[str, bool, bool]:
+    """``(transcript, is_final, speech_final)`` from a Deepgram result; empty if it has no transcript."""
+    try:
+        alt = result.channel.alternatives[0]
+        return (
+            alt.transcript or "",
+            bool(getattr(result, 'is_final', False)),
+            bool(getattr(result, 'speech_final', False)),
+        )
+    except (AttributeError, IndexError, TypeError):
+        return "", False, False
+
+
 class DeepgramStreamingService:
     def __init__(self, config=None):
         self.config = config or DEEPGRAM_CONFIG
@@ -15,7 +45,11 @@ class DeepgramStreamingService:
         self.dg_client = DeepgramClient(self.api_key)
         self.connection = None
         self.connected = False
-        self._audio_queue = asyncio.Queue()
+        self._audio_buffer = PCMRingBuffer(AUDIO_BUFFER_FRAMES, PCM_FRAME_BYTES)
+        # Wakes the stream loop: new audio, a VAD event or stop
+        self._wake = asyncio.Event()
+        self._overrun_logged = False
+        self._debug_chunk_count = 0
         self._stream_task = None
         self._reconnect_attempts = 0
         self._max_reconnects = 3
@@ -25,6 +59,12 @@ class DeepgramStreamingService:
         self._keepalive_task = None
         # Store the latest non-empty transcript so callers can fall back if needed
         self._latest_good_transcript: str = ""
+        self._result_type_logged = False
+        # Recent non-empty transcript texts (stripped), oldest first; a final repeating one is dropped
+        self._dedup_lru: "OrderedDict[str, None]" = OrderedDict()
+        # Filled on the SDK's thread, drained on the loop by _process_pending_events
+        self._pending_transcripts: deque = deque(maxlen=PENDING_EVENTS_MAX)
+        self._pending_vad_events: deque = deque(maxlen=PENDING_EVENTS_MAX)
         # Store reference to the asyncio loop that owns this service
         self._loop: Optional[asyncio.AbstractEventLoop] = None
 
@@ -74,31 +114,59 @@ class DeepgramStreamingService:
             logger.error(f"Config: {self.config}")
             self.connected = False
 
-    async def send_audio_chunk(self, audio_data: bytes):
-        """Queue audio chunk for streaming to Deepgram."""
+    def send_audio_chunk(self, audio_data: bytes):
+        """Queue audio chunk for streaming to Deepgram.
+
+        Synchronous: the ring buffer never blocks (a full one drops its oldest
+        frame), so there is nothing to await.
+        """
         if not self.connected:
             logger.warning("Deepgram connection not active. Dropping audio chunk.")
             return
         # Validate chunk size and content
-        if not audio_data or len(audio_data) < 1024:
-            logger.debug(f"Insufficient audio data: {len(audio_data) if audio_data else 0} bytes, skipping")
-            return
-        if not audio_data or len(audio_data) != 2048:
-            logger.warning(f"Dropping audio chunk: invalid size ({len(audio_data) if audio_data else 0} bytes), expected 2048 bytes of raw PCM.")
+        if not audio_data or len(audio_data) != PCM_FRAME_BYTES:
+            self._reject_chunk(audio_data)
             return
         # Debug the first few audio chunks to verify format
-        if not hasattr(self, '_debug_chunk_count'):
-            self._debug_chunk_count = 0
-        if self._debug_chunk_count < 3:
-            # Check if it looks like WAV header
-            if audio_data[:4] == b'RIFF':
-                logger.info(f"  WAV header detected")
-                logger.info(f"  File size: {int.from_bytes(audio_data[4:8], 'little')}")
-                logger.info(f"  Format: {audio_data[8:12]}")
-                logger.info(f"  Sample rate: {int.from_bytes(audio_data[24:28], 'little')}")
+        # Check if it looks like WAV header
+        if audio_data.startswith(b'RIFF'):
+            _, file_size, wav_format, sample_rate = _WAV_HEADER.unpack_from(audio_data, 0)
+            logger.info("  WAV header detected")
+            logger.info("  File size: %d", file_size)
+            logger.info("  Format: %s", wav_format)
+            logger.info("  Sample rate: %d", sample_rate)
         self._debug_chunk_count += 1
-        logger.debug(f"Queueing audio chunk: {len(audio_data)} bytes")
-        await self._audio_queue.put(audio_data)
+        if self._debug_chunk_count >= 3:
+            # Format checked; later chunks skip the sniffing entirely
+            self.send_audio_chunk = self._send_audio_chunk_fast
+        self._enqueue_chunk(audio_data)
+
+    def _send_audio_chunk_fast(self, audio_data: bytes):
+        """send_audio_chunk once the first chunks have been checked."""
+        if not self.connected:
+            logger.warning("Deepgram connection not active. Dropping audio chunk.")
+            return
+        if not audio_data or len(audio_data) != PCM_FRAME_BYTES:
+            self._reject_chunk(audio_data)
+            return
+        self._enqueue_chunk(audio_data)
+
+    @staticmethod
+    def _reject_chunk(audio_data: Optional[bytes]):
+        size = len(audio_data) if audio_data else 0
+        if size < 1024:
+            logger.debug("Insufficient audio data: %d bytes, skipping", size)
+        else:
+            logger.warning(f"Dropping audio chunk: invalid size ({size} bytes), expected {PCM_FRAME_BYTES} bytes of raw PCM.")
+
+    def _enqueue_chunk(self, audio_data: bytes):
+        if self._audio_buffer.push(audio_data) and not self._overrun_logged:
+            # Once per backlog: Deepgram is not keeping up, so the oldest audio goes
+            logger.warning(
+                f"Deepgram audio buffer full ({AUDIO_BUFFER_FRAMES} frames); dropping oldest audio"
+            )
+            self._overrun_logged = True
+        self._wake.set()
 
     async def stop_streaming(self):
         """Full shutdown (kept for compatibility)."""
@@ -108,6 +176,7 @@ class DeepgramStreamingService:
     async def stop_audio_only(self):
         """Stop sending audio but keep WebSocket open so final transcripts can arrive."""
         self._stop_event.set()
+        self._wake.set()
         if self._stream_task:
             try:
                 await self._stream_task
@@ -123,13 +192,13 @@ class DeepgramStreamingService:
             except Exception as e:
                 logger.error(f"Error closing Deepgram connection: {e}")
         self.connected = False
-        self._audio_queue = asyncio.Queue()
+        self._audio_buffer.clear()
 
     def _register_event_handlers(self):
         self.connection.on(LiveTranscriptionEvents.Open, self._on_open)
         self.connection.on(LiveTranscriptionEvents.Transcript, self.handle_transcript_event)
         self.connection.on(LiveTranscriptionEvents.SpeechStarted, self.handle_vad_event)
-        self.connection.on(LiveTranscriptionEvents.UtteranceEnd, self.handle_vad_event)
+        self.connection.on(LiveTranscriptionEvents.UtteranceEnd, self._on_utterance_end)
         self.connection.on(LiveTranscriptionEvents.Error, self._on_error)
         self.connection.on(LiveTranscriptionEvents.Close, self._on_close)
 
@@ -149,62 +218,65 @@ class DeepgramStreamingService:
         if result is None:
             logger.warning("[DeepgramStreamingService] No transcript payload found in callback arguments")
             return
-        logger.info(f"[DeepgramStreamingService] TRANSCRIPT RESULT TYPE: {type(result)}")
+        if not self._result_type_logged and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("[DeepgramStreamingService] Transcript result type: %s", type(result).__name__)
+            self._result_type_logged = True
         # Store for async processing
         # Avoid pushing duplicate or empty final transcripts to the queue to
         # prevent double-processing on the caller side. Deepgram sometimes
         # sends an extra `is_final` message with an empty `transcript` string
         # right after the real final message. That leads to logs such as
         # "processing 2 transcripts" even though only one meaningful utterance
-        # exists. We simply drop empty finals or consecutive duplicates.
+        # exists. We simply drop empty finals and finals repeating one of the
+        # last TRANSCRIPT_DEDUP_WINDOW finals of the current utterance.
 
-        transcript_text: str = ""
-        if hasattr(result, 'channel') and hasattr(result.channel, 'alternatives'):
-            transcript_text = result.channel.alternatives[0].transcript or ""
+        transcript, is_final, speech_final = _extract_transcript(result)
+        stripped = transcript.strip()
 
         # Deduplication conditions
         should_enqueue = True
-        if not transcript_text.strip():
+        if not stripped:
             # Empty transcript – very common artefact – skip.
             should_enqueue = False
-        else:
-            # Skip consecutive duplicates (compare with latest good transcript)
-            if transcript_text.strip() == getattr(self, '_latest_good_transcript', ""):
-                # Only skip if *both* have is_final flag to avoid losing early partials
-                if getattr(result, 'is_final', False):
-                    should_enqueue = False
+        elif is_final:
+            # Only finals are compared and recorded: the last interim usually
+            # matches its final, and partials must never be lost
+            if stripped in self._dedup_lru:
+                should_enqueue = False
+            else:
+                self._dedup_lru[stripped] = None
+                if len(self._dedup_lru) > TRANSCRIPT_DEDUP_WINDOW:
+                    self._dedup_lru.popitem(last=False)
+        if speech_final:
+            # Utterance over: the same words in a later turn are a new answer
+            self._dedup_lru.clear()
 
         if should_enqueue:
-            if hasattr(self, '_pending_transcripts'):
-                self._pending_transcripts.append(result)
-            else:
-                self._pending_transcripts = [result]
+            self._pending_transcripts.append(result)
         else:
             logger.info("[DeepgramStreamingService] 🚫 Skipping empty/duplicate final transcript event")
-        # Try to extract transcript for immediate logging
-        try:
-            if hasattr(result, 'channel') and hasattr(result.channel, 'alternatives'):
-                transcript = result.channel.alternatives[0].transcript
-                is_final = getattr(result, 'is_final', False)
-                speech_final = getattr(result, 'speech_final', False)
-                logger.info(f"[DeepgramStreamingService] LIVE TRANSCRIPT: '{transcript}' (is_final={is_final}, speech_final={speech_final})")
-                # CRITICAL FIX: Only update latest good transcript if we have actual content
-                if transcript.strip():  # Only update if we have real content
-                    self._latest_good_transcript = transcript
-                    logger.info(f"[DeepgramStreamingService] ✅ Updated latest good transcript: '{transcript}'")
-                else:
-                    logger.info(f"[DeepgramStreamingService] ❌ Ignoring empty transcript, keeping: '{self._latest_good_transcript}'")
-            else:
-                logger.info(f"[DeepgramStreamingService] TRANSCRIPT STRUCTURE: {dir(result)}")
-        except Exception as e:
-            logger.warning(f"[DeepgramStreamingService] Could not extract transcript: {e}")
+        log_info = logger.isEnabledFor(logging.INFO)
+        if log_info:
+            logger.info(
+                "[DeepgramStreamingService] LIVE TRANSCRIPT: '%s' (is_final=%s, speech_final=%s)",
+                transcript, is_final, speech_final,
+            )
+        # CRITICAL FIX: Only update latest good transcript if we have actual content
+        if stripped:  # Only update if we have real content
+            self._latest_good_transcript = transcript
+            if log_info:
+                logger.info("[DeepgramStreamingService] ✅ Updated latest good transcript: '%s'", transcript)
+        elif log_info:
+            logger.info(
+                "[DeepgramStreamingService] ❌ Ignoring empty transcript, keeping: '%s'", self._latest_good_transcript
+            )
         # --- CRITICAL: Immediately drain and run the async callback ---
-        if self._transcript_callback and self._loop and not self._loop.is_closed():
-            try:
-                # Schedule the coroutine to process pending events on the service's loop
-                asyncio.run_coroutine_threadsafe(self._process_pending_events(), self._loop)
-            except Exception as e:
-                logger.error(f"[DeepgramStreamingService] Error running transcript callback in event loop: {e}")
+        if self._transcript_callback:
+            self._signal_pending_events()
+
+    def _on_utterance_end(self, *args, **kwargs):
+        self._dedup_lru.clear()
+        self.handle_vad_event(*args, **kwargs)
 
     def handle_vad_event(self, *args, **kwargs):
         """Handle VAD events from Deepgram - synchronous handler"""
@@ -224,12 +296,25 @@ class DeepgramStreamingService:
             logger.warning("[DeepgramStreamingService] No VAD payload found in callback arguments")
             return
         # Store the event for later async processing
-        if hasattr(self, '_pending_vad_events'):
-            self._pending_vad_events.append(event)
-        else:
-            self._pending_vad_events = [event]
+        self._pending_vad_events.append(event)
         # Log the VAD event for debugging
-        logger.info(f"VAD event received: {type(event).__name__}")
+        logger.info("VAD event received: %s", type(event).__name__)
+        self._signal_pending_events()
+
+    def _signal_pending_events(self):
+        """Get queued events processed on the service's loop (called on the SDK's thread)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            if self._stop_event.is_set():
+                # Stream loop is gone (audio stopped), but final transcripts still have to arrive
+                asyncio.run_coroutine_threadsafe(self._process_pending_events(), loop)
+            else:
+                # No coroutine or Future per event: just wake the stream loop
+                loop.call_soon_threadsafe(self._wake.set)
+        except RuntimeError as e:  # loop closed in between
+            logger.error(f"[DeepgramStreamingService] Could not schedule event processing: {e}")
 
     def _on_error(self, *args, **kwargs):
         """Handle Deepgram WebSocket errors"""
@@ -248,57 +333,84 @@ class DeepgramStreamingService:
     async def _process_pending_events(self):
         """Process any pending transcript and VAD events"""
         # Process transcripts
-        if hasattr(self, '_pending_transcripts') and self._pending_transcripts:
-            logger.info(f"[DeepgramStreamingService] _process_pending_events: processing {len(self._pending_transcripts)} transcripts")
-            for result in self._pending_transcripts:
+        if self._pending_transcripts:
+            logger.info("[DeepgramStreamingService] _process_pending_events: processing %d transcripts", len(self._pending_transcripts))
+            # popleft, not iteration: the SDK thread may append while a callback awaits
+            while self._pending_transcripts:
+                result = self._pending_transcripts.popleft()
                 if self._transcript_callback:
                     #logger.info(f"[DeepgramStreamingService] _process_pending_events: calling transcript_callback with result: {result}")
                     try:
                         await self._transcript_callback(result)
                     except Exception as e:
                         logger.error(f"Error in transcript callback: {e}")
-            self._pending_transcripts = []
         # Process VAD events
-        if hasattr(self, '_pending_vad_events') and self._pending_vad_events:
-            logger.info(f"[DeepgramStreamingService] _process_pending_events: processing {len(self._pending_vad_events)} VAD events")
-            for event in self._pending_vad_events:
+        if self._pending_vad_events:
+            logger.info("[DeepgramStreamingService] _process_pending_events: processing %d VAD events", len(self._pending_vad_events))
+            while self._pending_vad_events:
+                event = self._pending_vad_events.popleft()
                 if self._vad_callback:
                     try:
                         await self._vad_callback(event)
                     except Exception as e:
                         logger.error(f"Error in VAD callback: {e}")
-            self._pending_vad_events = []
 
     async def _audio_stream_loop(self):
         total_bytes_sent = 0
         chunk_count = 0
         while not self._stop_event.is_set():
             try:
-                # Process pending events first
-                await self._process_pending_events()
-                # Then handle audio with timeout
-                try:
-                    audio_data = await asyncio.wait_for(self._audio_queue.get(), timeout=0.1)
-                    if not self.connected:
-                        logger.warning("Not connected, skipping audio chunk.")
-                        continue
-                    chunk_count += 1
-                    total_bytes_sent += len(audio_data)
-                    logger.debug(f"Sending PCM chunk #{chunk_count} to Deepgram: {len(audio_data)} bytes (total: {total_bytes_sent})")
-                    self.connection.send(audio_data)
-                except asyncio.TimeoutError:
-                    # No audio data, continue loop to process events
+                # Sleep until there is audio or an event; cleared first so a wake during the drain is kept
+                await self._wake.wait()
+                self._wake.clear()
+                # Process pending events first; most wakes are audio only, so
+                # skip building the coroutine when nothing is queued
+                if self._pending_transcripts or self._pending_vad_events:
+                    await self._process_pending_events()
+                frames = []
+                while len(frames) < MAX_FRAMES_PER_SEND and (frame := self._audio_buffer.pop()) is not None:
+                    frames.append(frame)
+                if self._audio_buffer:
+                    self._wake.set()  # rest goes next pass, after pending events
+                else:
+                    self._overrun_logged = False
+                if not frames:
+                    continue
+                if not self.connected:
+                    logger.warning(f"Not connected, skipping {len(frames)} audio chunk(s).")
                     continue
+                # linear16 is a plain sample stream, so frames can be concatenated freely
+                audio_data = frames[0] if len(frames) == 1 else b"".join(frames)
+                previous_count = chunk_count
+                chunk_count += len(frames)
+                total_bytes_sent += len(audio_data)
+                if chunk_count // AUDIO_LOG_EVERY_CHUNKS != previous_count // AUDIO_LOG_EVERY_CHUNKS:
+                    logger.debug("Sent %d PCM chunks to Deepgram (%d bytes)", chunk_count, total_bytes_sent)
+                # send() is synchronous, so a view is done with before its slot can be reused
+                self.connection.send(audio_data)
             except Exception as e:
                 logger.error(f"Error in audio stream loop: {e}")
                 await asyncio.sleep(0.1)
+        # Events signalled just before stop; later ones are processed directly (see _signal_pending_events)
+        await self._process_pending_events()
         logger.info(f"Audio stream loop ended. Sent {chunk_count} chunks, {total_bytes_sent} total bytes")
 
     async def _handle_reconnect(self):
         if self._reconnect_attempts < self._max_reconnects:
             self._reconnect_attempts += 1
             logger.info(f"Attempting Deepgram reconnect ({self._reconnect_attempts})...")
-            await asyncio.sleep(2 ** self._reconnect_attempts)
+            # start_streaming spawns fresh tasks; stop the old ones instead of leaking them
+            current = asyncio.current_task()
+            for task in (self._keepalive_task, self._stream_task):
+                if task and task is not current and not task.done():
+                    task.cancel()
+                    with suppress(asyncio.CancelledError):
+                        await task
+            self._pending_transcripts.clear()
+            self._pending_vad_events.clear()
+            # Jittered so sessions dropped by the same outage do not reconnect in lockstep
+            backoff = min(RECONNECT_MAX_BACKOFF, 2 ** self._reconnect_attempts)
+            await asyncio.sleep(backoff * (0.5 + random.random()))
             await self.start_streaming(self._transcript_callback, self._vad_callback)
         else:
             logger.error("Max Deepgram reconnect attempts reached. Giving up.")
@@ -310,9 +422,8 @@ class DeepgramStreamingService:
             try:
                 await asyncio.sleep(5)  # Send every 5 seconds
                 if self.connected:
-                    keepalive_msg = {"type": "KeepAlive"}
                     # Send as text message, not binary
-                    self.connection.send(json.dumps(keepalive_msg))
+                    self.connection.send(_KEEPALIVE_FRAME)
                     logger.debug("Sent KeepAlive message")
             except Exception as e:
                 logger.error(f"KeepAlive error: {e}")
@@ -3,15 +3,39 @@ from typing import Callable, AsyncGenerator
 from elevenlabs.client import ElevenLabs
 from elevenlabs import VoiceSettings
 import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# The ElevenLabs SDK is sync: its blocking streams run on a dedicated, bounded
+# pool instead of the loop's default executor
+_TTS_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="tts")
+TTS_CHUNK_QUEUE_SIZE = 32  # chunks buffered between the SDK thread and the loop
+
+
+@functools.lru_cache(maxsize=4)
+def _get_client(api_key: str) -> ElevenLabs:
+    """One SDK client, and so one keep-alive HTTP pool, per API key."""
+    return ElevenLabs(api_key=api_key)
+
 
 class ElevenLabsStreamingService:
     """
     Service for streaming text-to-speech audio from ElevenLabs using their SDK.
     """
+    # Shared by every request; the SDK only serializes it
+    _DEFAULT_VOICE_SETTINGS = VoiceSettings(
+        stability=0.0,
+        similarity_boost=1.0,
+        style=0.0,
+        use_speaker_boost=True,
+        speed=1.0,
+    )
+
     def __init__(self, api_key: str = None, voice_id: str = None):
         self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
         self.voice_id = voice_id or os.getenv("ELEVENLABS_VOICE_ID", "bIHbv24MWmeRgasZH58o")
-        self.elevenlabs = ElevenLabs(api_key=self.api_key)
+        self.elevenlabs = _get_client(self.api_key)
 
     async def stream_tts(self, text: str, audio_callback: Callable[[bytes], None],
                         output_format: str = "mp3_22050_32", model_id: str = "eleven_turbo_v2_5"):
@@ -23,25 +47,42 @@ class ElevenLabsStreamingService:
             output_format (str): Audio output format (default mp3_22050_32).
             model_id (str): ElevenLabs model to use (default turbo).
         """
-        # ElevenLabs SDK is sync, so run in thread executor
+        loop = asyncio.get_running_loop()
+        chunks: asyncio.Queue = asyncio.Queue(maxsize=TTS_CHUNK_QUEUE_SIZE)
+        stop = threading.Event()
+
+        # ElevenLabs SDK is sync, so iterate it on the TTS pool and hand the
+        # chunks to the loop; audio_callback always runs on the loop
         def _stream():
-            response = self.elevenlabs.text_to_speech.stream(
-                voice_id=self.voice_id,
-                output_format=output_format,
-                text=text,
-                model_id=model_id,
-                optimize_streaming_latency=4,  # max latency optimisations per ElevenLabs docs
-                request_options={"chunk_size": 512},  # smaller chunks for quicker first byte
-                voice_settings=VoiceSettings(
-                    stability=0.0,
-                    similarity_boost=1.0,
-                    style=0.0,
-                    use_speaker_boost=True,
-                    speed=1.0,
-                ),
-            )
-            for chunk in response:
-                if chunk:
-                    audio_callback(chunk)
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, _stream) 
\ No newline at end of file
+            try:
+                response = self.elevenlabs.text_to_speech.stream(
+                    voice_id=self.voice_id,
+                    output_format=output_format,
+                    text=text,
+                    model_id=model_id,
+                    optimize_streaming_latency=4,  # max latency optimisations per ElevenLabs docs
+                    request_options={"chunk_size": 512},  # smaller chunks for quicker first byte
+                    voice_settings=self._DEFAULT_VOICE_SETTINGS,
+                )
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    if chunk:
+                        # blocks this thread while the queue is full
+                        asyncio.run_coroutine_threadsafe(chunks.put(chunk), loop).result()
+            finally:
+                asyncio.run_coroutine_threadsafe(chunks.put(None), loop)
+
+        producer = loop.run_in_executor(_TTS_EXECUTOR, _stream)
+        try:
+            while True:
+                chunk = await chunks.get()
+                if chunk is None:
+                    break
+                audio_callback(chunk)
+        finally:
+            # on early exit, let a producer blocked on a full queue see `stop`
+            stop.set()
+            while not chunks.empty():
+                chunks.get_nowait()
+        await producer
@@ -1,10 +1,23 @@
 import asyncio
-from websockets.legacy.client import connect as ws_connect
-import json
+from websockets.asyncio.client import connect as ws_connect
 import logging
 from typing import Callable, Optional
 import os
-import base64
+import binascii
+import orjson
+try:
+    import pybase64  # optional SIMD base64 decoder
+except ImportError:
+    pybase64 = None
+
+_EOS_MESSAGE = orjson.dumps({"text": ""}).decode()
+# Both read the ASCII str directly, without first copying it into bytes
+_b64decode = pybase64.b64decode if pybase64 is not None else binascii.a2b_base64
+AUDIO_OUT_QUEUE_SIZE = 16  # decoded chunks awaiting audio_callback; the listener waits when full
+WS_MAX_MESSAGE_BYTES = 2 ** 20  # a base64 audio message is well under this
+WS_MAX_QUEUE = 32  # inbound messages buffered before reading pauses
+WS_WRITE_LIMIT = (2 ** 16, 2 ** 15)  # high/low water marks for outgoing text
+WS_OPEN_TIMEOUT = 5  # seconds
 
 class ElevenLabsWebSocketService:
     """
@@ -20,16 +33,36 @@ class ElevenLabsWebSocketService:
         self.audio_callback = None
         self.current_context_id = None  # Track current context
         self.context_counter = 0  # For generating unique context IDs
+        # Per-context message parts, serialized once in _create_new_context
+        self._chunk_suffix = None
+        self._flush_message = None
+        self._close_message = None
+        # Decoded audio is handed to audio_callback by its own task, so a slow
+        # callback never holds up websocket.recv()
+        self._audio_out: Optional[asyncio.Queue] = None
+        self._audio_task: Optional[asyncio.Task] = None
         
     async def connect_streaming_session(self, audio_callback: Callable[[bytes], None]):
         """Connect to Multi-Context WebSocket endpoint"""
         self.audio_callback = audio_callback
         uri = f"wss://api.elevenlabs.io/v1/text-to-speech/{self.voice_id}/multi-stream-input?model_id=eleven_flash_v2_5"
         try:
-            self.websocket = await ws_connect(uri)
+            # base64 audio barely deflates, so compression only costs CPU and latency
+            self.websocket = await ws_connect(
+                uri,
+                compression=None,
+                max_size=WS_MAX_MESSAGE_BYTES,
+                max_queue=WS_MAX_QUEUE,
+                write_limit=WS_WRITE_LIMIT,
+                open_timeout=WS_OPEN_TIMEOUT,
+            )
             self.is_connected = True
             await self._create_new_context()
-            asyncio.create_task(self._listen_for_audio())
+            # Fresh queue per connection: a previous consumer drains its own
+            # queue up to the end-of-stream marker and exits
+            self._audio_out = asyncio.Queue(maxsize=AUDIO_OUT_QUEUE_SIZE)
+            self._audio_task = asyncio.create_task(self._deliver_audio(self._audio_out))
+            asyncio.create_task(self._listen_for_audio(self._audio_out))
             logging.info("ElevenLabs Multi-Context WebSocket connected")
         except Exception as e:
             logging.error(f"Failed to connect to ElevenLabs Multi-Context WebSocket: {e}")
@@ -55,7 +88,12 @@ class ElevenLabsWebSocketService:
             },
             "output_format": "mp3_22050_32"
         }
-        await self.websocket.send(json.dumps(init_message))
+        await self.websocket.send(orjson.dumps(init_message).decode())
+        context_json = orjson.dumps(self.current_context_id).decode()
+        # stream_text_chunk only has to JSON-escape the text itself
+        self._chunk_suffix = f',"context_id":{context_json},"try_trigger_generation":true}}'
+        self._flush_message = f'{{"text":"","context_id":{context_json},"flush":true}}'
+        self._close_message = f'{{"text":"","context_id":{context_json}}}'
         logging.info(f"Created new context: {self.current_context_id}")
         return self.current_context_id
 
@@ -63,12 +101,8 @@ class ElevenLabsWebSocketService:
         """Interrupt current speech and create new context"""
         if not self.is_connected or not self.current_context_id:
             return None
-        close_message = {
-            "text": "",
-            "context_id": self.current_context_id
-        }
         try:
-            await self.websocket.send(json.dumps(close_message))
+            await self.websocket.send(self._close_message)
             logging.info(f"Closed context for interruption: {self.current_context_id}")
             new_context_id = await self._create_new_context()
             logging.info(f"Created new context after interruption: {new_context_id}")
@@ -95,12 +129,8 @@ class ElevenLabsWebSocketService:
         if not await self.ensure_connection() or not self.current_context_id:
             return
         try:
-            message = {
-                "text": text_chunk,
-                "context_id": self.current_context_id,
-                "try_trigger_generation": True
-            }
-            await self.websocket.send(json.dumps(message))
+            # decoded to str so it still goes out as a text frame
+            await self.websocket.send('{"text":' + orjson.dumps(text_chunk).decode() + self._chunk_suffix)
             logging.debug(f"Sent text chunk to {self.current_context_id}: {text_chunk}")
         except Exception as e:
             logging.error(f"Failed to send text chunk: {e}")
@@ -114,8 +144,7 @@ class ElevenLabsWebSocketService:
         if not self.is_connected or not self.websocket:
             return
         try:
-            eos_message = {"text": ""}
-            await self.websocket.send(json.dumps(eos_message))
+            await self.websocket.send(_EOS_MESSAGE)
             logging.debug("Sent EOS message to ElevenLabs")
             try:
                 await asyncio.wait_for(self.websocket.wait_closed(), timeout=15.0)
@@ -124,6 +153,7 @@ class ElevenLabsWebSocketService:
                 logging.warning("Timed out waiting for ElevenLabs to finish streaming audio")
                 await self.websocket.close()
             self.is_connected = False
+            await self._stop_audio_delivery()
         except Exception as e:
             logging.error(f"Error finishing stream: {e}")
             self.is_connected = False
@@ -136,30 +166,41 @@ class ElevenLabsWebSocketService:
         if not self.is_connected or not self.current_context_id:
             return
         try:
-            flush_message = {
-                "text": "",
-                "context_id": self.current_context_id,
-                "flush": True
-            }
-            await self.websocket.send(json.dumps(flush_message))
+            await self.websocket.send(self._flush_message)
             logging.debug(f"Sent flush to context: {self.current_context_id}")
             await asyncio.sleep(0.5)
-            close_message = {
-                "text": "",
-                "context_id": self.current_context_id
-            }
-            await self.websocket.send(json.dumps(close_message))
+            await self.websocket.send(self._close_message)
             logging.info(f"Closed context: {self.current_context_id}")
             await asyncio.sleep(1.0)
         except Exception as e:
             logging.error(f"Error during flush and finish: {e}")
             self.is_connected = False
 
-    async def _listen_for_audio(self):
+    async def _deliver_audio(self, queue: asyncio.Queue):
+        """Feed queued chunks to audio_callback until the ``None`` end-of-stream marker."""
+        while True:
+            chunk = await queue.get()
+            if chunk is None:
+                return
+            try:
+                self.audio_callback(chunk)
+            except Exception as e:
+                logging.error(f"Audio callback failed: {e}")
+
+    async def _stop_audio_delivery(self):
+        """Wait for the queued audio to reach audio_callback, then end the consumer task."""
+        if self._audio_task is None:
+            return
+        await self._audio_out.put(None)
+        await self._audio_task
+        self._audio_task = None
+
+    async def _listen_for_audio(self, audio_out: asyncio.Queue):
         try:
             while self.is_connected and self.websocket:
                 msg = await self.websocket.recv()
-                data = json.loads(msg)
+                # orjson parses the large base64 payloads several times faster than json
+                data = orjson.loads(msg)
                 if "audio" in data:
                     context_id = data.get("contextId", "unknown")
                     is_final = data.get("isFinal", False)
@@ -169,13 +210,16 @@ class ElevenLabsWebSocketService:
                         continue  # Don't break, other contexts might be active
                     elif audio_data is not None and audio_data != "":
                         try:
-                            audio_bytes = base64.b64decode(audio_data)
+                            audio_bytes = _b64decode(audio_data)
                             if len(audio_bytes) > 0 and self.audio_callback:
-                                self.audio_callback(audio_bytes)
-                                logging.debug(f"Audio chunk from {context_id}: {len(audio_bytes)} bytes")
+                                # Speech must never be dropped: when the callback lags,
+                                # wait for it (the socket buffers, then backpressures)
+                                await audio_out.put(audio_bytes)
+                                logging.debug("Audio chunk from %s: %d bytes", context_id, len(audio_bytes))
                         except Exception as e:
                             logging.error(f"Failed to decode audio chunk: {e}")
         except Exception as e:
             logging.error(f"Error listening for audio: {e}")
         finally:
-            self.is_connected = False 
\ No newline at end of file
+            self.is_connected = False
+            await audio_out.put(None) 
\ No newline at end of file
@@ -0,0 +1,38 @@
+"""Shared async HTTP pool for the LLM clients.
+
+OpenRouter and Groq are both reached through OpenAI-style SDK clients; giving
+them one ``httpx.AsyncClient`` means every request reuses a warm HTTP/2
+connection (one TLS session per host, streams multiplexed) instead of each
+client — and Groq's per-request client — opening its own pool.
+"""
+import asyncio
+import logging
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+SHARED_HTTPX = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
+
+# Unauthenticated GETs are enough to open the TLS + HTTP/2 session; the status
+# code (401 for Groq) does not matter.
+WARMUP_URLS = (
+    "https://openrouter.ai/api/v1/models",
+    "https://api.groq.com/openai/v1/models",
+)
+
+
+async def warm_llm_connections() -> None:
+    """Open the pooled connections at startup so the first reply skips the handshakes."""
+    results = await asyncio.gather(*(SHARED_HTTPX.get(url) for url in WARMUP_URLS), return_exceptions=True)
+    for url, result in zip(WARMUP_URLS, results):
+        if isinstance(result, BaseException):
+            logger.warning("LLM connection warm-up failed for %s: %s", url, result)
+
+
+async def close_shared_httpx() -> None:
+    await SHARED_HTTPX.aclose()
@@ -178,18 +178,15 @@ class MemoryCoordinator:
                     # 2) Store EACH extracted fact as its own atomic memory so it
                     #    receives an independent embedding and can be recalled via
                     #    similarity search (e.g., user name, family info, etc.).
-                    for fact in enhancement.get("memory_facts", []):
-                        # Skip if fact already stored as main data to avoid duplicates
-                        if fact == enhanced_messages[0]["content"] or fact == enhanced_messages[1]["content"]:
-                            pass  # already captured in behavioural row
-                        await self.mem0_service.store_conversation_memory(
-                            messages=[{"role": "system", "content": fact}],
+                    facts = enhancement.get("memory_facts", [])
+                    if facts:
+                        await self.mem0_service.store_memory_facts(
+                            facts,
                             user_id=op["user_id"],
                             metadata={
                                 "fact_source": "enhancer",
                                 "origin_turn": content["metadata"].get("timestamp"),
                             },
-                            infer=False,  # direct insert, no extra LLM pass
                         )
                 else:
                     # Fallback to original storage
@@ -0,0 +1,49 @@
+"""Bounded drop-oldest buffer for fixed-size PCM frames.
+
+Used between the websocket handler and the Deepgram sender: when the upstream
+falls behind, the oldest audio is discarded instead of queueing without limit,
+so memory stays bounded and the transcript lag cannot run away.
+"""
+from typing import Optional
+
+
+class PCMRingBuffer:
+    """FIFO of ``capacity_frames`` equal-sized frames in one preallocated ``bytearray``.
+
+    Single producer / single consumer on one event loop: ``head`` and ``tail``
+    are plain ints, since nothing can run between their reads and writes.
+    """
+
+    def __init__(self, capacity_frames: int = 32, frame_bytes: int = 2048):
+        self.capacity = capacity_frames
+        self.frame_bytes = frame_bytes
+        self._buf = bytearray(capacity_frames * frame_bytes)
+        self._view = memoryview(self._buf)
+        self._head = 0  # frames written
+        self._tail = 0  # frames read or dropped
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+    def push(self, frame: bytes) -> bool:
+        """Copy ``frame`` into the next slot; returns ``True`` if the oldest frame was dropped."""
+        if len(frame) != self.frame_bytes:
+            raise ValueError(f"expected a {self.frame_bytes}-byte frame, got {len(frame)} bytes")
+        dropped = self._head - self._tail == self.capacity
+        if dropped:
+            self._tail += 1
+        start = (self._head % self.capacity) * self.frame_bytes
+        self._view[start:start + self.frame_bytes] = frame
+        self._head += 1
+        return dropped
+
+    def pop(self) -> Optional[memoryview]:
+        """Oldest frame as a view into the buffer (valid until the next ``push``), or ``None``."""
+        if self._head == self._tail:
+            return None
+        start = (self._tail % self.capacity) * self.frame_bytes
+        self._tail += 1
+        return self._view[start:start + self.frame_bytes]
+
+    def clear(self) -> None:
+        self._tail = self._head
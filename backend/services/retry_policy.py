@@ -0,0 +1,65 @@
+"""Retry policy for transient upstream failures (LLM providers, Deepgram).
+
+Rate limits, 5xx responses and dropped connections are retried with
+exponential backoff and full jitter instead of surfacing to the user. A
+``Retry-After`` sent with the failure takes precedence over the backoff.
+"""
+import logging
+from typing import Optional
+
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential_jitter,
+)
+
+logger = logging.getLogger(__name__)
+
+RETRY_ATTEMPTS = 5
+RETRY_INITIAL_WAIT = 1.0  # seconds
+RETRY_MAX_WAIT = 30.0  # seconds
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds the server asked us to wait, from ``exc.retry_after`` or its response headers."""
+    value = getattr(exc, "retry_after", None)
+    if value is None:
+        response = getattr(exc, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):  # HTTP-date form; fall back to backoff
+        return None
+
+
+class _wait_retry_after_or_backoff:
+    def __init__(self, backoff, max_wait: float):
+        self.backoff = backoff
+        self.max_wait = max_wait
+
+    def __call__(self, retry_state) -> float:
+        delay = _retry_after(retry_state.outcome.exception())
+        if delay is None:
+            return self.backoff(retry_state)
+        return min(max(delay, 0.0), self.max_wait)
+
+
+def transient_retry(*exception_types: type, attempts: int = RETRY_ATTEMPTS):
+    """Decorator retrying ``exception_types`` with jittered exponential backoff.
+
+    Works on plain and ``async`` functions; the last exception is re-raised
+    unchanged once ``attempts`` are used up, so existing handlers still see it.
+    """
+    return retry(
+        retry=retry_if_exception_type(exception_types),
+        wait=_wait_retry_after_or_backoff(
+            wait_exponential_jitter(initial=RETRY_INITIAL_WAIT, max=RETRY_MAX_WAIT), RETRY_MAX_WAIT
+        ),
+        stop=stop_after_attempt(attempts),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True,
+    )
@@ -0,0 +1,82 @@
+"""Per-user semantic cache of LLM replies.
+
+A user message whose embedding is within ``LLM_SEMANTIC_CACHE_THRESHOLD`` cosine
+of one answered in the last few minutes gets that answer replayed instead of a
+new LLM call. Embeddings come from the memory service's MiniLM query embedder,
+which the context builder has usually just run for the same message, so a
+lookup is one cached vector and one small dot product.
+
+Opt-in (``LLM_SEMANTIC_CACHE=true``): replies depend on the whole prompt, so only
+near-verbatim repeats should hit, and a user's entries are dropped as soon as a
+new memory is stored for them.
+"""
+import logging
+import os
+from typing import Iterator, List, Optional
+
+from memory.context_cache import SemanticContextCache
+from services.service_registry import ServiceRegistry
+
+logger = logging.getLogger(__name__)
+
+LLM_SEMANTIC_CACHE_ENABLED = os.getenv("LLM_SEMANTIC_CACHE", "false").lower() == "true"
+LLM_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("LLM_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+LLM_SEMANTIC_CACHE_TTL = 300  # seconds
+
+_RESPONSE_CACHE = SemanticContextCache(
+    per_user_capacity=32,
+    ttl=LLM_SEMANTIC_CACHE_TTL,
+    threshold=LLM_SEMANTIC_CACHE_THRESHOLD,
+    max_users=10_000,
+)
+_listening = False
+
+
+def _on_memory_written(user_id: str) -> None:
+    _RESPONSE_CACHE.invalidate(user_id)
+
+
+async def _embed(text: str) -> Optional[List[float]]:
+    global _listening
+    memory_service = ServiceRegistry.get_memory_service()
+    if not _listening:
+        type(memory_service).add_write_listener(_on_memory_written)
+        _listening = True
+    return await memory_service.embed_query(text)
+
+
+async def lookup(user_id: Optional[str], text: Optional[str]) -> Optional[str]:
+    """Cached reply for a message semantically equal to ``text``, else ``None``."""
+    if not (LLM_SEMANTIC_CACHE_ENABLED and user_id and text):
+        return None
+    try:
+        embedding = await _embed(text)
+    except Exception as e:
+        logger.debug("LLM semantic cache lookup skipped: %s", e)
+        return None
+    if embedding is None:
+        return None
+    response = _RESPONSE_CACHE.lookup(user_id, embedding)
+    if response is not None:
+        logger.info("🎯 Replaying semantically cached reply for %s", user_id)
+    return response
+
+
+async def insert(user_id: Optional[str], text: Optional[str], response: str) -> None:
+    if not (LLM_SEMANTIC_CACHE_ENABLED and user_id and text and response):
+        return
+    try:
+        embedding = await _embed(text)
+    except Exception as e:
+        logger.debug("LLM semantic cache insert skipped: %s", e)
+        return
+    if embedding is not None:
+        _RESPONSE_CACHE.add(user_id, embedding, response)
+
+
+def replay(response: str) -> Iterator[str]:
+    """Yield a cached reply in word-sized chunks, as a live stream would arrive."""
+    words = response.split(" ")
+    for word in words[:-1]:
+        yield word + " "
+    yield words[-1]
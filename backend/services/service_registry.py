@@ -25,6 +25,9 @@ class ServiceRegistry:
     _memory_service: "IntimateMemoryService | None" = None
     _graph_service: "GraphQueryService | None" = None
     _scaffold_manager: "IntimacyScaffoldManager | None" = None
+    _redis_client: "redis.asyncio.Redis | None" = None
+    _redis_checked: bool = False
+    _groq_service: "GroqService | None" = None
 
     # ------------------------------------------------------------------
     # Bootstrap
@@ -41,7 +44,7 @@ class ServiceRegistry:
 
             # Mem0 (mandatory)
             mem_service = cls.get_memory_service()
-            await mem_service._ensure_memory_initialized()  # type: ignore[attr-defined]
+            await mem_service.warmup()
 
             # Graph (optional)
             try:
@@ -52,6 +55,8 @@ class ServiceRegistry:
                         await ensure_fn()
                     else:
                         ensure_fn()
+                if graph_service and hasattr(graph_service, "warm_query_plans"):
+                    await asyncio.to_thread(graph_service.warm_query_plans)
             except Exception as gerr:
                 logger.warning("[Registry] Graph service init failed: %s", gerr)
 
@@ -65,6 +70,13 @@ class ServiceRegistry:
             # Scaffold manager depends on memory service
             cls.get_scaffold_manager()
 
+            # Open the pooled OpenRouter/Groq connections before the first turn
+            try:
+                from services.http_pool import warm_llm_connections
+                await warm_llm_connections()
+            except Exception as herr:
+                logger.warning("[Registry] LLM connection warm-up skipped: %s", herr)
+
             cls._initialized = True
             logger.info("[Registry] ✅ Core services ready.")
 
@@ -87,6 +99,29 @@ class ServiceRegistry:
             except Exception as cerr:
                 logger.warning("[Registry] Failed to close graph driver: %s", cerr)
 
+        # Redis connection pool
+        if cls._redis_client is not None:
+            try:
+                await cls._redis_client.aclose()
+            except Exception as rerr:
+                logger.warning("[Registry] Failed to close Redis client: %s", rerr)
+            cls._redis_client = None
+            cls._redis_checked = False
+
+        # Shared LLM HTTP pool
+        try:
+            from services.http_pool import close_shared_httpx
+            await close_shared_httpx()
+        except Exception as herr:
+            logger.warning("[Registry] Failed to close LLM HTTP pool: %s", herr)
+
+        # Deepgram upload session
+        try:
+            from services.deepgram_service import close_session
+            await close_session()
+        except Exception as derr:
+            logger.warning("[Registry] Failed to close Deepgram session: %s", derr)
+
         # Mem0 AsyncMemory currently has no explicit close API; placeholder.
         logger.info("[Registry] ✅ Cleanup complete.")
 
@@ -118,6 +153,31 @@ class ServiceRegistry:
                 cls._graph_service = None
         return cls._graph_service
 
+    @classmethod
+    def get_redis_client(cls):
+        """Shared ``redis.asyncio`` client, or ``None`` when REDIS_URL is unset / redis missing."""
+        if not cls._redis_checked:
+            cls._redis_checked = True
+            from config import REDIS_CONFIG
+            if REDIS_CONFIG.get("url"):
+                try:
+                    import redis.asyncio as redis_asyncio
+                    # Connects lazily on first command
+                    cls._redis_client = redis_asyncio.from_url(REDIS_CONFIG["url"], decode_responses=True)
+                except ImportError:
+                    logger.warning("[Registry] REDIS_URL set but redis package not installed; Redis cache disabled.")
+                except Exception as e:
+                    logger.error("[Registry] Could not create Redis client: %s", e)
+        return cls._redis_client
+
+    @classmethod
+    def get_groq_service(cls):
+        """Shared GroqService, so every turn streams through the same warm client."""
+        if cls._groq_service is None:
+            from services.ai_service import GroqService
+            cls._groq_service = GroqService()
+        return cls._groq_service
+
     @classmethod
     def get_scaffold_manager(cls):
         if cls._scaffold_manager is None:
@@ -0,0 +1,43 @@
+"""Process-wide async Supabase clients, one per key.
+
+Every service that talks to Supabase with the same key shares one client, and
+so one set of keep-alive connections, instead of each building its own:
+:func:`get_client` (anon key: auth) and :func:`get_service_client`
+(service-role key: chat history).
+"""
+import asyncio
+from typing import Dict
+
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+from config import SUPABASE_CONFIG
+
+# PostgREST default is 120 s; a chat read/write that slow is already a failure
+POSTGREST_TIMEOUT = 10  # seconds
+
+_CLIENTS: Dict[str, AsyncClient] = {}
+_LOCK = asyncio.Lock()
+
+
+async def _get(key_name: str) -> AsyncClient:
+    client = _CLIENTS.get(key_name)
+    if client is None:
+        async with _LOCK:
+            client = _CLIENTS.get(key_name)
+            if client is None:
+                client = _CLIENTS[key_name] = await acreate_client(
+                    SUPABASE_CONFIG["url"],
+                    SUPABASE_CONFIG[key_name],
+                    options=AsyncClientOptions(postgrest_client_timeout=POSTGREST_TIMEOUT),
+                )
+    return client
+
+
+async def get_client() -> AsyncClient:
+    """Shared client authenticated with the anon key."""
+    return await _get("anon_key")
+
+
+async def get_service_client() -> AsyncClient:
+    """Shared client authenticated with the service-role key."""
+    return await _get("service_role_key")
@@ -6,6 +6,10 @@ from memory.mem0_async_service import IntimateMemoryService
 
 logger = logging.getLogger(__name__)
 
+# Tone cue words, matched against the lower-cased message
+_DIFFICULT_TONE_WORDS = ("sad", "worried", "stressed", "difficult")
+_CELEBRATORY_TONE_WORDS = ("happy", "excited", "great", "wonderful")
+
 class AnticippatoryIntimacyEngine:
     """Pre-computes emotional responses and identifies connection opportunities"""
     
@@ -327,17 +331,17 @@ class AnticippatoryIntimacyEngine:
         message_lower = message.lower()
         
         # Emotional message analysis
-        if any(word in message_lower for word in ["sad", "worried", "stressed", "difficult"]):
-            if scaffold.relationship_depth == "deep":
-                return "warm_intimate_support"
-            else:
+        for word in _DIFFICULT_TONE_WORDS:
+            if word in message_lower:
+                if scaffold.relationship_depth == "deep":
+                    return "warm_intimate_support"
                 return "gentle_empathetic"
-        
-        elif any(word in message_lower for word in ["happy", "excited", "great", "wonderful"]):
-            return "warm_celebratory"
-        
-        else:
-            return "warm_conversational"
+
+        for word in _CELEBRATORY_TONE_WORDS:
+            if word in message_lower:
+                return "warm_celebratory"
+
+        return "warm_conversational"
     
     def _suggest_response_depth(self, scaffold: IntimacyScaffold, message: str) -> str:
         """Suggest appropriate response depth"""
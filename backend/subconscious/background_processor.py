@@ -1,4 +1,5 @@
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional
 from datetime import datetime
 import logging
@@ -6,10 +7,16 @@ from memory.mem0_async_service import IntimateMemoryService
 from .emotional_archaeology import EmotionalArchaeology
 from .relationship_evolution import RelationshipEvolutionTracker
 from .intimacy_scaffold import IntimacyScaffoldManager
+from .emotion_keywords import AUTHENTICITY_PHRASES, DISCLOSURE_PHRASES, contains_any, emotions_in
 from shared_state import active_conversations
 
 logger = logging.getLogger(__name__)
 
+# The pattern analysis is pure-Python CPU work over ~75 memories; running it off
+# the event loop keeps it from stalling websocket and LLM streaming turns. Its
+# own small pool so it never crowds the default executor the memory I/O uses.
+_ANALYSIS_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="subconscious")
+
 class PersistentSubconsciousProcessor:
     def __init__(self, mem0_service: IntimateMemoryService):
         self.mem0_service = mem0_service
@@ -67,23 +74,13 @@ class PersistentSubconsciousProcessor:
                     limit=25
                 )
                 # Process all psychological data into comprehensive insights
-                attachment_patterns = self._analyze_attachment_patterns(attachment_data)
-
-                # --- DELEGATED TO EmotionalArchaeology ---
-                vulnerability_patterns = self.emotional_archaeology.analyse_vulnerability_data(
-                    vulnerability_data
-                )
-
-                # --- DELEGATED TO RelationshipEvolutionTracker ---
-                relationship_evolution = self.relationship_tracker.analyse_relationship_evolution_data(
-                    relationship_data
-                )
-
-                relationship_insight = self._synthesize_psychological_analysis(
-                    attachment_patterns=attachment_patterns,
-                    vulnerability_patterns=vulnerability_patterns,
-                    relationship_evolution=relationship_evolution,
-                    user_id=user_id,
+                relationship_insight = await asyncio.get_running_loop().run_in_executor(
+                    _ANALYSIS_EXECUTOR,
+                    self._analyse_cycle,
+                    user_id,
+                    attachment_data,
+                    vulnerability_data,
+                    relationship_data,
                 )
                 await self._store_relationship_evolution(user_id, relationship_insight)
                 await self.scaffold_manager.trigger_backup_storage(user_id)
@@ -92,6 +89,29 @@ class PersistentSubconsciousProcessor:
                 logger.error(f"Error in psychological analysis for {user_id}: {e}")
             await asyncio.sleep(180)
 
+    def _analyse_cycle(
+        self, user_id: str, attachment_data: Dict, vulnerability_data: Dict, relationship_data: Dict
+    ) -> Dict:
+        """CPU-only part of a cycle (runs in _ANALYSIS_EXECUTOR; touches no shared state)"""
+        attachment_patterns = self._analyze_attachment_patterns(attachment_data)
+
+        # --- DELEGATED TO EmotionalArchaeology ---
+        vulnerability_patterns = self.emotional_archaeology.analyse_vulnerability_data(
+            vulnerability_data
+        )
+
+        # --- DELEGATED TO RelationshipEvolutionTracker ---
+        relationship_evolution = self.relationship_tracker.analyse_relationship_evolution_data(
+            relationship_data
+        )
+
+        return self._synthesize_psychological_analysis(
+            attachment_patterns=attachment_patterns,
+            vulnerability_patterns=vulnerability_patterns,
+            relationship_evolution=relationship_evolution,
+            user_id=user_id,
+        )
+
     async def _coordinate_with_realtime(self, user_id: str):
         """Coordinate with real-time processing to avoid conflicts"""
         try:
@@ -173,7 +193,7 @@ class PersistentSubconsciousProcessor:
                 continue
 
             # Deep personal sharing
-            if any(phrase in memory_text for phrase in ["never told", "secret", "personal", "private", "intimate"]):
+            if contains_any(memory_text, DISCLOSURE_PHRASES):
                 intimate_disclosure_count += 1
                 vulnerability_analysis["intimate_sharing_events"].append({
                     "memory": memory_text[:100],
@@ -181,22 +201,11 @@ class PersistentSubconsciousProcessor:
                     "depth": "deep"
                 })
             # Emotional expression types
-            emotions_found = []
-            emotion_keywords = {
-                "fear": ["scared", "afraid", "terrified", "fear"],
-                "sadness": ["sad", "crying", "heartbroken", "grief"],
-                "joy": ["happy", "excited", "thrilled", "joyful"],
-                "anger": ["angry", "furious", "mad", "irritated"],
-                "shame": ["ashamed", "embarrassed", "humiliated"],
-                "love": ["love", "adore", "cherish", "devoted"]
-            }
-            for emotion, keywords in emotion_keywords.items():
-                if any(keyword in memory_text for keyword in keywords):
-                    emotions_found.append(emotion)
+            emotions_found = emotions_in(memory_text)
             if emotions_found:
                 vulnerability_analysis["emotional_expression_types"].extend(emotions_found)
             # Authentic expression indicators
-            if any(phrase in memory_text for phrase in ["authentic", "real", "genuine", "true self", "honest"]):
+            if contains_any(memory_text, AUTHENTICITY_PHRASES):
                 vulnerability_analysis["authentic_moments"].append(memory_text[:100])
         # Calculate vulnerability comfort level
         vulnerability_analysis["vulnerability_comfort"] = intimate_disclosure_count / max(total_disclosures, 1)
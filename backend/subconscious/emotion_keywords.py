@@ -0,0 +1,68 @@
+"""Emotion keyword table shared by the subconscious analysers.
+
+The keywords are compiled once at import into an Aho-Corasick automaton (when
+``pyahocorasick`` is installed), so tagging a memory is a single pass over its
+text instead of one substring scan per keyword.
+"""
+from __future__ import annotations
+
+from typing import Dict, List
+
+try:
+    import ahocorasick  # optional C automaton (pyahocorasick)
+except ImportError:
+    ahocorasick = None
+
+# Keyword mappings preserved from the original analysers. Matching is substring
+# based, as it always was.
+EMOTION_KEYWORDS: Dict[str, List[str]] = {
+    "fear": ["scared", "afraid", "terrified", "fear"],
+    "sadness": ["sad", "crying", "heartbroken", "grief"],
+    "joy": ["happy", "excited", "thrilled", "joyful"],
+    "anger": ["angry", "furious", "mad", "irritated"],
+    "shame": ["ashamed", "embarrassed", "humiliated"],
+    "love": ["love", "adore", "cherish", "devoted"],
+}
+
+# Phrases marking deep personal disclosure / authentic expression in a memory
+DISCLOSURE_PHRASES = ("never told", "secret", "personal", "private", "intimate")
+AUTHENTICITY_PHRASES = ("authentic", "real", "genuine", "true self", "honest")
+
+# Pre-lowered (emotion, keywords) pairs for the pure-Python fallback
+_EMOTION_TABLE = tuple((emotion, tuple(kw.lower() for kw in kws)) for emotion, kws in EMOTION_KEYWORDS.items())
+
+if ahocorasick is not None:
+    EMOTION_AC = ahocorasick.Automaton()
+    for _emotion, _keywords in EMOTION_KEYWORDS.items():
+        for _keyword in _keywords:
+            EMOTION_AC.add_word(_keyword, _emotion)
+    EMOTION_AC.make_automaton()
+else:
+    EMOTION_AC = None
+
+
+def emotions_in(text: str) -> List[str]:
+    """Return the emotions whose keywords occur in lower-cased ``text``.
+
+    Emotions are listed once each, in :data:`EMOTION_KEYWORDS` order.
+    """
+    if EMOTION_AC is None:
+        found_emotions = []
+        for emotion, keywords in _EMOTION_TABLE:
+            for keyword in keywords:
+                if keyword in text:
+                    found_emotions.append(emotion)
+                    break
+        return found_emotions
+    found = {emotion for _, emotion in EMOTION_AC.iter(text)}
+    if not found:
+        return []
+    return [e for e in EMOTION_KEYWORDS if e in found]
+
+
+def contains_any(text: str, phrases) -> bool:
+    """True if any of ``phrases`` occurs in ``text`` (plain loop, no generator)."""
+    for phrase in phrases:
+        if phrase in text:
+            return True
+    return False
@@ -19,6 +19,7 @@ from datetime import datetime
 from typing import Dict, List
 
 from memory.mem0_async_service import IntimateMemoryService
+from subconscious.emotion_keywords import AUTHENTICITY_PHRASES, DISCLOSURE_PHRASES, contains_any, emotions_in
 
 logger = logging.getLogger(__name__)
 
@@ -110,16 +111,6 @@ class EmotionalArchaeology:
         intimate_disclosure_count = 0
         total_disclosures = len(results)
 
-        # Keyword mappings preserved from original implementation
-        emotion_keywords = {
-            "fear": ["scared", "afraid", "terrified", "fear"],
-            "sadness": ["sad", "crying", "heartbroken", "grief"],
-            "joy": ["happy", "excited", "thrilled", "joyful"],
-            "anger": ["angry", "furious", "mad", "irritated"],
-            "shame": ["ashamed", "embarrassed", "humiliated"],
-            "love": ["love", "adore", "cherish", "devoted"],
-        }
-
         for memory in results:
             memory_text = str(memory.get("memory", "")).lower() if isinstance(memory, dict) else str(memory).lower()
             metadata = memory.get("metadata", {}) if isinstance(memory, dict) else {}
@@ -127,7 +118,7 @@ class EmotionalArchaeology:
                 continue
 
             # Deep personal sharing detection
-            if any(p in memory_text for p in ["never told", "secret", "personal", "private", "intimate"]):
+            if contains_any(memory_text, DISCLOSURE_PHRASES):
                 intimate_disclosure_count += 1
                 analysis["intimate_sharing_events"].append(
                     {
@@ -138,12 +129,12 @@ class EmotionalArchaeology:
                 )
 
             # Emotion extraction
-            emotions_found = [e for e, kws in emotion_keywords.items() if any(k in memory_text for k in kws)]
+            emotions_found = emotions_in(memory_text)
             if emotions_found:
                 analysis["emotional_expression_types"].extend(emotions_found)
 
             # Authenticity markers
-            if any(p in memory_text for p in ["authentic", "real", "genuine", "true self", "honest"]):
+            if contains_any(memory_text, AUTHENTICITY_PHRASES):
                 analysis["authentic_moments"].append(memory_text[:100])
 
         # Aggregate metrics
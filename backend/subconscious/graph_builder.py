@@ -4,8 +4,6 @@ from __future__ import annotations
 import logging
 from typing import Optional
 
-from neo4j import GraphDatabase, basic_auth
-
 from config import NEO4J_CONFIG
 from subconscious import graph_schema as gs
 
@@ -14,10 +12,11 @@ logger = logging.getLogger(__name__)
 
 class GraphRelationshipBuilder:
     def __init__(self):
-        uri = NEO4J_CONFIG.get("uri")
-        if not uri:
+        if not NEO4J_CONFIG.get("uri"):
             raise RuntimeError("NEO4J URI missing for Graph Builder")
-        self._driver = GraphDatabase.driver(uri, auth=basic_auth(NEO4J_CONFIG.get("username"), NEO4J_CONFIG.get("password")))
+        # Builders are created per batch; borrow the process-wide driver
+        # rather than opening a new connection pool each time.
+        self._driver = gs._driver()
         self.db = NEO4J_CONFIG.get("database", "neo4j")
         gs.ensure_constraints()
 
@@ -80,7 +79,8 @@ class GraphRelationshipBuilder:
             sess.run(query, uid=user_id, e1=emotion1, e2=emotion2, ctype=connection_type)
 
     def close(self):
-        self._driver.close()
+        # The driver is shared process-wide; only drop our reference to it.
+        self._driver = None
 
     # -----------------------------------------------------------------
     # Intimate AI Companion specific builders
@@ -158,12 +158,7 @@ class GraphRelationshipBuilder:
                 logger.warning("Neo4j URI missing – skip relationship migration")
                 return
 
-            driver = GraphDatabase.driver(
-                uri,
-                auth=basic_auth(
-                    NEO4J_CONFIG.get("username"), NEO4J_CONFIG.get("password")
-                ),
-            )
+            driver = gs._driver()
 
             db = NEO4J_CONFIG.get("database", "neo4j")
 
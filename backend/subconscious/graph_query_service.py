@@ -8,13 +8,52 @@ import logging
 from typing import List, Dict, ClassVar, Optional
 from threading import Lock
 
-from neo4j import GraphDatabase, basic_auth
-
 from config import NEO4J_CONFIG
 from subconscious import graph_schema as gs
 
 logger = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# Cypher templates
+# ---------------------------------------------------------------------------
+# Built once so every call sends byte-identical, fully parameterised text and
+# Neo4j's plan cache (keyed on the statement string) always hits.
+
+RECENT_EMOTIONS_CYPHER = (
+    f"MATCH (u:{gs.USER_LABEL} {{user_id: $uid}})-[:{gs.REL_FEELS}]->(e:{gs.EMOTION_LABEL}) "
+    f"OPTIONAL MATCH (e)-[:{gs.REL_TRIGGERED_BY}]->(ev:{gs.EVENT_LABEL}) "
+    "WITH e, ev ORDER BY e.created_at DESC LIMIT $lim "
+    "RETURN e.name AS emotion, ev.summary AS cause"
+)
+
+COMFORT_PATTERNS_CYPHER = (
+    f"MATCH (u:{gs.USER_LABEL} {{user_id: $uid}})-[:{gs.REL_COMFORTED_BY}]->(ev:{gs.EVENT_LABEL}) "
+    f"OPTIONAL MATCH (e:{gs.EMOTION_LABEL})-[:{gs.REL_SUPPORTED_BY}]->(ev) "
+    "WHERE e.user_id = $uid "
+    "RETURN ev.summary as comfort_activity, e.name as emotion_helped, ev.created_at as when_used "
+    "ORDER BY ev.created_at DESC LIMIT 5"
+)
+
+EMOTIONAL_EVOLUTION_CYPHER = (
+    f"MATCH (e1:{gs.EMOTION_LABEL} {{user_id: $uid}})-[r:{gs.REL_EVOLVED_FROM}]->(e2:{gs.EMOTION_LABEL} {{user_id: $uid}}) "
+    "RETURN e1.name as from_emotion, e2.name as to_emotion, r.evolution_catalyst as catalyst, r.created_at as when_evolved "
+    "ORDER BY r.created_at DESC LIMIT 10"
+)
+
+TRUST_TIMELINE_CYPHER = (
+    f"MATCH (u:{gs.USER_LABEL} {{user_id: $uid}})-[r:{gs.REL_TRUSTS_WITH}]->(ev:{gs.EVENT_LABEL}) "
+    "RETURN ev.summary as milestone, r.trust_level as trust_level, ev.created_at as when_achieved "
+    "ORDER BY ev.created_at ASC"
+)
+
+# Template name -> (cypher, sample params used to compile the plan at warmup)
+QUERIES: Dict[str, tuple[str, Dict]] = {
+    "recent_emotions": (RECENT_EMOTIONS_CYPHER, {"uid": "", "lim": 1}),
+    "comfort_patterns": (COMFORT_PATTERNS_CYPHER, {"uid": ""}),
+    "emotional_evolution": (EMOTIONAL_EVOLUTION_CYPHER, {"uid": ""}),
+    "trust_timeline": (TRUST_TIMELINE_CYPHER, {"uid": ""}),
+}
+
 
 class GraphQueryService:
     """Process-wide singleton wrapper around Neo4j read queries.
@@ -72,20 +111,13 @@ class GraphQueryService:
         if cache_entry and (time.time() - cache_entry[0] < self.cache_ttl_seconds):
             return cache_entry[1]
 
-        query = (
-            f"MATCH (u:{gs.USER_LABEL} {{user_id: $uid}})-[:{gs.REL_FEELS}]->(e:{gs.EMOTION_LABEL}) "
-            f"OPTIONAL MATCH (e)-[:{gs.REL_TRIGGERED_BY}]->(ev:{gs.EVENT_LABEL}) "
-            "WITH e, ev ORDER BY e.created_at DESC LIMIT $lim "
-            "RETURN e.name AS emotion, ev.summary AS cause"
-        )
-
         driver = self._ensure_driver()
         if driver is None:
             logger.warning("Graph driver unavailable; returning empty emotional context.")
             return []
 
         with driver.session(database=self.database) as session:
-            records = session.run(query, uid=user_id, lim=limit)
+            records = session.run(RECENT_EMOTIONS_CYPHER, uid=user_id, lim=limit)
             lines = [
                 f"{rec['emotion']} (triggered by: {rec.get('cause') or 'unknown'})"
                 for rec in records if rec.get("emotion")
@@ -109,29 +141,34 @@ class GraphQueryService:
                     if not uri:
                         logger.warning("NEO4J uri missing – graph features disabled.")
                         return None
-                    cls._driver = GraphDatabase.driver(
-                        uri,
-                        auth=basic_auth(
-                            NEO4J_CONFIG.get("username"),
-                            NEO4J_CONFIG.get("password"),
-                        ),
-                    )
+                    cls._driver = gs._driver()
         return cls._driver
 
     # ------------------------------------------------------------------
     # Lifecycle helpers
     # ------------------------------------------------------------------
 
+    def warm_query_plans(self) -> None:
+        """Compile and cache the plan for every template in :data:`QUERIES`.
+
+        Each template runs once with an empty ``uid`` (matches no user, served by
+        the user_id index) so its exact statement text is in the plan cache
+        before the first real request.
+        """
+        driver = self._ensure_driver()
+        if driver is None:
+            return
+        with driver.session(database=self.database) as session:
+            for name, (cypher, params) in QUERIES.items():
+                try:
+                    session.run(cypher, **params).consume()
+                except Exception as exc:
+                    logger.warning("Could not warm Cypher plan %s: %s", name, exc)
+
     def close(self):
         """Close the shared Neo4j driver. Safe to call multiple times."""
-        drv = self.__class__._driver
-        if drv:
-            try:
-                drv.close()
-            except Exception:
-                pass
-            finally:
-                self.__class__._driver = None
+        self.__class__._driver = None
+        gs.close_driver()
 
     # ---- Stubs for future complex queries --------------------------------
 
@@ -154,15 +191,8 @@ class GraphQueryService:
 
     def get_comfort_patterns(self, user_id: str):
         """Find what comforts this user during different emotional states."""
-        query = (
-            f"MATCH (u:{gs.USER_LABEL} {{user_id: $uid}})-[:{gs.REL_COMFORTED_BY}]->(ev:{gs.EVENT_LABEL}) "
-            f"OPTIONAL MATCH (e:{gs.EMOTION_LABEL})-[:{gs.REL_SUPPORTED_BY}]->(ev) "
-            "WHERE e.user_id = $uid "
-            "RETURN ev.summary as comfort_activity, e.name as emotion_helped, ev.created_at as when_used "
-            "ORDER BY ev.created_at DESC LIMIT 5"
-        )
         with self._driver.session(database=self.database) as session:
-            records = session.run(query, uid=user_id)
+            records = session.run(COMFORT_PATTERNS_CYPHER, uid=user_id)
             return [
                 {
                     "comfort_activity": rec["comfort_activity"],
@@ -174,13 +204,8 @@ class GraphQueryService:
 
     def analyze_emotional_evolution_paths(self, user_id: str):
         """Trace how user's emotions evolve over time."""
-        query = (
-            f"MATCH (e1:{gs.EMOTION_LABEL} {{user_id: $uid}})-[r:{gs.REL_EVOLVED_FROM}]->(e2:{gs.EMOTION_LABEL} {{user_id: $uid}}) "
-            "RETURN e1.name as from_emotion, e2.name as to_emotion, r.evolution_catalyst as catalyst, r.created_at as when_evolved "
-            "ORDER BY r.created_at DESC LIMIT 10"
-        )
         with self._driver.session(database=self.database) as session:
-            records = session.run(query, uid=user_id)
+            records = session.run(EMOTIONAL_EVOLUTION_CYPHER, uid=user_id)
             return [
                 {
                     "emotional_journey": f"{rec['from_emotion']} → {rec['to_emotion']}",
@@ -192,13 +217,8 @@ class GraphQueryService:
 
     def get_trust_progression_timeline(self, user_id: str):
         """Get chronological trust building milestones."""
-        query = (
-            f"MATCH (u:{gs.USER_LABEL} {{user_id: $uid}})-[r:{gs.REL_TRUSTS_WITH}]->(ev:{gs.EVENT_LABEL}) "
-            "RETURN ev.summary as milestone, r.trust_level as trust_level, ev.created_at as when_achieved "
-            "ORDER BY ev.created_at ASC"
-        )
         with self._driver.session(database=self.database) as session:
-            records = session.run(query, uid=user_id)
+            records = session.run(TRUST_TIMELINE_CYPHER, uid=user_id)
             return [
                 {
                     "milestone": rec["milestone"],
@@ -9,7 +9,8 @@ prevent cross-user data leakage.
 from __future__ import annotations
 
 import logging
-from typing import Dict, List
+from threading import Lock
+from typing import Dict, List, Optional
 
 from neo4j import GraphDatabase, basic_auth
 
@@ -56,15 +57,39 @@ REL_VALIDATED_BY = "VALIDATED_BY"      # (Emotion)-[:VALIDATED_BY]->(Event)
 _SCHEMA_INITIALISED = False
 
 
+# Process-wide Neo4j driver shared by the schema helpers, the relationship
+# builder and GraphQueryService so every caller reuses the same pooled sockets
+# instead of paying a fresh TLS handshake per driver.
+_SHARED_DRIVER: Optional[object] = None  # neo4j.Driver
+_DRIVER_LOCK = Lock()
+
+
 def _driver():
-    """Return an active Neo4j driver using config."""
-    uri = NEO4J_CONFIG.get("uri")
-    if not uri:
-        raise ValueError("NEO4J_URI not configured – cannot connect to graph store.")
-    return GraphDatabase.driver(
-        uri,
-        auth=basic_auth(NEO4J_CONFIG.get("username"), NEO4J_CONFIG.get("password")),
-    )
+    """Return the shared Neo4j driver, creating it on first use."""
+    global _SHARED_DRIVER
+    if _SHARED_DRIVER is None:
+        with _DRIVER_LOCK:
+            if _SHARED_DRIVER is None:
+                uri = NEO4J_CONFIG.get("uri")
+                if not uri:
+                    raise ValueError("NEO4J_URI not configured – cannot connect to graph store.")
+                _SHARED_DRIVER = GraphDatabase.driver(
+                    uri,
+                    auth=basic_auth(NEO4J_CONFIG.get("username"), NEO4J_CONFIG.get("password")),
+                )
+    return _SHARED_DRIVER
+
+
+def close_driver() -> None:
+    """Close the shared Neo4j driver. Safe to call multiple times."""
+    global _SHARED_DRIVER
+    with _DRIVER_LOCK:
+        drv, _SHARED_DRIVER = _SHARED_DRIVER, None
+    if drv is not None:
+        try:
+            drv.close()
+        except Exception:
+            pass
 
 
 def ensure_constraints() -> None:
@@ -102,11 +127,6 @@ def ensure_constraints() -> None:
         logger.info("✅ Graph schema constraints ensured with intimate AI optimizations.")
     except Exception as exc:
         logger.error("❌ Failed to ensure graph schema constraints: %s", exc, exc_info=True)
-    finally:
-        try:
-            drv.close()
-        except Exception:
-            pass
 
 
 # ---------------------------------------------------------------------------
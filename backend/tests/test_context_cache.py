@@ -0,0 +1,121 @@
+import asyncio
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from memory.context_cache import AsyncLRUCache, SemanticContextCache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_gets_share_one_load():
+    cache = AsyncLRUCache(capacity=4, ttl=30)
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "context"
+
+    results = await asyncio.gather(*(cache.get("u:1", loader) for _ in range(5)))
+
+    assert results == ["context"] * 5
+    assert calls == 1
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_failed_loads_not_cached():
+    cache = AsyncLRUCache(capacity=2, ttl=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.peek("a") == 1  # "a" becomes most recently used
+    cache.set("c", 3)
+    assert cache.peek("b") is None
+    assert len(cache) == 2
+
+    async def failing():
+        raise RuntimeError("mem0 down")
+
+    with pytest.raises(RuntimeError):
+        await cache.get("d", failing)
+    assert cache.peek("d") is None
+
+
+def test_expired_entries_are_dropped():
+    cache = AsyncLRUCache(capacity=2, ttl=0)
+    cache.set("a", 1)
+    assert cache.peek("a") is None
+    assert len(cache) == 0
+
+
+def test_semantic_cache_serves_close_paraphrases_per_user():
+    cache = SemanticContextCache(per_user_capacity=4, ttl=30, threshold=0.9, max_users=8)
+    cache.add("u1", [1.0, 0.0, 0.0], "anxious context")
+
+    assert cache.lookup("u1", [0.98, 0.05, 0.0]) == "anxious context"
+    assert cache.lookup("u1", [0.0, 1.0, 0.0]) is None
+    assert cache.lookup("u2", [1.0, 0.0, 0.0]) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_entry_served_while_refreshing_in_background():
+    cache = AsyncLRUCache(capacity=4, ttl=0, stale_ttl=30)
+    cache.set("k", "old")
+    calls = 0
+
+    async def loader():
+        nonlocal calls
+        calls += 1
+        return "new"
+
+    assert await cache.get("k", loader) == "old"
+    assert await cache.get("k", loader) == "old"  # refresh already in flight
+    await asyncio.sleep(0)
+    assert calls == 1
+    assert cache._data["k"][1] == "new"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_prefix_drops_user_entries_and_discards_inflight_load():
+    cache = AsyncLRUCache(capacity=8, ttl=30)
+    cache.set("u1:a", 1)
+    cache.set("u1:b", 2)
+    cache.set("u2:a", 3)
+    release = asyncio.Event()
+
+    async def slow():
+        await release.wait()
+        return "built before the write"
+
+    pending = asyncio.ensure_future(cache.get("u1:c", slow))
+    await asyncio.sleep(0)
+
+    assert cache.invalidate_prefix("u1:") == 2
+    release.set()
+    assert await pending == "built before the write"
+    assert cache.peek("u1:c") is None  # loaded against pre-write state, not stored
+    assert cache.peek("u2:a") == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_first_caller_does_not_cancel_merged_followers():
+    cache = AsyncLRUCache(capacity=4, ttl=30)
+    release = asyncio.Event()
+
+    async def loader():
+        await release.wait()
+        return "context"
+
+    first = asyncio.ensure_future(cache.get("u:1", loader))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.get("u:1", loader))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+
+    assert await follower == "context"
+    assert first.cancelled()
+    assert cache.peek("u:1") == "context"
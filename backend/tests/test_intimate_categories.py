@@ -0,0 +1,22 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.memory import intimate_categories
+from backend.memory.intimate_categories import classify
+
+
+def test_classify_tags_each_matching_category():
+    categories = classify("Work stress again, and my cat named Whiskers got sick")
+    assert categories == {"emotional_patterns", "personal_details"}
+
+
+def test_classify_matches_whole_words_only():
+    # "homework" contains "work" but must not be tagged as an emotional pattern
+    assert classify("Finished my homework") == set()
+
+
+def test_classify_fallback_without_automaton(monkeypatch):
+    monkeypatch.setattr(intimate_categories, "CATEGORY_AC", None)
+    assert classify("I opened up about childhood fears") == {"intimate_moments"}
@@ -40,4 +40,161 @@ async def test_organic_relationship_development(mock_mem0_service):
     )
 
     assert "trust" in context.lower() or "relationship" in context.lower()
-    assert len(context) > 50 
\ No newline at end of file
+    assert len(context) > 50 
+
+@pytest.mark.asyncio
+async def test_parallel_context_dedupes_and_tolerates_failed_facets():
+    """Parallel builder merges facets by memory id and drops facets that error."""
+    from functools import partial
+    from unittest.mock import MagicMock
+    from memory.mem0_async_service import IntimateMemoryService
+    from memory.memory_context_builder import MemoryContextBuilder
+
+    service = MagicMock()
+    service.prime_query_embeddings = AsyncMock()
+    # Real batch dispatch over the mocked per-facet searches
+    service._spec_query = IntimateMemoryService._spec_query
+    service.search_batch = partial(IntimateMemoryService.search_batch, service)
+    service.search_intimate_memories = AsyncMock(
+        return_value={"results": [{"id": "m1", "memory": "User has a cat named Whiskers."}]}
+    )
+    service.search_relationship_context = AsyncMock(
+        return_value={
+            "results": [
+                {"id": "m1", "memory": "User has a cat named Whiskers."},
+                {"id": "m2", "memory": "User feels safe sharing worries with us."},
+            ]
+        }
+    )
+    service.search_emotional_patterns = AsyncMock(side_effect=RuntimeError("graph down"))
+    service.search_trust_evolution = AsyncMock(return_value={"results": []})
+
+    builder = MemoryContextBuilder(service)
+    context = await builder.build_intimate_context_parallel("How is Whiskers?", user_id="test_user")
+
+    assert context.count("Whiskers") == 1
+    assert "safe sharing" in context
+
+
+@pytest.mark.asyncio
+async def test_trivial_messages_skip_memory_search():
+    """Greetings reuse the user's latest context without a Mem0 search."""
+    from unittest.mock import MagicMock
+    from memory.memory_context_builder import MemoryContextBuilder
+
+    service = MagicMock()
+    service.search_batch = AsyncMock()
+    builder = MemoryContextBuilder(service)
+
+    context = await builder.build_intimate_context("ok!", user_id="trivial_user")
+
+    assert "beginning of your relationship" in context
+    service.search_batch.assert_not_awaited()
+
+
+class _FakeRedis:
+    """Just enough of redis.asyncio for the context builder's L2 tier."""
+
+    def __init__(self):
+        self.data = {}
+        self.subscribers = []
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, nx=False, px=None, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+    async def expire(self, key, seconds):
+        return key in self.data
+
+    async def publish(self, channel, data):
+        for queue in self.subscribers:
+            queue.put_nowait({"type": "message", "channel": channel, "data": data})
+
+    def pubsub(self):
+        return _FakePubSub(self)
+
+
+class _FakePubSub:
+    def __init__(self, redis):
+        import asyncio
+
+        self.redis = redis
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.redis.subscribers.append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def reset(self):
+        if self.queue in self.redis.subscribers:
+            self.redis.subscribers.remove(self.queue)
+
+
+@pytest.mark.asyncio
+async def test_memory_write_retires_redis_cached_context():
+    """After a write, a rebuild must not come back with the pre-write Redis value."""
+    from unittest.mock import MagicMock
+    from memory import memory_context_builder
+    from memory.memory_context_builder import MemoryContextBuilder
+    from services.service_registry import ServiceRegistry
+
+    redis = _FakeRedis()
+    service = MagicMock()
+    service.embed_query = AsyncMock(return_value=None)
+    service.search_batch = AsyncMock(return_value=[{"results": [{"memory": "User lives in Lisbon."}]}])
+
+    with patch.object(ServiceRegistry, "get_redis_client", return_value=redis):
+        builder = MemoryContextBuilder(service)
+        message = "Where do I live these days?"
+        first = await builder.build_intimate_context(message, user_id="redis_user")
+        assert "Lisbon" in first
+
+        service.search_batch.return_value = [{"results": [{"memory": "User moved to Porto."}]}]
+        memory_context_builder._on_memory_written("redis_user")
+        second = await builder.build_intimate_context(message, user_id="redis_user")
+
+    assert "Porto" in second
+    assert "Lisbon" not in second
+
+
+@pytest.mark.asyncio
+async def test_other_workers_writes_invalidate_local_context():
+    """A write published by another worker drops this worker's in-process section."""
+    import asyncio
+    from unittest.mock import MagicMock
+    from memory import memory_context_builder
+    from memory.memory_context_builder import MemoryContextBuilder
+
+    redis = _FakeRedis()
+    service = MagicMock()
+    service.embed_query = AsyncMock(return_value=None)
+    service.search_batch = AsyncMock(return_value=[{"results": [{"memory": "User plays the cello."}]}])
+
+    builder = MemoryContextBuilder(service, redis_client=redis)
+    await asyncio.sleep(0)  # let the subscriber attach
+    message = "What instrument do I play?"
+    assert "cello" in await builder.build_intimate_context(message, user_id="pubsub_user")
+    assert memory_context_builder._CONTEXT_CACHE.ttl == memory_context_builder.CONTEXT_CACHE_TTL
+
+    # Another worker stores a memory: bumps the generation and publishes
+    service.search_batch.return_value = [{"results": [{"memory": "User switched to the violin."}]}]
+    await redis.incr(memory_context_builder.REDIS_CONTEXT_GEN_PREFIX + "pubsub_user")
+    await redis.publish(memory_context_builder.REDIS_INVALIDATION_CHANNEL, "other-worker:pubsub_user")
+    await asyncio.sleep(0)
+
+    assert "violin" in await builder.build_intimate_context(message, user_id="pubsub_user")
@@ -0,0 +1,25 @@
+import pytest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.pcm_ring_buffer import PCMRingBuffer
+
+
+def _frame(n: int) -> bytes:
+    return bytes([n]) * 4
+
+
+def test_ring_buffer_is_fifo_and_drops_oldest_on_overrun():
+    buf = PCMRingBuffer(capacity_frames=3, frame_bytes=4)
+
+    assert [buf.push(_frame(i)) for i in range(5)] == [False, False, False, True, True]
+    assert len(buf) == 3
+    assert [bytes(buf.pop()) for _ in range(3)] == [_frame(2), _frame(3), _frame(4)]
+    assert buf.pop() is None
+
+
+def test_ring_buffer_rejects_wrong_frame_size():
+    buf = PCMRingBuffer(capacity_frames=2, frame_bytes=4)
+    with pytest.raises(ValueError):
+        buf.push(b"abc")
+    assert len(buf) == 0
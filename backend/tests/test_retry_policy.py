@@ -0,0 +1,45 @@
+import pytest
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.retry_policy import transient_retry
+
+
+class _Throttled(Exception):
+    retry_after = "0"  # server says retry immediately, so the test doesn't sleep
+
+
+@pytest.mark.asyncio
+async def test_transient_errors_are_retried_until_success():
+    calls = []
+
+    @transient_retry(_Throttled)
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise _Throttled()
+        return "ok"
+
+    assert await flaky() == "ok"
+    assert len(calls) == 3
+
+
+def test_other_errors_and_exhausted_retries_reraise():
+    calls = []
+
+    @transient_retry(_Throttled, attempts=2)
+    def always_throttled():
+        calls.append(1)
+        raise _Throttled()
+
+    @transient_retry(_Throttled)
+    def broken():
+        calls.append(1)
+        raise ValueError("bad request")
+
+    with pytest.raises(_Throttled):
+        always_throttled()
+    assert len(calls) == 2
+    with pytest.raises(ValueError):
+        broken()
+    assert len(calls) == 3
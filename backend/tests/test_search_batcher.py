@@ -0,0 +1,52 @@
+import asyncio
+import sys, os
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from memory.search_batcher import SearchBatcher
+
+
+def _service():
+    service = MagicMock()
+    service._spec_query = lambda spec: spec["query"]
+    service.prime_query_embeddings = AsyncMock()
+
+    async def search_batch(user_id, specs):
+        return [{"results": [f"{user_id}:{spec['query']}"]} for spec in specs]
+
+    service.search_batch = AsyncMock(side_effect=search_batch)
+    return service
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_across_users_share_one_batch():
+    service = _service()
+    batcher = SearchBatcher(max_batch=8, max_wait=0.05)
+
+    results = await asyncio.gather(
+        batcher.search(service, "alice", {"kind": "general", "query": "cat"}),
+        batcher.search(service, "bob", {"kind": "general", "query": "dog"}),
+        batcher.search(service, "alice", {"kind": "general", "query": "job"}),
+    )
+
+    assert [r["results"] for r in results] == [["alice:cat"], ["bob:dog"], ["alice:job"]]
+    service.prime_query_embeddings.assert_awaited_once_with(["cat", "job", "dog"])
+    assert service.search_batch.await_count == 2  # one call per user
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_propagates_to_every_caller():
+    service = _service()
+    service.search_batch = AsyncMock(side_effect=RuntimeError("mem0 down"))
+    batcher = SearchBatcher(max_batch=8, max_wait=0.01)
+
+    results = await asyncio.gather(
+        batcher.search(service, "alice", {"kind": "general", "query": "cat"}),
+        batcher.search(service, "alice", {"kind": "general", "query": "dog"}),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,52 @@
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from backend.memory.search_coalescer import SearchCoalescer
+
+
+class FakeStore:
+    collection_name = "mem0_384"
+
+    def __init__(self):
+        self.direct_calls = []
+
+    def search(self, query, vectors, limit=5, filters=None):
+        self.direct_calls.append(filters)
+        return [f"direct:{query}"]
+
+
+def test_non_user_filters_bypass_coalescing():
+    store = FakeStore()
+    coalescer = SearchCoalescer(store, window_seconds=0)
+    assert coalescer.search("q", [0.1], filters={"agent_id": "a"}) == ["direct:q"]
+    assert store.direct_calls == [{"agent_id": "a"}]
+
+
+def test_concurrent_searches_share_one_batch(monkeypatch):
+    store = FakeStore()
+    coalescer = SearchCoalescer(store, window_seconds=0.05)
+    batches = []
+
+    def fake_search_many(batch):
+        batches.append(len(batch))
+        return [[user_id] for _, _, user_id, _, _ in batch]
+
+    monkeypatch.setattr(coalescer, "_search_many", fake_search_many)
+
+    results = {}
+
+    def run(user_id):
+        results[user_id] = coalescer.search("q", [0.1], limit=3, filters={"user_id": user_id})
+
+    threads = [threading.Thread(target=run, args=(f"u{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert batches == [4]
+    assert results == {f"u{i}": [f"u{i}"] for i in range(4)}
+    assert store.direct_calls == []
@@ -0,0 +1,39 @@
+import sys
+import os
+import re
+import asyncio
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+pytest.importorskip("elevenlabs")
+pytest.importorskip("pyaudio")
+
+from backend.conversational_api.elevenlabs_service import ConversationStateManager  # noqa: E402
+
+TYPICAL_RESPONSES = [
+    "Hi there! How are you doing today?",
+    "I hear you. That sounds really hard, and it makes sense that you feel tired after such a long week.",
+    "It sounds like the interview is weighing on you. Would it help to talk through what you are most "
+    "worried about, or would you rather take your mind off it for a bit?",
+    "I remember you mentioned your cat Whiskers last time. How is she doing these days?",
+]
+
+
+def _word_based_estimate(text: str) -> float:
+    """Previous regex word-count estimate (150 wpm + 0.5s buffer)."""
+    words = len(re.findall(r'\b\w+\b', text))
+    return max(1.0, min((words / 2.5) + 0.5, 20.0))
+
+
+def test_char_estimate_tracks_word_estimate():
+    manager = ConversationStateManager(loop=asyncio.new_event_loop())
+    try:
+        for text in TYPICAL_RESPONSES:
+            expected = _word_based_estimate(text)
+            assert abs(manager._estimate_speaking_duration(text) - expected) / expected <= 0.10
+        assert manager._estimate_speaking_duration("") == 1.0
+        assert manager._estimate_speaking_duration("word " * 1000) == 20.0
+    finally:
+        manager.shutdown()
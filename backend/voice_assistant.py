@@ -46,6 +46,9 @@ ENABLE_MEMORY_LAYER = os.getenv("ENABLE_MEMORY_LAYER", "true").lower() == "true"
 async def _initialize_core_services() -> None:
     """Eagerly initialise heavy singletons (Mem0, Neo4j, etc.)."""
     await ServiceRegistry.initialize_all()
+    # Async Supabase clients (auth + chat history) are created on the loop
+    from services.auth_service import auth_service
+    await asyncio.gather(auth_service.init(), chat_service.init())
     # Expose registry via app.state so it can be accessed in route deps if
     # desired (e.g., `request.app.state.registry`).
     app.state.registry = ServiceRegistry  # type: ignore[attr-defined]
@@ -333,7 +336,7 @@ class VoiceAssistantWebSocket:
             # Already raw PCM
             audio_to_send = audio_data
         service = self.streaming_services[client_id]["service"]
-        await service.send_audio_chunk(audio_to_send)
+        service.send_audio_chunk(audio_to_send)
         self.audio_buffers[client_id].append(audio_data)  # Store original for fallback
 
     async def complete_audio_streaming(self, client_id: str, user_id: str = None):
@@ -412,9 +415,7 @@ class VoiceAssistantWebSocket:
 
             # Step 1: Speech to Text
             await manager.send_status(client_id, "stt_processing")
-            transcript = await asyncio.to_thread(
-                self.stt_service.transcribe, input_path
-            )
+            transcript = await self.stt_service.transcribe(input_path)
 
             if not transcript:
                 await manager.send_error(client_id, "Failed to transcribe audio")